@@ -0,0 +1,705 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+异步 Jenkins API 客户端
+基于 asyncio 和 aiohttp，在单个事件循环和连接池上并发获取 Job 信息，
+提供与 JenkinsClient 相同的 get_pipeline_structure、get_job_parameters、get_job_info 等接口
+"""
+
+import json
+import asyncio
+import contextvars
+from contextlib import contextmanager
+from utils.logger import logger
+from api.tree_query import api_url, JOB_METADATA_FIELDS
+from api.log_reader import BoundedLogReader
+from api.throttle import RequestThrottle
+from api.stage_timing import stage_runs_url, aggregate_stage_durations
+from api.pipeline_structure import (
+    normalize_job_path, normalize_job_metadata, structure_parameters, blue_ocean_run_url,
+    stage_nodes, build_blue_ocean_stage, parse_config_script, parse_freestyle_config,
+    list_jobs_url, split_folder_items
+)
+from api.capabilities import (
+    STRATEGY_WFAPI, STRATEGY_BLUE_OCEAN, STRATEGY_CONFIG_SCRIPT, STRATEGY_FREESTYLE,
+    PLUGINS_TREE, BLUE_OCEAN_PROBE_PATH, parse_plugins, select_strategies
+)
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+# 当前 Job 提取过程的请求缓存，asyncio.gather 创建的子任务会继承同一个缓存
+_request_cache = contextvars.ContextVar('jenkins_async_request_cache', default=None)
+
+class AsyncResponse:
+    """异步请求的响应，提供与 requests.Response 相近的属性"""
+
+    def __init__(self, url, status_code, headers, content=b'', encoding=None, raw=None):
+        """
+        初始化响应
+
+        Args:
+            url: 请求 URL
+            status_code: 状态码
+            headers: 响应头
+            content: 已读取的响应内容
+            encoding: 响应编码
+            raw: 流式读取时未读取内容的 aiohttp 响应
+        """
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.encoding = encoding
+        self.raw = raw
+
+    @property
+    def text(self):
+        """响应文本"""
+        return self.content.decode(self.encoding or 'utf-8', errors='replace')
+
+    def json(self):
+        """解析 JSON 响应"""
+        return json.loads(self.content)
+
+    async def iter_chunks(self, chunk_size):
+        """
+        流式读取响应内容
+
+        Args:
+            chunk_size: 每次读取的字节数
+
+        Yields:
+            bytes: 响应内容块
+        """
+        async for chunk in self.raw.content.iter_chunked(chunk_size):
+            yield chunk
+
+    def close(self):
+        """释放流式响应占用的连接"""
+        if self.raw is not None:
+            self.raw.close()
+
+class AsyncJenkinsClient:
+    """异步 Jenkins API 客户端"""
+
+    def __init__(self, jenkins_url, username=None, password=None, api_token=None,
+                 pool_maxsize=100, timeout=30, verify=False, max_inflight=8,
+                 http_cache=None, log_reader=None, throttle=None, parse_cache=None, stage_timing_builds=0):
+        """
+        初始化异步 Jenkins API 客户端
+
+        Args:
+            jenkins_url: Jenkins 服务器 URL
+            username: Jenkins 用户名
+            password: Jenkins 密码
+            api_token: Jenkins API Token (不再使用)
+            pool_maxsize: 连接池的最大连接数，即同时进行的最大请求数
+            timeout: 请求超时时间（秒）
+            verify: 是否校验 HTTPS 证书
+            max_inflight: 单个 Job 提取时允许同时进行的最大请求数
+            http_cache: 可选的 HttpCache 磁盘缓存，用于条件请求
+            log_reader: 步骤日志读取器，默认只保留日志头尾窗口和命令标记行
+            throttle: 请求节流器（限流、重试和熔断），默认只重试不限速
+            parse_cache: 可选的 ParseCache，复用内联 Jenkinsfile 的解析结果
+            stage_timing_builds: 大于 0 时在流水线结构中附带最近若干次构建的阶段耗时统计（stage_durations）
+        """
+        if aiohttp is None:
+            raise ImportError("异步客户端需要安装 aiohttp: pip install aiohttp")
+
+        self.jenkins_url = jenkins_url.rstrip('/')
+        self.username = username
+        self.password = password
+
+        # 只使用用户名和密码进行认证
+        self.auth = aiohttp.BasicAuth(username, password) if username and password else None
+
+        self.pool_maxsize = pool_maxsize
+        self.timeout = timeout
+        self.verify = verify
+        self.max_inflight = max(1, max_inflight)
+        self.http_cache = http_cache
+        self.parse_cache = parse_cache
+        self.log_reader = log_reader or BoundedLogReader()
+        self.throttle = throttle or RequestThrottle()
+        self.stage_timing_builds = max(0, stage_timing_builds)
+
+        # 会话在事件循环中首次使用时创建
+        self._session = None
+
+        self.request_stats = {'requests': 0, 'memo_hits': 0, 'revalidated': 0}
+
+        # 服务器能力只在首次使用时探测一次，本次运行内所有 Job 共用
+        self._capabilities = None
+        self._capabilities_probed = False
+        self._capabilities_lock = asyncio.Lock()
+
+    def _get_session(self):
+        """
+        获取共享的 aiohttp 会话
+
+        Returns:
+            aiohttp.ClientSession: HTTP 会话
+        """
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_maxsize, ssl=None if self.verify else False)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                auth=self.auth,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers={'Connection': 'keep-alive'}
+            )
+        return self._session
+
+    async def close(self):
+        """关闭会话，释放连接池中的连接"""
+        logger.debug(f"请求统计: {self.request_stats}")
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        if self.http_cache is not None:
+            self.http_cache.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+        return False
+
+    @contextmanager
+    def request_cache_scope(self):
+        """
+        请求缓存作用域，作用域内相同的 GET 请求只发送一次，正在进行的相同请求会被合并
+
+        嵌套使用时沿用外层作用域的缓存。
+        """
+        if _request_cache.get() is not None:
+            yield
+            return
+
+        token = _request_cache.set({})
+        try:
+            yield
+        finally:
+            _request_cache.reset(token)
+
+    async def _get(self, url, **kwargs):
+        """
+        发送 GET 请求，作用域内相同的请求复用同一个结果
+
+        Args:
+            url: 请求 URL
+            **kwargs: 传递给 aiohttp 的其他参数
+
+        Returns:
+            AsyncResponse: 响应对象
+        """
+        cache = _request_cache.get()
+        if cache is None:
+            return await self._send_get(url, **kwargs)
+
+        key = ('GET', url)
+        if key in cache:
+            self.request_stats['memo_hits'] += 1
+            logger.debug(f"命中请求缓存: {url}")
+            return await asyncio.shield(cache[key])
+
+        future = asyncio.ensure_future(self._send_get(url, **kwargs))
+        cache[key] = future
+        try:
+            response = await asyncio.shield(future)
+        except Exception:
+            cache.pop(key, None)
+            raise
+
+        # 服务端错误可能是暂时的，不缓存
+        if response.status_code >= 500:
+            cache.pop(key, None)
+        return response
+
+    async def _send_get(self, url, **kwargs):
+        """
+        发送 GET 请求，有磁盘缓存时发送条件请求
+
+        Args:
+            url: 请求 URL
+            **kwargs: 传递给 aiohttp 的其他参数
+
+        Returns:
+            AsyncResponse: 响应对象
+        """
+        # HttpCache 是同步的 SQLite 操作（写入时还要统计总大小进行淘汰），放到线程中执行，避免阻塞其他请求
+        entry = None
+        if self.http_cache is not None:
+            entry = await asyncio.to_thread(self.http_cache.get, url)
+            if entry is not None:
+                headers = dict(kwargs.get('headers') or {})
+                headers.update(self.http_cache.conditional_headers(entry))
+                kwargs['headers'] = headers
+
+        response = await self._send("GET", url, **kwargs)
+
+        if entry is not None and response.status_code == 304:
+            self.request_stats['revalidated'] += 1
+            logger.debug(f"资源未变化，使用磁盘缓存: {url}")
+            return AsyncResponse(url, 200, response.headers, bytes(entry['body']), entry.get('encoding'))
+
+        if self.http_cache is not None and response.status_code == 200:
+            await asyncio.to_thread(self.http_cache.store, url, response.headers, response.content, response.encoding)
+
+        return response
+
+    async def _send(self, method, url, stream=False, **kwargs):
+        """
+        经过限流、熔断和重试发送请求
+
+        Args:
+            method: HTTP 方法
+            url: 请求 URL
+            stream: 是否流式读取响应内容，流式响应使用完毕后需要调用 close()
+            **kwargs: 传递给 aiohttp 的其他参数
+
+        Returns:
+            AsyncResponse: 响应对象
+        """
+        session = self._get_session()
+
+        async def send():
+            self.request_stats['requests'] += 1
+            raw = await session.request(method, url, **kwargs)
+            if stream:
+                return AsyncResponse(str(raw.url), raw.status, raw.headers, encoding=raw.charset, raw=raw)
+            try:
+                content = await raw.read()
+            finally:
+                raw.release()
+            return AsyncResponse(str(raw.url), raw.status, raw.headers, content, raw.charset)
+
+        return await self.throttle.call_async(method, send, (aiohttp.ClientError,))
+
+    async def _make_request(self, method, url, data=None, as_json=True):
+        """
+        发送 HTTP 请求
+
+        Args:
+            method: HTTP 方法
+            url: 请求 URL
+            data: 请求数据
+            as_json: 是否将响应解析为 JSON
+
+        Returns:
+            dict 或 str: 响应内容
+        """
+        headers = {'Content-Type': 'application/json'}
+
+        try:
+            if method == "GET" and data is None:
+                response = await self._get(url, headers=headers)
+            else:
+                response = await self._send(method, url, headers=headers, data=data)
+            if response.status_code >= 400:
+                raise RuntimeError(f"HTTP {response.status_code}")
+
+            if as_json:
+                return response.json()
+            else:
+                return response.text
+        except Exception as e:
+            logger.error(f"请求失败: {url}, 错误: {str(e)}")
+            return None
+
+    async def get_server_capabilities(self):
+        """
+        获取服务器能力（已安装的插件和可用的 API），首次调用时探测并缓存
+
+        Returns:
+            dict: 能力名称到是否可用的映射，值为 None 表示未知；探测失败时返回 None
+        """
+        async with self._capabilities_lock:
+            if not self._capabilities_probed:
+                self._capabilities = await self._probe_capabilities()
+                self._capabilities_probed = True
+            return self._capabilities
+
+    async def _probe_capabilities(self):
+        """
+        探测服务器能力
+
+        优先读取插件列表；没有权限读取时改为直接探测 Blue Ocean API。
+
+        Returns:
+            dict: 能力名称到是否可用的映射，探测失败时返回 None
+        """
+        plugins_url = f"{self.jenkins_url}/pluginManager/api/json?tree={PLUGINS_TREE}"
+        logger.info(f"探测 Jenkins 服务器能力: {plugins_url}")
+
+        try:
+            response = await self._get(plugins_url)
+            if response.status_code == 200:
+                capabilities = parse_plugins(response.json())
+                logger.info(f"Jenkins 服务器能力: {capabilities}")
+                return capabilities
+
+            logger.warning(f"无法读取插件列表: {response.status_code}，改为探测 Blue Ocean API")
+            response = await self._get(f"{self.jenkins_url}{BLUE_OCEAN_PROBE_PATH}")
+            blue_ocean = {200: True, 404: False}.get(response.status_code)
+            capabilities = {'wfapi': None, 'blue_ocean': blue_ocean}
+            logger.info(f"Jenkins 服务器能力: {capabilities}")
+            return capabilities
+        except Exception as e:
+            logger.warning(f"探测 Jenkins 服务器能力失败，将尝试所有提取策略: {str(e)}")
+            return None
+
+    async def get_job_info(self, job_name):
+        """
+        获取 Job 信息
+
+        只请求 tree 投影中的字段（类型、最后构建编号、参数定义和 SCM 信息）。
+
+        Args:
+            job_name: Job 名称
+
+        Returns:
+            dict: Job 信息
+        """
+        url = api_url(f"{self.jenkins_url}/job/{normalize_job_path(job_name)}", *JOB_METADATA_FIELDS)
+        logger.info(f"获取 Job 信息: {url}")
+
+        job_info = await self._make_request("GET", url)
+        if job_info is None:
+            logger.error(f"获取 Job 信息失败: {job_name}")
+            return None
+
+        logger.info(f"作业类型: {job_info.get('_class', '')}")
+        return job_info
+
+    async def get_job_metadata(self, job_name):
+        """
+        获取整理后的 Job 元数据
+
+        Args:
+            job_name: Job 名称
+
+        Returns:
+            dict: Job 元数据，获取失败时返回 None
+        """
+        job_info = await self.get_job_info(job_name)
+        if job_info is None:
+            return None
+
+        return normalize_job_metadata(job_info)
+
+    async def get_stage_durations(self, job_name, builds=10):
+        """
+        统计最近若干次构建的阶段耗时
+
+        Args:
+            job_name: Job 名称
+            builds: 统计的构建次数
+
+        Returns:
+            dict: 阶段名称 -> {samples, p50_ms, p95_ms, max_ms}，获取失败时返回空字典
+        """
+        url = stage_runs_url(self.jenkins_url, normalize_job_path(job_name))
+        logger.info(f"获取最近 {builds} 次构建的阶段耗时: {url}")
+
+        try:
+            response = await self._get(url)
+            if response.status_code != 200:
+                logger.warning(f"获取阶段耗时失败: {response.status_code}")
+                return {}
+
+            runs = response.json() or []
+            if builds > len(runs):
+                # Pipeline Stage View 插件默认最多返回最近 10 次构建
+                logger.warning(f"要求统计最近 {builds} 次构建，wfapi/runs 只返回了 {len(runs)} 次，按实际返回的构建统计")
+
+            durations = aggregate_stage_durations(runs, builds)
+            logger.info(f"统计了 {len(durations)} 个阶段的耗时")
+            return durations
+        except Exception as e:
+            logger.warning(f"获取阶段耗时失败: {str(e)}")
+            return {}
+
+    async def get_job_parameters(self, job_path):
+        """
+        获取 Job 参数
+
+        Args:
+            job_path: Job 路径
+
+        Returns:
+            list: 参数列表
+        """
+        metadata = await self.get_job_metadata(job_path)
+        if not metadata:
+            logger.error(f"获取 Job 参数失败: {job_path}")
+            return []
+
+        return metadata['parameters']
+
+    async def list_jobs(self, folder=None):
+        """
+        递归列出 Jenkins 实例或文件夹下的所有 Job，同一层级的文件夹并发请求
+
+        Args:
+            folder: 起始文件夹路径，为空时从 Jenkins 根目录开始
+
+        Returns:
+            list: Job 信息列表，每项包含 name（完整路径）和 _class
+        """
+        jobs = []
+        pending = [folder.strip('/') if folder else '']
+
+        while pending:
+            urls = [list_jobs_url(self.jenkins_url, current) for current in pending]
+            for url in urls:
+                logger.info(f"列出 Job: {url}")
+
+            results = await asyncio.gather(*(self._make_request("GET", url) for url in urls))
+
+            next_pending = []
+            for current, data in zip(pending, results):
+                if not data:
+                    continue
+                folder_jobs, sub_folders = split_folder_items(current, data)
+                jobs.extend(folder_jobs)
+                next_pending.extend(sub_folders)
+            pending = next_pending
+
+        logger.info(f"共找到 {len(jobs)} 个 Job")
+        return jobs
+
+    async def get_pipeline_structure(self, job_name):
+        """
+        获取流水线结构
+
+        同一个 Job 的提取过程共用一个请求缓存，多个策略重复读取的资源只请求一次。
+
+        Args:
+            job_name: Job 名称
+
+        Returns:
+            dict: 流水线结构
+        """
+        with self.request_cache_scope():
+            return await self._get_pipeline_structure(job_name)
+
+    async def _get_pipeline_structure(self, job_name):
+        """
+        按 Job 类型和服务器能力选出的策略依次尝试获取流水线结构
+
+        Args:
+            job_name: Job 名称
+
+        Returns:
+            dict: 流水线结构
+        """
+        logger.info(f"获取流水线结构: {job_name}")
+
+        job_path = normalize_job_path(job_name)
+
+        # 元数据和服务器能力互不依赖，同时请求
+        metadata, capabilities = await asyncio.gather(
+            self.get_job_metadata(job_path),
+            self.get_server_capabilities()
+        )
+        metadata = metadata or {}
+        strategies = select_strategies(metadata.get('_class'), capabilities)
+        logger.info(f"Job 类型: {metadata.get('_class') or '未知'}，提取策略: {', '.join(strategies)}")
+
+        pipeline_structure = {}
+
+        # 方法1和方法2: wfapi/describe 与最后一次构建的 wfapi/describe
+        if STRATEGY_WFAPI in strategies:
+            for describe_url in (f"{self.jenkins_url}/job/{job_path}/wfapi/describe",
+                                 f"{self.jenkins_url}/job/{job_path}/lastBuild/wfapi/describe"):
+                try:
+                    logger.info(f"尝试从 wfapi 获取流水线结构: {describe_url}")
+                    response = await self._make_request("GET", describe_url)
+                    if response and 'stages' in response:
+                        pipeline_structure = response
+                        logger.info(f"从 wfapi 获取到 {len(response.get('stages', []))} 个阶段")
+                except Exception as e:
+                    logger.warning(f"从 wfapi 获取流水线结构失败: {str(e)}")
+                if pipeline_structure.get('stages'):
+                    break
+
+        # 方法3: 从 Blue Ocean API 获取
+        if STRATEGY_BLUE_OCEAN in strategies and not pipeline_structure.get('stages'):
+            try:
+                logger.info(f"尝试从 Blue Ocean API 获取流水线结构: {job_path}")
+                last_build_number = metadata.get('last_build_number') or 1
+                blue_ocean_url = blue_ocean_run_url(self.jenkins_url, job_path, last_build_number)
+                blue_ocean_data = await self._make_request("GET", blue_ocean_url)
+
+                if blue_ocean_data:
+                    pipeline_structure = {
+                        'name': blue_ocean_data.get('name', ''),
+                        'stages': []
+                    }
+
+                    nodes = await self._make_request("GET", f"{blue_ocean_url}/nodes")
+                    if nodes:
+                        pipeline_structure['stages'] = await self._fetch_blue_ocean_stages(blue_ocean_url, nodes)
+                        logger.info(f"从 Blue Ocean API 获取到 {len(pipeline_structure.get('stages', []))} 个阶段")
+            except Exception as e:
+                logger.warning(f"从 Blue Ocean API 获取流水线结构失败: {str(e)}")
+
+        # 方法4: 从 config.xml 中获取内联 Jenkinsfile
+        if STRATEGY_CONFIG_SCRIPT in strategies and not pipeline_structure.get('stages'):
+            try:
+                config_url = f"{self.jenkins_url}/job/{job_path}/config.xml"
+                logger.info(f"尝试从 config.xml 获取 Jenkinsfile: {config_url}")
+                config_xml = await self._make_request("GET", config_url, as_json=False)
+
+                if config_xml:
+                    # Jenkinsfile 解析是 CPU 密集操作，放到线程中执行，避免阻塞事件循环
+                    script_structure = await asyncio.to_thread(parse_config_script, config_xml, self.parse_cache)
+                    if script_structure:
+                        pipeline_structure.update(script_structure)
+                        logger.info(f"从 Jenkinsfile 中获取到 {len(pipeline_structure.get('stages', []))} 个阶段")
+            except Exception as e:
+                logger.warning(f"从 config.xml 获取 Jenkinsfile 失败: {str(e)}")
+
+        # 方法5: Freestyle 项目从构建步骤中提取信息
+        if STRATEGY_FREESTYLE in strategies and not pipeline_structure.get('stages'):
+            try:
+                response = await self._get(f"{self.jenkins_url}/job/{job_path}/config.xml")
+                if response.status_code == 200:
+                    # config.xml 可能有数 MB，与 Jenkinsfile 解析一样放到线程中执行
+                    freestyle_structure = await asyncio.to_thread(parse_freestyle_config, job_name, response.content)
+                    if freestyle_structure:
+                        pipeline_structure = freestyle_structure
+            except Exception as e:
+                logger.warning(f"从 Freestyle 项目提取构建步骤失败: {str(e)}")
+
+        # 如果仍然没有获取到阶段信息，添加一个空的阶段结构
+        if not pipeline_structure.get('stages'):
+            pipeline_structure = {
+                'name': job_path.split('/')[-1],
+                'stages': []
+            }
+
+        if metadata:
+            parameters = structure_parameters(metadata)
+            pipeline_structure['parameters'] = parameters
+            logger.info(f"获取到 {len(parameters)} 个参数")
+
+        # 阶段耗时统计只对 Pipeline 项目可用（需要 Pipeline Stage View 插件）
+        if self.stage_timing_builds and STRATEGY_WFAPI in strategies:
+            pipeline_structure['stage_durations'] = await self.get_stage_durations(job_path, self.stage_timing_builds)
+
+        return pipeline_structure
+
+    async def _fetch_blue_ocean_stages(self, blue_ocean_url, nodes):
+        """
+        并发获取 Blue Ocean 各阶段的步骤和步骤日志
+
+        最多同时发出 max_inflight 个请求，结果按节点和步骤的原始顺序组装。
+
+        Args:
+            blue_ocean_url: Blue Ocean 构建 URL
+            nodes: Blue Ocean 节点列表
+
+        Returns:
+            list: 阶段列表
+        """
+        semaphore = asyncio.Semaphore(self.max_inflight)
+
+        async def bounded(coroutine):
+            async with semaphore:
+                return await coroutine
+
+        async def fetch_stage(node):
+            steps = await bounded(self._get_stage_steps(blue_ocean_url, node.get('id')))
+            logs = await asyncio.gather(*(
+                bounded(self._get_step_log(blue_ocean_url, node.get('id'), step.get('id')))
+                for step in steps
+            ))
+            return build_blue_ocean_stage(node, steps, logs)
+
+        return list(await asyncio.gather(*(fetch_stage(node) for node in stage_nodes(nodes))))
+
+    async def _get_stage_steps(self, blue_ocean_url, node_id):
+        """
+        获取 Blue Ocean 阶段的步骤列表
+
+        Args:
+            blue_ocean_url: Blue Ocean 构建 URL
+            node_id: 节点 ID
+
+        Returns:
+            list: 步骤列表
+        """
+        response = await self._get(f"{blue_ocean_url}/nodes/{node_id}/steps")
+        if response.status_code == 200:
+            return response.json()
+        return []
+
+    async def _get_step_log(self, base_url, node_id, step_id):
+        """
+        获取步骤日志
+
+        Args:
+            base_url: 基础 URL
+            node_id: 节点 ID
+            step_id: 步骤 ID
+
+        Returns:
+            str: 步骤日志
+        """
+        log_url = f"{base_url}/nodes/{node_id}/steps/{step_id}/log"
+
+        try:
+            return await self._read_log(log_url)
+        except Exception as e:
+            logger.error(f"获取步骤日志失败: {str(e)}")
+            return ""
+
+    async def _read_log(self, url):
+        """
+        流式读取日志，只保留日志读取器需要的部分
+
+        有磁盘缓存时与 JenkinsClient 相同：日志未变化（304 或校验信息相同）时直接使用缓存的截取结果。
+
+        Args:
+            url: 日志 URL
+
+        Returns:
+            str: 截取后的日志
+        """
+        cache_key = self.log_reader.cache_key(url)
+        entry = None
+        headers = None
+        if self.http_cache is not None:
+            entry = await asyncio.to_thread(self.http_cache.get, cache_key)
+            if entry is not None:
+                headers = self.http_cache.conditional_headers(entry)
+
+        response = await self._send("GET", url, stream=True, headers=headers)
+        try:
+            if entry is not None and (response.status_code == 304 or
+                                      (response.status_code == 200 and self.http_cache.unchanged(entry, response.headers))):
+                self.request_stats['revalidated'] += 1
+                logger.debug(f"日志未变化，使用磁盘缓存: {url}")
+                return bytes(entry['body']).decode('utf-8')
+
+            if response.status_code >= 400:
+                raise RuntimeError(f"HTTP {response.status_code}")
+
+            window = self.log_reader.window(response.encoding or 'utf-8')
+            async for chunk in response.iter_chunks(self.log_reader.chunk_size):
+                if window.feed(chunk):
+                    break
+            log = window.result()
+        finally:
+            response.close()
+
+        if self.http_cache is not None:
+            await asyncio.to_thread(self.http_cache.store, cache_key, response.headers, log.encode('utf-8'), 'utf-8')
+        return log
@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Jenkins 服务器能力探测
+根据已安装的插件和 Job 类型选择流水线结构的提取策略，跳过注定失败的请求
+"""
+
+# 提取策略名称，按尝试顺序排列
+STRATEGY_WFAPI = 'wfapi'                  # wfapi/describe 与 lastBuild/wfapi/describe
+STRATEGY_BLUE_OCEAN = 'blue_ocean'        # Blue Ocean REST API
+STRATEGY_CONFIG_SCRIPT = 'config_script'  # config.xml 中的内联 Jenkinsfile
+STRATEGY_FREESTYLE = 'freestyle'          # config.xml 中的 Freestyle 构建步骤
+
+ALL_STRATEGIES = (STRATEGY_WFAPI, STRATEGY_BLUE_OCEAN, STRATEGY_CONFIG_SCRIPT, STRATEGY_FREESTYLE)
+
+# 能力对应的插件，任意一个处于启用状态即认为具备该能力
+CAPABILITY_PLUGINS = {
+    'wfapi': ('pipeline-rest-api', 'pipeline-stage-view'),
+    'blue_ocean': ('blueocean-rest', 'blueocean-pipeline-api-impl', 'blueocean')
+}
+
+# 插件列表的 tree 投影
+PLUGINS_TREE = 'plugins[shortName,active]'
+
+# Blue Ocean API 可用性探测路径（无权读取插件列表时使用）
+BLUE_OCEAN_PROBE_PATH = '/blue/rest/organizations/jenkins/'
+
+def parse_plugins(plugin_data):
+    """
+    根据插件列表计算服务器能力
+
+    Args:
+        plugin_data: pluginManager/api/json 的响应
+
+    Returns:
+        dict: 能力名称到是否可用的映射
+    """
+    active = {
+        plugin.get('shortName')
+        for plugin in plugin_data.get('plugins', [])
+        if plugin.get('active', True)
+    }
+    return {
+        capability: any(plugin in active for plugin in plugins)
+        for capability, plugins in CAPABILITY_PLUGINS.items()
+    }
+
+def select_strategies(job_class, capabilities):
+    """
+    根据 Job 类型和服务器能力选择提取策略
+
+    能力未知（值为 None 或整体为空）时保留对应策略，保证行为与不探测时一致。
+
+    Args:
+        job_class: Job 的 _class，未知时为空
+        capabilities: 服务器能力，探测失败时为 None
+
+    Returns:
+        tuple: 需要尝试的策略名称
+    """
+    capabilities = capabilities or {}
+    job_class = job_class or ''
+
+    if 'FreeStyleProject' in job_class:
+        strategies = (STRATEGY_FREESTYLE,)
+    elif 'WorkflowJob' in job_class:
+        strategies = (STRATEGY_WFAPI, STRATEGY_BLUE_OCEAN, STRATEGY_CONFIG_SCRIPT)
+    else:
+        strategies = ALL_STRATEGIES
+
+    return tuple(
+        strategy for strategy in strategies
+        if capabilities.get(strategy) is not False
+    )
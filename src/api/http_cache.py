@@ -0,0 +1,203 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+HTTP 响应磁盘缓存
+使用 SQLite 文件保存带 ETag/Last-Modified 的响应，重新运行时通过条件请求复用未变化的内容
+"""
+
+import os
+import time
+import sqlite3
+import threading
+import requests
+from requests.structures import CaseInsensitiveDict
+from utils.logger import logger
+
+class HttpCache:
+    """基于 SQLite 的 HTTP 响应缓存，按最近访问时间进行 LRU 淘汰"""
+
+    def __init__(self, cache_path, max_size_mb=256):
+        """
+        初始化缓存
+
+        Args:
+            cache_path: SQLite 缓存文件路径
+            max_size_mb: 缓存内容的最大总大小（MB）
+        """
+        self.cache_path = cache_path
+        self.max_size = int(max_size_mb * 1024 * 1024)
+        self._lock = threading.Lock()
+
+        cache_dir = os.path.dirname(os.path.abspath(cache_path))
+        os.makedirs(cache_dir, exist_ok=True)
+
+        self._conn = sqlite3.connect(cache_path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "url TEXT PRIMARY KEY, "
+            "etag TEXT, "
+            "last_modified TEXT, "
+            "content_type TEXT, "
+            "encoding TEXT, "
+            "body BLOB, "
+            "size INTEGER, "
+            "last_access REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_last_access ON responses (last_access)")
+        self._conn.commit()
+
+        logger.info(f"HTTP 缓存文件: {cache_path}，最大 {max_size_mb} MB")
+
+    def get(self, url):
+        """
+        读取缓存条目并刷新访问时间
+
+        Args:
+            url: 请求 URL
+
+        Returns:
+            dict: 缓存条目，不存在时返回 None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified, content_type, encoding, body FROM responses WHERE url = ?",
+                (url,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            self._conn.execute("UPDATE responses SET last_access = ? WHERE url = ?", (time.time(), url))
+            self._conn.commit()
+
+        return {
+            'etag': row[0],
+            'last_modified': row[1],
+            'content_type': row[2],
+            'encoding': row[3],
+            'body': row[4]
+        }
+
+    def put(self, url, response):
+        """
+        保存响应，只缓存带校验信息（ETag 或 Last-Modified）的响应
+
+        Args:
+            url: 请求 URL
+            response: requests.Response 对象
+
+        Returns:
+            bool: 是否已缓存
+        """
+        return self.store(url, response.headers, response.content, response.encoding)
+
+    def store(self, url, headers, body, encoding=None):
+        """
+        保存响应内容，只缓存带校验信息（ETag 或 Last-Modified）的响应
+
+        Args:
+            url: 请求 URL
+            headers: 响应头
+            body: 响应内容（字节）
+            encoding: 响应编码
+
+        Returns:
+            bool: 是否已缓存
+        """
+        etag = headers.get('ETag')
+        last_modified = headers.get('Last-Modified')
+        if not etag and not last_modified:
+            return False
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(url, etag, last_modified, content_type, encoding, body, size, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, etag, last_modified, headers.get('Content-Type'), encoding,
+                 sqlite3.Binary(body), len(body), time.time())
+            )
+            self._evict()
+            self._conn.commit()
+        return True
+
+    def _evict(self):
+        """淘汰最久未访问的条目，直到总大小不超过上限（调用方需持有锁）"""
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_size:
+            return
+
+        evicted = 0
+        for url, size in self._conn.execute(
+                "SELECT url, size FROM responses ORDER BY last_access").fetchall():
+            if total <= self.max_size:
+                break
+            self._conn.execute("DELETE FROM responses WHERE url = ?", (url,))
+            total -= size
+            evicted += 1
+
+        logger.debug(f"HTTP 缓存淘汰了 {evicted} 个条目")
+
+    def conditional_headers(self, entry):
+        """
+        生成条件请求头
+
+        Args:
+            entry: 缓存条目
+
+        Returns:
+            dict: If-None-Match / If-Modified-Since 请求头
+        """
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def unchanged(self, entry, headers):
+        """
+        判断响应与缓存条目是否为同一版本，用于服务器忽略条件请求直接返回 200 的情况
+
+        Args:
+            entry: 缓存条目
+            headers: 响应头
+
+        Returns:
+            bool: ETag 相同，或没有 ETag 时 Last-Modified 相同
+        """
+        etag = headers.get('ETag')
+        if etag and entry.get('etag'):
+            return etag == entry['etag']
+        last_modified = headers.get('Last-Modified')
+        return bool(last_modified) and last_modified == entry.get('last_modified')
+
+    def to_response(self, entry, url):
+        """
+        将缓存条目还原为 requests.Response 对象
+
+        Args:
+            entry: 缓存条目
+            url: 请求 URL
+
+        Returns:
+            requests.Response: 状态码为 200 的响应对象
+        """
+        response = requests.Response()
+        response.status_code = 200
+        response.url = url
+        response._content = bytes(entry['body'])
+        response.encoding = entry.get('encoding')
+        response.headers = CaseInsensitiveDict()
+        if entry.get('content_type'):
+            response.headers['Content-Type'] = entry['content_type']
+        if entry.get('etag'):
+            response.headers['ETag'] = entry['etag']
+        if entry.get('last_modified'):
+            response.headers['Last-Modified'] = entry['last_modified']
+        return response
+
+    def close(self):
+        """关闭缓存文件"""
+        with self._lock:
+            self._conn.close()
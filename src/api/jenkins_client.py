@@ -7,14 +7,34 @@ Jenkins API 客户端
 """
 
 import requests
+import urllib3
 import json
 import re
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 from utils.logger import logger
+from api.tree_query import api_url, JOB_METADATA_FIELDS, BUILD_SUMMARY_FIELDS
+from api.log_reader import BoundedLogReader
+from api.throttle import RequestThrottle
+from api.stage_timing import stage_runs_url, aggregate_stage_durations
+from api.pipeline_structure import (
+    normalize_job_path, normalize_job_metadata, structure_parameters, blue_ocean_run_url,
+    stage_nodes, build_blue_ocean_stage, parse_config_script, parse_freestyle_config,
+    list_jobs_url, split_folder_items
+)
+from api.capabilities import (
+    STRATEGY_WFAPI, STRATEGY_BLUE_OCEAN, STRATEGY_CONFIG_SCRIPT, STRATEGY_FREESTYLE,
+    PLUGINS_TREE, BLUE_OCEAN_PROBE_PATH, parse_plugins, select_strategies
+)
 
 class JenkinsClient:
     """Jenkins API 客户端"""
     
-    def __init__(self, jenkins_url, username=None, password=None, api_token=None):
+    def __init__(self, jenkins_url, username=None, password=None, api_token=None,
+                 pool_connections=10, pool_maxsize=10, timeout=30, verify=False, max_inflight=8,
+                 http_cache=None, log_reader=None, throttle=None, parse_cache=None, stage_timing_builds=0):
         """
         初始化 Jenkins API 客户端
         
@@ -23,6 +43,16 @@ class JenkinsClient:
             username: Jenkins 用户名
             password: Jenkins 密码
             api_token: Jenkins API Token (不再使用)
+            pool_connections: 连接池缓存的主机数量
+            pool_maxsize: 每个主机保持的最大连接数
+            timeout: 请求超时时间（秒）
+            verify: 是否校验 HTTPS 证书
+            max_inflight: 单个 Job 提取时允许同时进行的最大请求数
+            http_cache: 可选的 HttpCache 磁盘缓存，用于条件请求
+            log_reader: 步骤日志读取器，默认只保留日志头尾窗口和命令标记行
+            throttle: 请求节流器（限流、重试和熔断），默认只重试不限速
+            parse_cache: 可选的 ParseCache，复用内联 Jenkinsfile 的解析结果
+            stage_timing_builds: 大于 0 时在流水线结构中附带最近若干次构建的阶段耗时统计（stage_durations）
         """
         self.jenkins_url = jenkins_url.rstrip('/')
         self.username = username
@@ -30,6 +60,192 @@ class JenkinsClient:
         
         # 只使用用户名和密码进行认证
         self.auth = (username, password) if username and password else None
+        
+        # 统一的超时和证书校验设置
+        self.timeout = timeout
+        self.verify = verify
+        self.max_inflight = max(1, max_inflight)
+        
+        # 所有请求共用一个带连接池的会话，复用 TCP/TLS 连接
+        self.session = self._create_session(pool_connections, pool_maxsize)
+        
+        # 请求级内存缓存：按线程保存当前作用域的缓存，统计信息在所有线程间共享
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        self.request_stats = {'requests': 0, 'memo_hits': 0, 'revalidated': 0}
+        
+        # 可选的磁盘缓存，跨运行复用未变化的响应
+        self.http_cache = http_cache
+        
+        # 可选的解析缓存，内联 Jenkinsfile 未变化时跳过解析
+        self.parse_cache = parse_cache
+        
+        # 步骤日志按流式读取，单个步骤占用的内存有上限
+        self.log_reader = log_reader or BoundedLogReader()
+        
+        # 限流、重试和熔断在所有工作线程间共享
+        self.throttle = throttle or RequestThrottle()
+        
+        # 阶段耗时统计的构建次数，0 表示不统计
+        self.stage_timing_builds = max(0, stage_timing_builds)
+        
+        # 服务器能力只在首次使用时探测一次，本次运行内所有 Job 共用
+        self._capabilities = None
+        self._capabilities_probed = False
+        self._capabilities_lock = threading.Lock()
+    
+    def _create_session(self, pool_connections, pool_maxsize):
+        """
+        创建带连接池的 HTTP 会话
+        
+        Args:
+            pool_connections: 连接池缓存的主机数量
+            pool_maxsize: 每个主机保持的最大连接数
+            
+        Returns:
+            requests.Session: HTTP 会话
+        """
+        session = requests.Session()
+        
+        # pool_block=True 时每个主机的并发连接数不会超过 pool_maxsize
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=True
+        )
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        
+        session.auth = self.auth
+        session.verify = self.verify
+        session.headers.update({'Connection': 'keep-alive'})
+        
+        if not self.verify:
+            urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+        
+        return session
+    
+    def close(self):
+        """关闭 HTTP 会话，释放连接池"""
+        logger.debug(f"共发出 {self.request_stats['requests']} 个请求，内存缓存节省了 {self.request_stats['memo_hits']} 个请求，"
+                     f"磁盘缓存命中 {self.request_stats['revalidated']} 个 304 响应")
+        self.session.close()
+        if self.http_cache is not None:
+            self.http_cache.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+    
+    def _get(self, url, **kwargs):
+        """
+        通过共享会话发送 GET 请求
+        
+        Args:
+            url: 请求 URL
+            **kwargs: 传递给 requests 的其他参数
+            
+        Returns:
+            requests.Response: 响应对象
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        
+        # 流式响应不能重复读取，不做缓存
+        cache = getattr(self._local, 'cache', None)
+        if cache is None or kwargs.get('stream'):
+            return self._send_get(url, **kwargs)
+        
+        key = ('GET', url)
+        if key in cache:
+            with self._stats_lock:
+                self.request_stats['memo_hits'] += 1
+            logger.debug(f"命中请求缓存: {url}")
+            return cache[key]
+        
+        response = self._send_get(url, **kwargs)
+        
+        # 服务端错误可能是暂时的，不缓存
+        if response.status_code < 500:
+            cache[key] = response
+        return response
+    
+    def _send_get(self, url, **kwargs):
+        """
+        发送 GET 请求并计数
+        
+        Args:
+            url: 请求 URL
+            **kwargs: 传递给 requests 的其他参数
+            
+        Returns:
+            requests.Response: 响应对象
+        """
+        # 有磁盘缓存时发送条件请求；流式请求（步骤日志）由 _read_log 缓存截取后的内容
+        entry = None
+        if self.http_cache is not None and not kwargs.get('stream'):
+            entry = self.http_cache.get(url)
+            if entry is not None:
+                headers = dict(kwargs.get('headers') or {})
+                headers.update(self.http_cache.conditional_headers(entry))
+                kwargs['headers'] = headers
+        
+        response = self._send("GET", url, **kwargs)
+        
+        if entry is not None and response.status_code == 304:
+            with self._stats_lock:
+                self.request_stats['revalidated'] += 1
+            logger.debug(f"资源未变化，使用磁盘缓存: {url}")
+            return self.http_cache.to_response(entry, url)
+        
+        if self.http_cache is not None and response.status_code == 200 and not kwargs.get('stream'):
+            self.http_cache.put(url, response)
+        
+        return response
+    
+    def _send(self, method, url, **kwargs):
+        """
+        经过限流、熔断和重试发送请求
+        
+        Args:
+            method: HTTP 方法
+            url: 请求 URL
+            **kwargs: 传递给 requests 的其他参数
+            
+        Returns:
+            requests.Response: 响应对象
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        
+        def send():
+            with self._stats_lock:
+                self.request_stats['requests'] += 1
+            return self.session.request(method, url, **kwargs)
+        
+        return self.throttle.call(method, send)
+    
+    @contextmanager
+    def request_cache_scope(self):
+        """
+        请求缓存作用域
+        
+        作用域内相同 URL 的 GET 请求只发送一次，重复读取直接从内存返回。
+        嵌套使用时复用最外层的缓存，退出最外层作用域时释放缓存。
+        """
+        if getattr(self._local, 'cache', None) is not None:
+            yield
+            return
+        
+        self._local.cache = {}
+        hits_before = self.request_stats['memo_hits']
+        try:
+            yield
+        finally:
+            saved = self.request_stats['memo_hits'] - hits_before
+            logger.debug(f"请求缓存作用域结束，缓存了 {len(self._local.cache)} 个响应，节省了 {saved} 个请求")
+            self._local.cache = None
     
     def get_job_config(self, job_name):
         """
@@ -45,7 +261,7 @@ class JenkinsClient:
         logger.info(f"获取 Job 配置: {url}")
         
         try:
-            response = requests.get(url, auth=self.auth)
+            response = self._get(url)
             response.raise_for_status()
             return response.text
         except Exception as e:
@@ -62,11 +278,11 @@ class JenkinsClient:
         Returns:
             dict: 构建信息
         """
-        url = f"{self.jenkins_url}/job/{job_name}/lastBuild/api/json?pretty=true"
+        url = api_url(f"{self.jenkins_url}/job/{job_name}/lastBuild", *BUILD_SUMMARY_FIELDS)
         logger.info(f"获取最后一次构建信息: {url}")
         
         try:
-            response = requests.get(url, auth=self.auth)
+            response = self._get(url)
             response.raise_for_status()
             return response.json()
         except Exception as e:
@@ -127,7 +343,7 @@ class JenkinsClient:
         logger.info(f"获取流水线阶段信息: {url}")
         
         try:
-            response = requests.get(url, auth=self.auth)
+            response = self._get(url)
             response.raise_for_status()
             stages_info = response.json()
             
@@ -141,7 +357,7 @@ class JenkinsClient:
                 # 获取阶段详细信息
                 stage_url = f"{self.jenkins_url}/job/{job_name}/lastBuild/execution/node/{stage_id}/wfapi/describe"
                 try:
-                    stage_response = requests.get(stage_url, auth=self.auth)
+                    stage_response = self._get(stage_url)
                     stage_response.raise_for_status()
                     stage_detail = stage_response.json()
                     
@@ -188,9 +404,7 @@ class JenkinsClient:
         logger.info(f"获取步骤日志: {url}")
         
         try:
-            response = requests.get(url, auth=self.auth)
-            response.raise_for_status()
-            return response.text
+            return self._read_log(url)
         except Exception as e:
             logger.error(f"获取步骤日志失败: {str(e)}")
             return ""
@@ -211,26 +425,9 @@ class JenkinsClient:
         # 获取流水线阶段信息
         stages = self.get_pipeline_stages(job_name)
         
-        # 获取 Job 信息
-        job_info = self.get_job_info(job_name)
-        
-        # 提取参数
-        parameters = []
-        if job_info and 'property' in job_info:
-            for prop in job_info.get('property', []):
-                if 'parameterDefinitions' in prop:
-                    for param in prop.get('parameterDefinitions', []):
-                        param_name = param.get('name')
-                        param_default = param.get('defaultValue', '')
-                        param_description = param.get('description', '')
-                        param_type = param.get('type', 'string')
-                        
-                        parameters.append({
-                            'name': param_name,
-                            'default': param_default,
-                            'description': param_description,
-                            'type': param_type
-                        })
+        # 获取 Job 元数据并提取参数
+        metadata = self.get_job_metadata(job_name)
+        parameters = metadata['parameters'] if metadata else []
         
         # 构建流水线结构
         pipeline_structure = {
@@ -400,230 +597,6 @@ class JenkinsClient:
         
         return ""
         
-    def get_pipeline_structure(self, job_name):
-        """
-        获取流水线结构
-        
-        Args:
-            job_name: Job 名称
-            
-        Returns:
-            dict: 流水线结构
-        """
-        logger.info(f"获取流水线结构: {job_name}")
-        
-        # 规范化 job_name
-        job_path = self._normalize_job_path(job_name)
-        
-        # 尝试多种方式获取流水线结构
-        pipeline_structure = {}
-        
-        # 方法1: 使用 wfapi/describe 端点
-        try:
-            api_url = f"{self.jenkins_url}/job/{job_path}/wfapi/describe"
-            logger.info(f"尝试从 wfapi/describe 获取流水线结构: {api_url}")
-            response = requests.get(api_url, auth=self.auth, verify=False)
-            if response.status_code == 200:
-                pipeline_structure = response.json()
-                if 'stages' in pipeline_structure:
-                    logger.info(f"从 wfapi/describe 获取到 {len(pipeline_structure.get('stages', []))} 个阶段")
-        except Exception as e:
-            logger.warning(f"从 wfapi/describe 获取流水线结构失败: {str(e)}")
-        
-        # 方法2: 如果没有获取到阶段信息，尝试从最后一次构建中获取
-        if not pipeline_structure.get('stages'):
-            try:
-                api_url = f"{self.jenkins_url}/job/{job_path}/lastBuild/wfapi/describe"
-                logger.info(f"尝试从最后一次构建中获取流水线结构: {api_url}")
-                response = requests.get(api_url, auth=self.auth, verify=False)
-                if response.status_code == 200:
-                    pipeline_structure = response.json()
-                    if 'stages' in pipeline_structure:
-                        logger.info(f"从最后一次构建中获取到 {len(pipeline_structure.get('stages', []))} 个阶段")
-            except Exception as e:
-                logger.warning(f"从最后一次构建中获取流水线结构失败: {str(e)}")
-        
-        # 方法3: 如果仍然没有获取到阶段信息，尝试从 Blue Ocean API 获取
-        if not pipeline_structure.get('stages'):
-            try:
-                # 获取最后一次构建编号
-                job_info_url = f"{self.jenkins_url}/job/{job_path}/api/json"
-                job_info_response = requests.get(job_info_url, auth=self.auth, verify=False)
-                job_info = job_info_response.json() if job_info_response.status_code == 200 else {}
-                last_build_number = job_info.get('lastBuild', {}).get('number', 1)
-                
-                # 使用 Blue Ocean API
-                blue_ocean_url = f"{self.jenkins_url}/blue/rest/organizations/jenkins/pipelines/{job_path.replace('/job/', '/')}/runs/{last_build_number}"
-                logger.info(f"尝试从 Blue Ocean API 获取流水线结构: {blue_ocean_url}")
-                blue_ocean_response = requests.get(blue_ocean_url, auth=self.auth, verify=False)
-                
-                if blue_ocean_response.status_code == 200:
-                    blue_ocean_data = blue_ocean_response.json()
-                    # 转换 Blue Ocean 数据为流水线结构
-                    pipeline_structure = {
-                        'name': blue_ocean_data.get('name', ''),
-                        'stages': []
-                    }
-                    
-                    # 获取节点信息
-                    nodes_url = f"{blue_ocean_url}/nodes"
-                    nodes_response = requests.get(nodes_url, auth=self.auth, verify=False)
-                    
-                    if nodes_response.status_code == 200:
-                        nodes = nodes_response.json()
-                        for node in nodes:
-                            if node.get('type') == 'STAGE':
-                                stage = {
-                                    'name': node.get('displayName', ''),
-                                    'steps': []
-                                }
-                                
-                                # 获取阶段步骤
-                                steps_url = f"{blue_ocean_url}/nodes/{node.get('id')}/steps"
-                                steps_response = requests.get(steps_url, auth=self.auth, verify=False)
-                                
-                                if steps_response.status_code == 200:
-                                    steps = steps_response.json()
-                                    for step in steps:
-                                        stage['steps'].append({
-                                            'name': step.get('displayName', ''),
-                                            'log': self._get_step_log(blue_ocean_url, node.get('id'), step.get('id'))
-                                        })
-                                
-                                pipeline_structure['stages'].append(stage)
-                        
-                        logger.info(f"从 Blue Ocean API 获取到 {len(pipeline_structure.get('stages', []))} 个阶段")
-            except Exception as e:
-                logger.warning(f"从 Blue Ocean API 获取流水线结构失败: {str(e)}")
-        
-        # 方法4: 如果仍然没有获取到阶段信息，尝试从 config.xml 中获取 Jenkinsfile
-        if not pipeline_structure.get('stages'):
-            try:
-                config_url = f"{self.jenkins_url}/job/{job_path}/config.xml"
-                logger.info(f"尝试从 config.xml 获取 Jenkinsfile: {config_url}")
-                config_response = requests.get(config_url, auth=self.auth, verify=False)
-                
-                if config_response.status_code == 200:
-                    import xml.etree.ElementTree as ET
-                    import tempfile
-                    import os
-                    
-                    # 解析 XML
-                    root = ET.fromstring(config_response.content)
-                    
-                    # 查找 definition 元素
-                    definition = root.find(".//definition")
-                    if definition is not None:
-                        # 查找 script 元素
-                        script = definition.find(".//script")
-                        if script is not None and script.text:
-                            logger.info("从 config.xml 中提取到 Jenkinsfile 内容")
-                            
-                            # 将 Jenkinsfile 内容保存到临时文件
-                            with tempfile.NamedTemporaryFile(suffix='.jenkinsfile', delete=False) as temp:
-                                temp.write(script.text.encode('utf-8'))
-                                temp_path = temp.name
-                            
-                            # 使用 Jenkinsfile 解析器解析流水线结构
-                            from parsers.jenkins_file_parser import JenkinsfileParser
-                            jenkinsfile_parser = JenkinsfileParser(temp_path)
-                            jenkinsfile_model = jenkinsfile_parser.parse()
-                            
-                            # 将 Jenkinsfile 解析结果转换为流水线结构
-                            jenkinsfile_dict = jenkinsfile_model.to_dict()
-                            pipeline_structure['stages'] = jenkinsfile_dict.get('stages', [])
-                            pipeline_structure['script'] = script.text
-                            
-                            # 删除临时文件
-                            os.unlink(temp_path)
-                            
-                            logger.info(f"从 Jenkinsfile 中获取到 {len(pipeline_structure.get('stages', []))} 个阶段")
-            except Exception as e:
-                logger.warning(f"从 config.xml 获取 Jenkinsfile 失败: {str(e)}")
-        
-        # 方法5: 如果是 Freestyle 项目，尝试从构建步骤中提取信息
-        if not pipeline_structure.get('stages'):
-            try:
-                job_config_url = f"{self.jenkins_url}/job/{job_path}/config.xml"
-                job_config_response = requests.get(job_config_url, auth=self.auth, verify=False)
-                logger.info(f"请求 {job_config_url} ")
-                if job_config_response.status_code == 200:
-                    import xml.etree.ElementTree as ET
-                    
-                    # 解析 XML
-                    root = ET.fromstring(job_config_response.content)
-                    logger.info(f"请求结果 {job_config_response} ")
-                    # 检查是否是 Freestyle 项目
-                    project_class = root.tag
-                    if project_class == 'project':
-                        logger.info("检测到 Freestyle 项目，尝试提取构建步骤")
-                        
-                        # 提取构建步骤
-                        builders = root.find(".//builders")
-                        if builders is not None:
-                            # 创建一个模拟的流水线结构
-                            pipeline_structure = {
-                                'name': job_path.split('/')[-1],
-                                'stages': [{
-                                    'name': 'Build',
-                                    'steps': []
-                                }]
-                            }
-                            
-                            # 提取 shell 步骤
-                            for shell in builders.findall(".//hudson.tasks.Shell"):
-                                command = shell.find("./command")
-                                if command is not None and command.text:
-                                    pipeline_structure['stages'][0]['steps'].append({
-                                        'name': 'Shell',
-                                        'type': 'sh',
-                                        'command': command.text
-                                    })
-                            
-                            # 提取 Maven 步骤
-                            for maven in builders.findall(".//hudson.tasks.Maven"):
-                                targets = maven.find("./targets")
-                                if targets is not None and targets.text:
-                                    pipeline_structure['stages'][0]['steps'].append({
-                                        'name': 'Maven',
-                                        'type': 'maven',
-                                        'command': targets.text
-                                    })
-                            
-                            logger.info(f"从 Freestyle 项目中提取到 {len(pipeline_structure['stages'][0]['steps'])} 个构建步骤")
-            except Exception as e:
-                logger.warning(f"从 Freestyle 项目提取构建步骤失败: {str(e)}")
-        
-        # 如果仍然没有获取到阶段信息，添加一个空的阶段结构
-        if not pipeline_structure:
-            pipeline_structure = {
-                'name': job_path.split('/')[-1],
-                'stages': []
-            }
-        
-        # 获取参数信息
-        try:
-            job_info_url = f"{self.jenkins_url}/job/{job_path}/api/json?tree=property[parameterDefinitions[name,defaultValue,description]]"
-            job_info = self._make_request("GET", job_info_url)
-            
-            if job_info and 'property' in job_info:
-                parameters = []
-                for prop in job_info['property']:
-                    if 'parameterDefinitions' in prop:
-                        for param in prop['parameterDefinitions']:
-                            parameters.append({
-                                'name': param.get('name', ''),
-                                'default': param.get('defaultValue', ''),
-                                'description': param.get('description', '')
-                            })
-                
-                pipeline_structure['parameters'] = parameters
-                logger.info(f"获取到 {len(parameters)} 个参数")
-        except Exception as e:
-            logger.warning(f"获取参数信息失败: {str(e)}")
-        
-        return pipeline_structure
-
     def _normalize_job_path(self, job_name):
         """
         规范化任务路径
@@ -662,13 +635,46 @@ class JenkinsClient:
         log_url = f"{base_url}/nodes/{node_id}/steps/{step_id}/log"
         
         try:
-            response = requests.get(log_url, auth=self.auth, verify=False)
-            response.raise_for_status()
-            return response.text
+            return self._read_log(log_url)
         except Exception as e:
             logger.error(f"获取步骤日志失败: {str(e)}")
             return ""
     
+    def _read_log(self, url):
+        """
+        流式读取日志，只保留日志读取器需要的部分
+        
+        有磁盘缓存时保存截取后的日志和响应的校验信息，重新运行时发送条件请求，
+        日志未变化（304 或校验信息相同）时直接使用缓存，不再读取响应内容。
+        
+        Args:
+            url: 日志 URL
+            
+        Returns:
+            str: 截取后的日志
+        """
+        cache_key = self.log_reader.cache_key(url)
+        entry = self.http_cache.get(cache_key) if self.http_cache is not None else None
+        headers = self.http_cache.conditional_headers(entry) if entry is not None else None
+        
+        response = self._get(url, stream=True, headers=headers)
+        try:
+            if entry is not None and (response.status_code == 304 or
+                                      (response.status_code == 200 and self.http_cache.unchanged(entry, response.headers))):
+                with self._stats_lock:
+                    self.request_stats['revalidated'] += 1
+                logger.debug(f"日志未变化，使用磁盘缓存: {url}")
+                return bytes(entry['body']).decode('utf-8')
+            
+            response.raise_for_status()
+            log = self.log_reader.read(response)
+        finally:
+            response.close()
+        
+        if self.http_cache is not None:
+            self.http_cache.store(cache_key, response.headers, log.encode('utf-8'), 'utf-8')
+        return log
+    
     def extract_pipeline_structure(self, job_name):
         """
         提取流水线结构
@@ -685,26 +691,9 @@ class JenkinsClient:
         # 获取流水线阶段信息
         stages = self.get_pipeline_stages(job_name)
         
-        # 获取 Job 信息
-        job_info = self.get_job_info(job_name)
-        
-        # 提取参数
-        parameters = []
-        if job_info and 'property' in job_info:
-            for prop in job_info.get('property', []):
-                if 'parameterDefinitions' in prop:
-                    for param in prop.get('parameterDefinitions', []):
-                        param_name = param.get('name')
-                        param_default = param.get('defaultValue', '')
-                        param_description = param.get('description', '')
-                        param_type = param.get('type', 'string')
-                        
-                        parameters.append({
-                            'name': param_name,
-                            'default': param_default,
-                            'description': param_description,
-                            'type': param_type
-                        })
+        # 获取 Job 元数据并提取参数
+        metadata = self.get_job_metadata(job_name)
+        parameters = metadata['parameters'] if metadata else []
         
         # 构建流水线结构
         pipeline_structure = {
@@ -878,6 +867,21 @@ class JenkinsClient:
         """
         获取流水线结构
         
+        同一个 Job 的提取过程共用一个请求缓存，多个策略重复读取的资源只请求一次。
+        
+        Args:
+            job_name: Job 名称
+            
+        Returns:
+            dict: 流水线结构
+        """
+        with self.request_cache_scope():
+            return self._get_pipeline_structure(job_name)
+    
+    def _get_pipeline_structure(self, job_name):
+        """
+        按 Job 类型和服务器能力选出的策略依次尝试获取流水线结构
+        
         Args:
             job_name: Job 名称
             
@@ -889,22 +893,28 @@ class JenkinsClient:
         # 规范化 job_name
         job_path = self._normalize_job_path(job_name)
         
+        # 根据 Job 类型和服务器能力选择提取策略，跳过注定失败的请求
+        metadata = self.get_job_metadata(job_path) or {}
+        strategies = select_strategies(metadata.get('_class'), self.get_server_capabilities())
+        logger.info(f"Job 类型: {metadata.get('_class') or '未知'}，提取策略: {', '.join(strategies)}")
+        
         # 尝试多种方式获取流水线结构
         pipeline_structure = {}
         
-        # 方法1: 使用 wfapi/describe 端点
-        try:
-            api_url = f"{self.jenkins_url}/job/{job_path}/wfapi/describe"
-            logger.info(f"尝试从 wfapi/describe 获取流水线结构: {api_url}")
-            response = self._make_request("GET", api_url)
-            if response and 'stages' in response:
-                pipeline_structure = response
-                logger.info(f"从 wfapi/describe 获取到 {len(response.get('stages', []))} 个阶段")
-        except Exception as e:
-            logger.warning(f"从 wfapi/describe 获取流水线结构失败: {str(e)}")
+        # 方法1: 使用 wfapi/describe 端点（需要 Pipeline Stage View 插件）
+        if STRATEGY_WFAPI in strategies:
+            try:
+                api_url = f"{self.jenkins_url}/job/{job_path}/wfapi/describe"
+                logger.info(f"尝试从 wfapi/describe 获取流水线结构: {api_url}")
+                response = self._make_request("GET", api_url)
+                if response and 'stages' in response:
+                    pipeline_structure = response
+                    logger.info(f"从 wfapi/describe 获取到 {len(response.get('stages', []))} 个阶段")
+            except Exception as e:
+                logger.warning(f"从 wfapi/describe 获取流水线结构失败: {str(e)}")
         
         # 方法2: 如果没有获取到阶段信息，尝试从最后一次构建中获取
-        if not pipeline_structure.get('stages'):
+        if STRATEGY_WFAPI in strategies and not pipeline_structure.get('stages'):
             try:
                 api_url = f"{self.jenkins_url}/job/{job_path}/lastBuild/wfapi/describe"
                 logger.info(f"尝试从最后一次构建中获取流水线结构: {api_url}")
@@ -917,16 +927,14 @@ class JenkinsClient:
                 logger.warning(f"从最后一次构建中获取流水线结构失败: {str(e)}")
         
         # 方法3: 如果仍然没有获取到阶段信息，尝试从 Blue Ocean API 获取
-        if not pipeline_structure.get('stages'):
+        if STRATEGY_BLUE_OCEAN in strategies and not pipeline_structure.get('stages'):
             try:
                 # 获取最后一次构建编号
-                job_info_url = f"{self.jenkins_url}/job/{job_path}/api/json"
-                logger.info(f"尝试从 Blue Ocean API 获取流水线结构: {job_info_url}")
-                job_info = self._make_request("GET", job_info_url)
-                last_build_number = job_info.get('lastBuild', {}).get('number', 1)
+                logger.info(f"尝试从 Blue Ocean API 获取流水线结构: {job_path}")
+                last_build_number = metadata.get('last_build_number') or 1
                 
                 # 使用 Blue Ocean API
-                blue_ocean_url = f"{self.jenkins_url}/blue/rest/organizations/jenkins/pipelines/{job_path.replace('job/', '')}/runs/{last_build_number}"
+                blue_ocean_url = blue_ocean_run_url(self.jenkins_url, job_path, last_build_number)
                 blue_ocean_data = self._make_request("GET", blue_ocean_url)
                 
                 if blue_ocean_data:
@@ -941,160 +949,38 @@ class JenkinsClient:
                     nodes = self._make_request("GET", nodes_url)
                     
                     if nodes:
-                        for node in nodes:
-                            if node.get('type') == 'STAGE':
-                                stage = {
-                                    'name': node.get('displayName', ''),
-                                    'steps': []
-                                }
-                                
-                                # 获取阶段步骤
-                                steps_url = f"{blue_ocean_url}/nodes/{node.get('id')}/steps"
-                                steps_response = requests.get(steps_url, auth=self.auth, verify=False)
-                                
-                                if steps_response.status_code == 200:
-                                    steps = steps_response.json()
-                                    for step in steps:
-                                        # 修改这一行，传递正确的参数
-                                        log = self._get_step_log(blue_ocean_url, node.get('id'), step.get('id'))
-                                        stage['steps'].append({
-                                            'name': step.get('displayName', ''),
-                                            'log': log
-                                        })
-                                
-                                pipeline_structure['stages'].append(stage)
+                        # 并发获取各阶段的步骤和日志，结果按原始顺序组装
+                        pipeline_structure['stages'] = self._fetch_blue_ocean_stages(blue_ocean_url, nodes)
                         
                         logger.info(f"从 Blue Ocean API 获取到 {len(pipeline_structure.get('stages', []))} 个阶段")
             except Exception as e:
                 logger.warning(f"从 Blue Ocean API 获取流水线结构失败: {str(e)}")
         
         # 方法4: 如果仍然没有获取到阶段信息，尝试从 config.xml 中获取 Jenkinsfile
-        if not pipeline_structure.get('stages'):
+        if STRATEGY_CONFIG_SCRIPT in strategies and not pipeline_structure.get('stages'):
             try:
                 config_url = f"{self.jenkins_url}/job/{job_path}/config.xml"
                 logger.info(f"尝试从 config.xml 获取 Jenkinsfile: {config_url}")
                 config_xml = self._make_request("GET", config_url, as_json=False)
                 
                 if config_xml:
-                    import xml.etree.ElementTree as ET
-                    import tempfile
-                    import os
-                    
-                    # 解析 XML
-                    root = ET.fromstring(config_xml)
-                    
-                    # 查找 definition 元素
-                    definition = root.find(".//definition")
-                    if definition is not None:
-                        # 查找 script 元素
-                        script = definition.find(".//script")
-                        if script is not None and script.text:
-                            logger.info("从 config.xml 中提取到 Jenkinsfile 内容")
-                            
-                            # 将 Jenkinsfile 内容保存到临时文件
-                            with tempfile.NamedTemporaryFile(suffix='.jenkinsfile', delete=False) as temp:
-                                temp.write(script.text.encode('utf-8'))
-                                temp_path = temp.name
-                            
-                            # 使用 Jenkinsfile 解析器解析流水线结构
-                            from parsers.jenkins_file_parser import JenkinsfileParser
-                            jenkinsfile_parser = JenkinsfileParser(temp_path)
-                            jenkinsfile_model = jenkinsfile_parser.parse()
-                            
-                            # 将 Jenkinsfile 解析结果转换为流水线结构
-                            jenkinsfile_dict = jenkinsfile_model.to_dict()
-                            pipeline_structure['stages'] = jenkinsfile_dict.get('stages', [])
-                            pipeline_structure['script'] = script.text
-                            
-                            # 删除临时文件
-                            os.unlink(temp_path)
-                            
-                            logger.info(f"从 Jenkinsfile 中获取到 {len(pipeline_structure.get('stages', []))} 个阶段")
+                    script_structure = parse_config_script(config_xml, self.parse_cache)
+                    if script_structure:
+                        pipeline_structure.update(script_structure)
+                        logger.info(f"从 Jenkinsfile 中获取到 {len(pipeline_structure.get('stages', []))} 个阶段")
             except Exception as e:
                 logger.warning(f"从 config.xml 获取 Jenkinsfile 失败: {str(e)}")
         
         # 方法5: 如果是 Freestyle 项目，尝试从构建步骤中提取信息
-        if not pipeline_structure.get('stages'):
+        if STRATEGY_FREESTYLE in strategies and not pipeline_structure.get('stages'):
             try:
                 job_config_url = f"{self.jenkins_url}/job/{job_path}/config.xml"
-                job_config_response = requests.get(job_config_url, auth=self.auth, verify=False)
+                job_config_response = self._get(job_config_url)
                 
                 if job_config_response.status_code == 200:
-                    import xml.etree.ElementTree as ET
-                    
-                    # 解析 XML
-                    root = ET.fromstring(job_config_response.content)
-                    logger.info(f"检测到 Freestyle 项目,内容： {job_config_response.content} ")
-                    # 检查是否是 Freestyle 项目
-                    project_class = root.tag
-                    if project_class == 'project':
-                        logger.info("检测到 Freestyle 项目，尝试提取构建步骤")
-                        pipeline_structure = {
-                            'name': job_name,
-                            '_class': 'FreeStyleProject',
-                            'xml_content': '',
-                            'git_url': '',
-                            'stages': [{
-                                'name': 'Build',
-                                'steps': []
-                            }]
-                        }
-                        # 提取Git URL
-                        scm = root.find(".//scm[@class='hudson.plugins.git.GitSCM']")
-                        if scm is not None:
-                            url_element = scm.find(".//url")
-                            if url_element is not None and url_element.text:
-                                git_url = url_element.text
-                                logger.info(f"从 Freestyle 项目中提取到 Git URL: {git_url}")
-                                # 保存到pipeline_structure中
-                                pipeline_structure['xml_content'] = job_config_response.content.decode('utf-8')
-                                pipeline_structure['git_url'] = git_url
-                        deploy = root.find(".//publishers")
-                        logger.info(f"从 Freestyle 项目中提取到 Deploy: {deploy} ")
-                        if deploy is not None:
-                            # 创建部署阶段
-                            deploy_stage = {
-                                'name': 'Deploy',
-                                'steps': []
-                            }
-                            # 提取 ssh 步骤
-                            execCommands = deploy.findall(".//execCommand")
-                            logger.info(f"从 Freestyle 项目中提取到 Deploy execCommands: {execCommands} ")
-                            for execCommand in execCommands:
-                                logger.info(f"从 Freestyle 项目中提取到 Deploy execCommand: {execCommand.text} ")
-                                if execCommand is not None and execCommand.text:
-                                    deploy_stage['steps'].append({
-                                        'name': 'Deploy',
-                                        'type': 'Deploy',
-                                        'command': execCommand.text
-                                    })
-                        if deploy_stage['steps']:
-                            pipeline_structure['stages'].append(deploy_stage)
-                            logger.info(f"添加了 {len(deploy_stage['steps'])} 个部署步骤到 Deploy 阶段")
-                        # 提取构建步骤
-                        builders = root.find(".//builders")
-                        if builders is not None:
-                            # 提取 shell 步骤
-                            for shell in builders.findall(".//hudson.tasks.Shell"):
-                                command = shell.find("./command")
-                                if command is not None and command.text:
-                                    pipeline_structure['stages'][0]['steps'].append({
-                                        'name': 'Shell',
-                                        'type': 'sh',
-                                        'command': command.text
-                                    })
-                            
-                            # 提取 Maven 步骤
-                            for maven in builders.findall(".//hudson.tasks.Maven"):
-                                targets = maven.find("./targets")
-                                if targets is not None and targets.text:
-                                    pipeline_structure['stages'][0]['steps'].append({
-                                        'name': 'Maven',
-                                        'type': 'maven',
-                                        'command': targets.text
-                                    })
-                            
-                            logger.info(f"从 Freestyle 项目中提取到 {len(pipeline_structure['stages'][0]['steps'])} 个构建步骤")
+                    freestyle_structure = parse_freestyle_config(job_name, job_config_response.content)
+                    if freestyle_structure:
+                        pipeline_structure = freestyle_structure
             except Exception as e:
                 logger.warning(f"从 Freestyle 项目提取构建步骤失败: {str(e)}")
         
@@ -1105,29 +991,65 @@ class JenkinsClient:
                 'stages': []
             }
         
-        # 获取参数信息
+        # 获取参数信息（与构建编号共用同一个元数据请求）
         try:
-            job_info_url = f"{self.jenkins_url}/job/{job_path}/api/json?tree=property[parameterDefinitions[name,defaultValue,description]]"
-            job_info = self._make_request("GET", job_info_url)
-            logger.info(f"获取参数信息: {job_info}")
-            if job_info and 'property' in job_info:
-                parameters = []
-                for prop in job_info['property']:
-                    if 'parameterDefinitions' in prop:
-                        for param in prop['parameterDefinitions']:
-                            parameters.append({
-                                'name': param.get('name', ''),
-                                'default': param.get('defaultValue', ''),
-                                'description': param.get('description', '')
-                            })
-                
+            metadata = self.get_job_metadata(job_path)
+            logger.info(f"获取参数信息: {metadata}")
+            if metadata:
+                parameters = structure_parameters(metadata)
                 pipeline_structure['parameters'] = parameters
                 logger.info(f"获取到 {len(parameters)} 个参数")
         except Exception as e:
             logger.warning(f"获取参数信息失败: {str(e)}")
         
+        # 阶段耗时统计只对 Pipeline 项目可用（需要 Pipeline Stage View 插件）
+        if self.stage_timing_builds and STRATEGY_WFAPI in strategies:
+            pipeline_structure['stage_durations'] = self.get_stage_durations(job_path, self.stage_timing_builds)
+        
         return pipeline_structure
 
+    def get_server_capabilities(self):
+        """
+        获取服务器能力（已安装的插件和可用的 API），首次调用时探测并缓存
+        
+        Returns:
+            dict: 能力名称到是否可用的映射，值为 None 表示未知；探测失败时返回 None
+        """
+        with self._capabilities_lock:
+            if not self._capabilities_probed:
+                self._capabilities = self._probe_capabilities()
+                self._capabilities_probed = True
+            return self._capabilities
+    
+    def _probe_capabilities(self):
+        """
+        探测服务器能力
+        
+        优先读取插件列表；没有权限读取时改为直接探测 Blue Ocean API。
+        
+        Returns:
+            dict: 能力名称到是否可用的映射，探测失败时返回 None
+        """
+        plugins_url = f"{self.jenkins_url}/pluginManager/api/json?tree={PLUGINS_TREE}"
+        logger.info(f"探测 Jenkins 服务器能力: {plugins_url}")
+        
+        try:
+            response = self._get(plugins_url)
+            if response.status_code == 200:
+                capabilities = parse_plugins(response.json())
+                logger.info(f"Jenkins 服务器能力: {capabilities}")
+                return capabilities
+            
+            logger.warning(f"无法读取插件列表: {response.status_code}，改为探测 Blue Ocean API")
+            response = self._get(f"{self.jenkins_url}{BLUE_OCEAN_PROBE_PATH}")
+            blue_ocean = {200: True, 404: False}.get(response.status_code)
+            capabilities = {'wfapi': None, 'blue_ocean': blue_ocean}
+            logger.info(f"Jenkins 服务器能力: {capabilities}")
+            return capabilities
+        except Exception as e:
+            logger.warning(f"探测 Jenkins 服务器能力失败，将尝试所有提取策略: {str(e)}")
+            return None
+
     def _normalize_job_path(self, job_name):
         """
         规范化任务路径
@@ -1138,18 +1060,66 @@ class JenkinsClient:
         Returns:
             str: 规范化后的任务路径
         """
-        # 移除开头的斜杠
-        if job_name.startswith('/'):
-            job_name = job_name[1:]
+        return normalize_job_path(job_name)
+
+    def _fetch_blue_ocean_stages(self, blue_ocean_url, nodes):
+        """
+        并发获取 Blue Ocean 各阶段的步骤和步骤日志
         
-        # 处理嵌套任务路径
-        if '/job/' not in job_name:
-            parts = job_name.split('/')
-            job_path = '/job/'.join(parts)
-        else:
-            job_path = job_name
+        最多同时发出 max_inflight 个请求，结果按节点和步骤的原始顺序组装。
         
-        return job_path
+        Args:
+            blue_ocean_url: Blue Ocean 构建 URL
+            nodes: Blue Ocean 节点列表
+            
+        Returns:
+            list: 阶段列表
+        """
+        stages_to_fetch = stage_nodes(nodes)
+        
+        with ThreadPoolExecutor(max_workers=self.max_inflight) as executor:
+            # 先提交所有阶段的步骤请求
+            steps_futures = [
+                executor.submit(self._get_stage_steps, blue_ocean_url, node.get('id'))
+                for node in stages_to_fetch
+            ]
+            
+            # 每个阶段的步骤返回后立即提交该阶段的日志请求
+            log_futures = []
+            for node, steps_future in zip(stages_to_fetch, steps_futures):
+                log_futures.append([
+                    (step, executor.submit(self._get_step_log, blue_ocean_url, node.get('id'), step.get('id')))
+                    for step in steps_future.result()
+                ])
+            
+            stages = [
+                build_blue_ocean_stage(
+                    node,
+                    [step for step, _ in step_logs],
+                    [log_future.result() for _, log_future in step_logs]
+                )
+                for node, step_logs in zip(stages_to_fetch, log_futures)
+            ]
+        
+        return stages
+    
+    def _get_stage_steps(self, blue_ocean_url, node_id):
+        """
+        获取 Blue Ocean 阶段的步骤列表
+        
+        Args:
+            blue_ocean_url: Blue Ocean 构建 URL
+            node_id: 节点 ID
+            
+        Returns:
+            list: 步骤列表
+        """
+        steps_url = f"{blue_ocean_url}/nodes/{node_id}/steps"
+        steps_response = self._get(steps_url)
+        
+        if steps_response.status_code == 200:
+            return steps_response.json()
+        return []
 
     def _make_request(self, method, url, data=None, as_json=True):
         """
@@ -1164,22 +1134,13 @@ class JenkinsClient:
         Returns:
             dict 或 str: 响应内容
         """
-        import requests
-        import urllib3
-        urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
-        
         headers = {'Content-Type': 'application/json'}
         
         try:
-            response = requests.request(
-                method,
-                url,
-                headers=headers,
-                auth=self.auth,  # 使用用户名和密码认证
-                data=data,
-                verify=False,
-                timeout=30
-            )
+            if method == "GET" and data is None:
+                response = self._get(url, headers=headers)
+            else:
+                response = self._send(method, url, headers=headers, data=data)
             response.raise_for_status()
             
             if as_json:
@@ -1288,87 +1249,125 @@ class JenkinsClient:
         
         return "clean package -Dmaven.test.skip=true"
     
-    def get_job_parameters(self, job_path):
+    def get_stage_durations(self, job_name, builds=10):
         """
-        获取 Job 参数
+        统计最近若干次构建的阶段耗时
         
         Args:
-            job_path: Job 路径
+            job_name: Job 名称
+            builds: 统计的构建次数
             
         Returns:
-            list: 参数列表
+            dict: 阶段名称 -> {samples, p50_ms, p95_ms, max_ms}，获取失败时返回空字典
         """
-        parameters = []
+        job_path = self._normalize_job_path(job_name)
+        url = stage_runs_url(self.jenkins_url, job_path)
+        logger.info(f"获取最近 {builds} 次构建的阶段耗时: {url}")
         
         try:
-            # 构建 API URL
-            api_url = f"{self.jenkins_url}/job/{job_path}/api/json?tree=property[parameterDefinitions[name,defaultParameterValue[value],description,type]]"
-            
-            # 发送请求
-            response = requests.get(api_url, auth=self.auth)
-            
-            # 检查响应状态
+            response = self._get(url)
             if response.status_code != 200:
-                logger.error(f"获取 Job 参数失败: {response.status_code} - {response.text}")
-                return parameters
+                logger.warning(f"获取阶段耗时失败: {response.status_code}")
+                return {}
             
-            # 解析响应
-            job_data = response.json()
+            runs = response.json() or []
+            if builds > len(runs):
+                # Pipeline Stage View 插件默认最多返回最近 10 次构建
+                logger.warning(f"要求统计最近 {builds} 次构建，wfapi/runs 只返回了 {len(runs)} 次，按实际返回的构建统计")
             
-            # 提取参数
-            for prop in job_data.get('property', []):
-                if 'parameterDefinitions' in prop:
-                    for param in prop['parameterDefinitions']:
-                        param_info = {
-                            'name': param.get('name', ''),
-                            'default': param.get('defaultParameterValue', {}).get('value', ''),
-                            'description': param.get('description', ''),
-                            'type': param.get('type', '')
-                        }
-                        parameters.append(param_info)
+            durations = aggregate_stage_durations(runs, builds)
+            logger.info(f"统计了 {len(durations)} 个阶段的耗时")
+            return durations
+        except Exception as e:
+            logger.warning(f"获取阶段耗时失败: {str(e)}")
+            return {}
+    
+    def get_job_parameters(self, job_path):
+        """
+        获取 Job 参数
+        
+        Args:
+            job_path: Job 路径
             
-            return parameters
+        Returns:
+            list: 参数列表
+        """
+        metadata = self.get_job_metadata(job_path)
+        if not metadata:
+            logger.error(f"获取 Job 参数失败: {job_path}")
+            return []
         
-        except Exception as e:
-            logger.error(f"获取 Job 参数时发生错误: {str(e)}")
-            return parameters
+        return metadata['parameters']
             
     def get_job_info(self, job_name):
         """
         获取 Job 信息
         
+        只请求 tree 投影中的字段（类型、最后构建编号、参数定义和 SCM 信息），
+        避免 depth=1 返回完整的构建历史。
+        
         Args:
             job_name: Job 名称
             
         Returns:
             dict: Job 信息
         """
-        url = f"{self.jenkins_url}/job/{job_name}/api/json?pretty=true&depth=1"
+        url = api_url(f"{self.jenkins_url}/job/{self._normalize_job_path(job_name)}", *JOB_METADATA_FIELDS)
         logger.info(f"获取 Job 信息: {url}")
         
-        try:
-            response = requests.get(url, auth=self.auth)
-            response.raise_for_status()
-            job_info = response.json()
+        job_info = self._make_request("GET", url)
+        if job_info is None:
+            logger.error(f"获取 Job 信息失败: {job_name}")
+            return None
+        
+        logger.info(f"作业类型: {job_info.get('_class', '')}")
+        return job_info
+    
+    def get_job_metadata(self, job_name):
+        """
+        获取整理后的 Job 元数据
+        
+        基于 get_job_info 的一次请求，同时提供作业类型、最后构建编号、参数定义和 SCM 信息。
+        
+        Args:
+            job_name: Job 名称
             
-            # 检查作业类型
-            job_class = job_info.get('_class', '')
-            logger.info(f"作业类型: {job_class}")
+        Returns:
+            dict: Job 元数据，获取失败时返回 None
+        """
+        job_info = self.get_job_info(job_name)
+        if job_info is None:
+            return None
+        
+        return normalize_job_metadata(job_info)
+    
+    def list_jobs(self, folder=None):
+        """
+        递归列出 Jenkins 实例或文件夹下的所有 Job
+        
+        每个文件夹只发出一次请求，通过 tree 参数中的 jobs[name] 判断子项是否为文件夹。
+        
+        Args:
+            folder: 起始文件夹路径，为空时从 Jenkins 根目录开始
             
-            # 如果是 Freestyle 项目，获取更多信息
-            if 'FreeStyleProject' in job_class:
-                logger.info("检测到 Freestyle 项目，获取更多信息")
-                # 获取构建步骤信息
-                if 'builds' in job_info and job_info['builds']:
-                    last_build = job_info['builds'][0]
-                    if 'number' in last_build:
-                        build_number = last_build['number']
-                        build_info = self.get_build_info(job_name, build_number)
-                        if build_info:
-                            # 合并构建信息
-                            job_info['lastBuildInfo'] = build_info
+        Returns:
+            list: Job 信息列表，每项包含 name（完整路径）和 _class
+        """
+        jobs = []
+        pending = [folder.strip('/') if folder else '']
+        
+        while pending:
+            current = pending.pop(0)
+            url = list_jobs_url(self.jenkins_url, current)
+            logger.info(f"列出 Job: {url}")
             
-            return job_info
-        except Exception as e:
-            logger.error(f"获取 Job 信息失败: {str(e)}")
-            return None
\ No newline at end of file
+            data = self._make_request("GET", url)
+            if not data:
+                continue
+            
+            folder_jobs, sub_folders = split_folder_items(current, data)
+            jobs.extend(folder_jobs)
+            pending.extend(sub_folders)
+        
+        logger.info(f"共找到 {len(jobs)} 个 Job")
+        return jobs
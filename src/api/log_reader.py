@@ -0,0 +1,204 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+步骤日志流式读取工具
+只保留日志的头部、尾部窗口以及命令标记行，避免超大构建日志一次性读入内存。
+默认只保留头部和命令标记行，找到命令后提前停止读取；需要日志末尾时设置 tail_lines，此时会读到日志结束（或 max_bytes）
+"""
+
+import re
+from collections import deque
+
+# 命令标记行：shell 跟踪输出（+ cmd）和流水线步骤标记（[Pipeline] sh）
+COMMAND_MARKER_PATTERN = re.compile(r'(?:^|>)\s*(?:\+ \S|\[Pipeline\] (?:sh|bat|powershell|echo)\b)')
+
+TRUNCATED_MARKER = "... (日志已截断)"
+
+class BoundedLogReader:
+    """有界日志读取器，按行扫描流式响应并保留头部、尾部和命令标记行"""
+
+    def __init__(self, head_lines=50, tail_lines=0, max_marker_lines=100,
+                 max_bytes=4 * 1024 * 1024, stop_early=True, chunk_size=64 * 1024):
+        """
+        初始化读取器
+
+        Args:
+            head_lines: 保留的头部行数
+            tail_lines: 保留的日志末尾行数，大于 0 时需要读到日志末尾，不会提前停止
+            max_marker_lines: 头部之外最多保留的命令标记行数
+            max_bytes: 最多读取的字节数，超过后停止读取
+            stop_early: 头部已满且找到命令标记行后是否提前停止读取（只在 tail_lines 为 0 时生效）
+            chunk_size: 每次从响应中读取的字节数
+        """
+        self.head_lines = max(0, head_lines)
+        self.tail_lines = max(0, tail_lines)
+        self.max_marker_lines = max(0, max_marker_lines)
+        self.max_bytes = max_bytes
+        # 提前停止时尾部窗口只包含停止位置附近的行，不是日志末尾，因此保留尾部时不提前停止
+        self.stop_early = stop_early and self.tail_lines == 0
+        self.chunk_size = chunk_size
+
+    def cache_key(self, url):
+        """
+        截取结果在 HTTP 缓存中的键，包含截取参数，参数变化后不会复用按旧参数截取的日志
+
+        Args:
+            url: 日志 URL
+
+        Returns:
+            str: 缓存键
+        """
+        return (f"{url}#log:{self.head_lines}:{self.tail_lines}:{self.max_marker_lines}:"
+                f"{self.max_bytes}:{int(self.stop_early)}")
+
+    def window(self, encoding='utf-8'):
+        """
+        创建一次读取使用的日志窗口，调用方逐块写入数据
+
+        Args:
+            encoding: 日志编码
+
+        Returns:
+            LogWindow: 日志窗口
+        """
+        return LogWindow(self, encoding)
+
+    def read(self, response):
+        """
+        从流式响应中读取日志
+
+        Args:
+            response: 以 stream=True 发送的 requests.Response 对象
+
+        Returns:
+            str: 截取后的日志
+        """
+        window = self.window(response.encoding or 'utf-8')
+        for chunk in response.iter_content(chunk_size=self.chunk_size):
+            if window.feed(chunk):
+                break
+        return window.result()
+
+class LogWindow:
+    """单次日志读取的状态：按块接收数据，按行保留需要的内容"""
+
+    def __init__(self, reader, encoding='utf-8'):
+        """
+        初始化日志窗口
+
+        Args:
+            reader: BoundedLogReader 配置
+            encoding: 日志编码
+        """
+        self.reader = reader
+        self.encoding = encoding
+        self.head = []
+        self.markers = []
+        self.tail = deque(maxlen=reader.tail_lines)
+        self.bytes_read = 0
+        self.line_count = 0
+        self.found_marker = False
+        self.truncated = False
+        self._pending = b''
+        self._received = False
+
+    def feed(self, chunk):
+        """
+        写入一块数据
+
+        Args:
+            chunk: 字节数据
+
+        Returns:
+            bool: 是否已获得足够内容，可以停止读取
+        """
+        if self.truncated:
+            return True
+        if not chunk:
+            return False
+
+        self._received = True
+        self._pending += chunk
+        lines = self._pending.split(b'\n')
+        self._pending = lines.pop()
+        for line in lines:
+            if self._add_line(line):
+                return True
+
+        # 没有换行的超长行按块切分，保证内存有界
+        while len(self._pending) > self.reader.chunk_size:
+            line = self._pending[:self.reader.chunk_size]
+            self._pending = self._pending[self.reader.chunk_size:]
+            if self._add_line(line):
+                return True
+
+        return False
+
+    def result(self):
+        """
+        结束读取并返回截取后的日志
+
+        按原始顺序合并保留的行，不连续处插入截断标记。
+
+        Returns:
+            str: 截取后的日志
+        """
+        # 以换行结尾时补一个空行，未截断的日志可以原样还原
+        if not self.truncated and self._received:
+            self._add_line(self._pending)
+            self._pending = b''
+            self._received = False
+
+        kept = dict(self.head)
+        kept.update(self.markers)
+        kept.update(self.tail)
+
+        output = []
+        previous = -1
+        for index in sorted(kept):
+            if index != previous + 1:
+                output.append(TRUNCATED_MARKER)
+            output.append(kept[index])
+            previous = index
+
+        if self.truncated:
+            output.append(TRUNCATED_MARKER)
+
+        return '\n'.join(output)
+
+    def _add_line(self, raw_line):
+        """
+        处理一行日志
+
+        Args:
+            raw_line: 不含换行符的字节行
+
+        Returns:
+            bool: 是否可以停止读取
+        """
+        reader = self.reader
+        self.bytes_read += len(raw_line) + 1
+        line = raw_line.decode(self.encoding, errors='replace').rstrip('\r')
+        index = self.line_count
+        self.line_count += 1
+
+        is_marker = COMMAND_MARKER_PATTERN.search(line) is not None
+        self.found_marker = self.found_marker or is_marker
+
+        if index < reader.head_lines:
+            self.head.append((index, line))
+        else:
+            if is_marker and len(self.markers) < reader.max_marker_lines:
+                self.markers.append((index, line))
+            if reader.tail_lines:
+                self.tail.append((index, line))
+
+        if reader.max_bytes and self.bytes_read >= reader.max_bytes:
+            self.truncated = True
+
+        # 步骤类型识别只依赖头部和第一条命令，满足后不再继续读取
+        elif reader.stop_early and self.found_marker and index >= reader.head_lines:
+            self.truncated = True
+
+        return self.truncated
@@ -0,0 +1,313 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+流水线结构解析辅助函数
+与网络请求无关的纯函数，由同步 JenkinsClient 和异步 AsyncJenkinsClient 共用
+"""
+
+import os
+import tempfile
+from utils.logger import logger
+from models.xml_document import XmlDocument, CONVERTIBLE_BUILDER_TYPES
+
+# 列出文件夹子项的 tree 投影
+LIST_JOBS_TREE = 'jobs[name,_class,jobs[name]]'
+
+def normalize_job_path(job_name):
+    """
+    规范化任务路径
+
+    Args:
+        job_name: Jenkins 任务名称
+
+    Returns:
+        str: 规范化后的任务路径
+    """
+    # 移除开头的斜杠
+    if job_name.startswith('/'):
+        job_name = job_name[1:]
+
+    # 处理嵌套任务路径
+    if '/job/' not in job_name:
+        parts = job_name.split('/')
+        job_path = '/job/'.join(parts)
+    else:
+        job_path = job_name
+
+    return job_path
+
+def normalize_job_metadata(job_info):
+    """
+    整理 Job 元数据
+
+    Args:
+        job_info: 带 JOB_METADATA_FIELDS 投影的 api/json 响应
+
+    Returns:
+        dict: 包含 _class、name、last_build_number、parameters 和 scm 的元数据
+    """
+    # 参数定义
+    parameters = []
+    for prop in job_info.get('property') or []:
+        for param in prop.get('parameterDefinitions') or []:
+            parameters.append({
+                'name': param.get('name', ''),
+                'default': (param.get('defaultParameterValue') or {}).get('value', ''),
+                'description': param.get('description', ''),
+                'type': param.get('type', '')
+            })
+
+    # SCM 信息（仅 Freestyle 等直接配置 SCM 的项目可用）
+    scm = {}
+    scm_info = job_info.get('scm') or {}
+    remote_configs = scm_info.get('userRemoteConfigs') or []
+    branches = scm_info.get('branches') or []
+    if remote_configs and remote_configs[0].get('url'):
+        scm['url'] = remote_configs[0]['url']
+    if branches and branches[0].get('name'):
+        scm['branch'] = branches[0]['name'].replace('*/', '').replace('origin/', '')
+
+    return {
+        '_class': job_info.get('_class', ''),
+        'name': job_info.get('name', ''),
+        'last_build_number': (job_info.get('lastBuild') or {}).get('number'),
+        'parameters': parameters,
+        'scm': scm
+    }
+
+def structure_parameters(metadata):
+    """
+    生成流水线结构中的参数列表
+
+    Args:
+        metadata: normalize_job_metadata 返回的元数据
+
+    Returns:
+        list: 参数列表，每项包含 name、default 和 description
+    """
+    return [
+        {
+            'name': param['name'],
+            'default': param['default'],
+            'description': param['description']
+        }
+        for param in metadata['parameters']
+    ]
+
+def blue_ocean_run_url(jenkins_url, job_path, build_number):
+    """
+    生成 Blue Ocean 构建 URL
+
+    Args:
+        jenkins_url: Jenkins 服务器 URL
+        job_path: 规范化后的任务路径
+        build_number: 构建编号
+
+    Returns:
+        str: Blue Ocean 构建 URL
+    """
+    return f"{jenkins_url}/blue/rest/organizations/jenkins/pipelines/{job_path.replace('job/', '')}/runs/{build_number}"
+
+def stage_nodes(nodes):
+    """
+    过滤出 Blue Ocean 节点中的阶段节点
+
+    Args:
+        nodes: Blue Ocean 节点列表
+
+    Returns:
+        list: 阶段节点列表
+    """
+    return [node for node in nodes if node.get('type') == 'STAGE']
+
+def build_blue_ocean_stage(node, steps, logs):
+    """
+    组装 Blue Ocean 阶段
+
+    Args:
+        node: 阶段节点
+        steps: 阶段的步骤列表
+        logs: 与 steps 一一对应的步骤日志
+
+    Returns:
+        dict: 阶段信息
+    """
+    return {
+        'name': node.get('displayName', ''),
+        'steps': [
+            {
+                'name': step.get('displayName', ''),
+                'log': log
+            }
+            for step, log in zip(steps, logs)
+        ]
+    }
+
+def parse_config_script(config_xml, parse_cache=None):
+    """
+    从 config.xml 中提取内联 Jenkinsfile 并解析阶段
+
+    Args:
+        config_xml: config.xml 内容
+        parse_cache: 可选的 ParseCache 解析结果缓存
+
+    Returns:
+        dict: 包含 stages 和 script 的结构，未找到内联脚本时返回 None
+    """
+    # 解析 XML
+    root = XmlDocument.from_string(config_xml).root
+
+    # 查找 definition 元素
+    definition = root.find(".//definition")
+    if definition is None:
+        return None
+
+    # 查找 script 元素
+    script = definition.find(".//script")
+    if script is None or not script.text:
+        return None
+
+    logger.info("从 config.xml 中提取到 Jenkinsfile 内容")
+
+    # 内容未变化时直接使用缓存的解析结果，不再写临时文件
+    jenkinsfile_model = parse_cache.get(script.text) if parse_cache is not None else None
+    if jenkinsfile_model is None:
+        # 将 Jenkinsfile 内容保存到临时文件
+        with tempfile.NamedTemporaryFile(suffix='.jenkinsfile', delete=False) as temp:
+            temp.write(script.text.encode('utf-8'))
+            temp_path = temp.name
+
+        try:
+            # 使用 Jenkinsfile 解析器解析流水线结构
+            from parsers.jenkins_file_parser import JenkinsfileParser
+            jenkinsfile_parser = JenkinsfileParser(temp_path)
+            jenkinsfile_model = jenkinsfile_parser.parse()
+        finally:
+            # 删除临时文件
+            os.unlink(temp_path)
+
+        if parse_cache is not None:
+            parse_cache.put(script.text, jenkinsfile_model)
+
+    # 将 Jenkinsfile 解析结果转换为流水线结构
+    jenkinsfile_dict = jenkinsfile_model.to_dict()
+    return {
+        'stages': jenkinsfile_dict.get('stages', []),
+        'script': script.text
+    }
+
+def parse_freestyle_config(job_name, content):
+    """
+    从 Freestyle 项目的 config.xml 中提取构建和部署步骤
+
+    Args:
+        job_name: Job 名称
+        content: config.xml 原始字节内容
+
+    Returns:
+        dict: 流水线结构，不是 Freestyle 项目时返回 None
+    """
+    # 解析 XML，解析结果在进程内共享，后续解析器和转换器不再重复解析
+    document = XmlDocument.from_string(content)
+    logger.info(f"获取到 config.xml，大小: {len(content)} 字节")
+
+    # 检查是否是 Freestyle 项目
+    if document.tag != 'project':
+        return None
+
+    logger.info("检测到 Freestyle 项目，尝试提取构建步骤")
+    pipeline_structure = {
+        'name': job_name,
+        '_class': 'FreeStyleProject',
+        'xml_content': '',
+        'git_url': '',
+        'stages': [{
+            'name': 'Build',
+            'steps': []
+        }]
+    }
+
+    # 提取Git URL
+    git_url = document.git_url
+    if git_url:
+        logger.info(f"从 Freestyle 项目中提取到 Git URL: {git_url}")
+        # 保存到pipeline_structure中
+        pipeline_structure['xml_content'] = document.text
+        pipeline_structure['git_url'] = git_url
+
+    # 单次遍历提取 builders 和 publishers 中所有已注册类型的步骤
+    deploy_stage = {
+        'name': 'Deploy',
+        'steps': []
+    }
+    for step in document.steps:
+        if not step['command']:
+            continue
+        if step['section'] == 'publishers':
+            # 提取 ssh 步骤
+            if step['type'] == 'ssh':
+                logger.info(f"从 Freestyle 项目中提取到 Deploy execCommand: {step['command']} ")
+                deploy_stage['steps'].append({
+                    'name': 'Deploy',
+                    'type': 'Deploy',
+                    'command': step['command']
+                })
+        elif step['type'] not in CONVERTIBLE_BUILDER_TYPES:
+            logger.warning(f"Freestyle 构建步骤 {step['name']} 暂不支持转换，已跳过")
+        else:
+            # 构建步骤按文档顺序，与 JenkinsApiParser 生成的构建步骤一致
+            pipeline_structure['stages'][0]['steps'].append({
+                'name': step['name'],
+                'type': step['type'],
+                'command': step['command']
+            })
+
+    if deploy_stage['steps']:
+        pipeline_structure['stages'].append(deploy_stage)
+        logger.info(f"添加了 {len(deploy_stage['steps'])} 个部署步骤到 Deploy 阶段")
+
+    logger.info(f"从 Freestyle 项目中提取到 {len(pipeline_structure['stages'][0]['steps'])} 个构建步骤")
+
+    return pipeline_structure
+
+def list_jobs_url(jenkins_url, folder):
+    """
+    生成列出文件夹子项的 URL
+
+    Args:
+        jenkins_url: Jenkins 服务器 URL
+        folder: 文件夹路径，为空时表示 Jenkins 根目录
+
+    Returns:
+        str: api/json URL
+    """
+    if folder:
+        return f"{jenkins_url}/job/{normalize_job_path(folder)}/api/json?tree={LIST_JOBS_TREE}"
+    return f"{jenkins_url}/api/json?tree={LIST_JOBS_TREE}"
+
+def split_folder_items(folder, data):
+    """
+    将文件夹子项分为 Job 和子文件夹
+
+    Args:
+        folder: 当前文件夹路径
+        data: 文件夹 api/json 响应
+
+    Returns:
+        tuple: (Job 信息列表, 子文件夹路径列表)
+    """
+    jobs = []
+    folders = []
+    for item in data.get('jobs', []):
+        item_path = f"{folder}/{item.get('name')}" if folder else item.get('name')
+
+        # 含有 jobs 字段的是文件夹（包括多分支流水线），继续向下遍历
+        if 'jobs' in item:
+            folders.append(item_path)
+        else:
+            jobs.append({
+                'name': item_path,
+                '_class': item.get('_class', '')
+            })
+    return jobs, folders
@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+阶段耗时统计
+汇总 wfapi/runs 返回的最近若干次构建的阶段耗时，计算每个阶段的 p50/p95
+"""
+
+import math
+
+def stage_runs_url(jenkins_url, job_path):
+    """
+    生成最近构建列表（含阶段耗时）的 URL
+
+    Pipeline Stage View 插件默认最多返回最近 10 次构建。
+
+    Args:
+        jenkins_url: Jenkins 服务器 URL
+        job_path: 规范化后的任务路径
+
+    Returns:
+        str: wfapi/runs URL
+    """
+    return f"{jenkins_url}/job/{job_path}/wfapi/runs"
+
+def percentile(values, pct):
+    """
+    计算百分位数（最近秩法）
+
+    Args:
+        values: 数值列表
+        pct: 百分位，0-100
+
+    Returns:
+        数值，列表为空时返回 None
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+def aggregate_stage_durations(runs, builds=10):
+    """
+    汇总最近若干次已完成构建的阶段耗时
+
+    阶段耗时为 durationMillis 减去等待人工输入的 pauseDurationMillis。
+
+    Args:
+        runs: wfapi/runs 返回的构建列表，按时间从新到旧排列
+        builds: 最多统计的构建次数
+
+    Returns:
+        dict: 阶段名称 -> {samples, p50_ms, p95_ms, max_ms}，按阶段首次出现的顺序排列
+    """
+    samples = {}
+    counted = 0
+    for run in runs or []:
+        if counted >= builds:
+            break
+        # 进行中的构建阶段耗时不完整
+        if run.get('status') in ('IN_PROGRESS', 'NOT_EXECUTED', 'PAUSED_PENDING_INPUT'):
+            continue
+        counted += 1
+
+        for stage in run.get('stages') or []:
+            name = stage.get('name')
+            duration = stage.get('durationMillis')
+            if not name or duration is None or stage.get('status') == 'NOT_EXECUTED':
+                continue
+            active = max(0, duration - (stage.get('pauseDurationMillis') or 0))
+            samples.setdefault(name, []).append(active)
+
+    return {
+        name: {
+            'samples': len(values),
+            'p50_ms': percentile(values, 50),
+            'p95_ms': percentile(values, 95),
+            'max_ms': max(values)
+        }
+        for name, values in samples.items()
+    }
@@ -0,0 +1,394 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Jenkins 请求节流工具
+提供所有工作线程共享的自适应令牌桶限流、带抖动的指数退避重试以及熔断器，
+避免批量迁移时压垮正在运行构建的 Jenkins 控制器
+"""
+
+import time
+import random
+import asyncio
+import threading
+from collections import deque
+from email.utils import parsedate_to_datetime
+import requests
+from utils.logger import logger
+
+# 服务端表示过载、可以稍后重试的状态码
+THROTTLED_STATUS_CODES = (429, 503)
+
+# 可重试的服务端错误状态码
+RETRYABLE_STATUS_CODES = (429, 500, 502, 503, 504)
+
+# 幂等方法，网络错误和 5xx 时可以安全重试
+IDEMPOTENT_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+class RateLimiter:
+    """自适应令牌桶限流器：收到 429/503 时降低速率，请求成功后逐步恢复"""
+
+    def __init__(self, rate, burst=None, min_rate=0.5, recovery_step=0.1):
+        """
+        初始化限流器
+
+        Args:
+            rate: 每秒允许的最大请求数
+            burst: 令牌桶容量，默认与 rate 相同
+            min_rate: 降速后的最低速率
+            recovery_step: 每次成功请求恢复的速率
+        """
+        self.max_rate = float(rate)
+        self.rate = self.max_rate
+        self.burst = float(burst or max(1.0, rate))
+        self.min_rate = min(float(min_rate), self.max_rate)
+        self.recovery_step = recovery_step
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """
+        预留一个令牌
+
+        Returns:
+            float: 调用方需要等待的秒数
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self):
+        """获取一个令牌，必要时阻塞等待"""
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    def penalize(self):
+        """服务端过载时速率减半"""
+        with self._lock:
+            new_rate = max(self.min_rate, self.rate / 2)
+            if new_rate < self.rate:
+                logger.warning(f"Jenkins 负载过高，请求速率降低到 {new_rate:.2f} 次/秒")
+            self.rate = new_rate
+
+    def reward(self):
+        """请求成功后线性恢复速率"""
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.recovery_step)
+
+class CircuitBreaker:
+    """
+    熔断器：滑动窗口内错误率过高时暂停所有请求，冷却后进入半开状态，只放行一个试探请求，
+    其余请求等待试探结果：成功则关闭熔断器，失败则重新冷却
+    """
+
+    def __init__(self, window_size=20, min_requests=10, error_threshold=0.5, cooldown=30, probe_interval=0.5):
+        """
+        初始化熔断器
+
+        Args:
+            window_size: 统计错误率的最近请求数
+            min_requests: 开始判断错误率前需要的最少请求数
+            error_threshold: 触发熔断的错误率
+            cooldown: 熔断后的冷却时间（秒）；试探请求超过这个时间仍未记录结果时放行新的试探请求
+            probe_interval: 半开状态下其余请求查询试探结果的间隔（秒）
+        """
+        self.window_size = window_size
+        self.min_requests = min_requests
+        self.error_threshold = error_threshold
+        self.cooldown = cooldown
+        self.probe_interval = probe_interval
+        self._results = deque(maxlen=window_size)
+        self._opened_at = None
+        # 半开状态下试探请求的放行时间，没有试探请求时为 None
+        self._probe_started = None
+        self._lock = threading.Lock()
+
+    def wait_time(self):
+        """
+        获取发送请求前还需等待的时间；半开状态下返回 0 的调用方即为试探请求，之后必须调用 record
+
+        Returns:
+            float: 需要等待的秒数，0 表示可以发送请求
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return 0.0
+            now = time.monotonic()
+            remaining = self._opened_at + self.cooldown - now
+            if remaining > 0:
+                return remaining
+            if self._probe_started is None or now - self._probe_started >= self.cooldown:
+                self._probe_started = now
+                return 0.0
+            return self.probe_interval
+
+    def wait(self):
+        """熔断期间阻塞等待，直到冷却结束并且本次请求被放行（作为试探请求或熔断器已关闭）"""
+        delay = self.wait_time()
+        if delay > 0:
+            logger.info(f"熔断器已打开，暂停请求 {delay:.1f} 秒")
+        while delay > 0:
+            time.sleep(delay)
+            delay = self.wait_time()
+
+    def record(self, success):
+        """
+        记录请求结果
+
+        Args:
+            success: 请求是否成功
+        """
+        with self._lock:
+            if self._opened_at is not None:
+                # 没有试探请求时是熔断前发出的请求的结果，不影响熔断状态
+                if self._probe_started is None:
+                    return
+                # 试探请求的结果：成功则关闭熔断器，失败则重新冷却
+                self._probe_started = None
+                if success:
+                    logger.info("Jenkins 恢复正常，熔断器关闭")
+                    self._opened_at = None
+                    self._results.clear()
+                else:
+                    self._opened_at = time.monotonic()
+                return
+
+            self._results.append(success)
+            if len(self._results) < self.min_requests:
+                return
+
+            error_rate = self._results.count(False) / len(self._results)
+            if error_rate >= self.error_threshold:
+                logger.warning(f"最近 {len(self._results)} 个请求错误率 {error_rate:.0%}，熔断 {self.cooldown} 秒")
+                self._opened_at = time.monotonic()
+
+class RetryPolicy:
+    """带抖动的指数退避重试策略，优先遵循服务端返回的 Retry-After"""
+
+    def __init__(self, max_retries=3, backoff_base=1.0, backoff_max=60.0):
+        """
+        初始化重试策略
+
+        Args:
+            max_retries: 最大重试次数
+            backoff_base: 首次退避的基准时间（秒）
+            backoff_max: 单次退避的最长时间（秒）
+        """
+        self.max_retries = max(0, max_retries)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+    def should_retry(self, method, response=None, transient_error=False):
+        """
+        判断请求是否需要重试
+
+        Args:
+            method: HTTP 方法
+            response: 响应对象，请求异常时为空
+            transient_error: 请求异常是否为网络错误或超时
+
+        Returns:
+            bool: 是否重试
+        """
+        if response is None:
+            return transient_error and method in IDEMPOTENT_METHODS
+        if response.status_code in THROTTLED_STATUS_CODES:
+            return True
+        return method in IDEMPOTENT_METHODS and response.status_code in RETRYABLE_STATUS_CODES
+
+    def delay(self, attempt, response=None):
+        """
+        计算第 attempt 次重试前的等待时间
+
+        Args:
+            attempt: 重试序号，从 0 开始
+            response: 上一次的响应对象
+
+        Returns:
+            float: 等待秒数
+        """
+        retry_after = self._parse_retry_after(response)
+        if retry_after is not None:
+            return min(self.backoff_max, retry_after)
+        # Full Jitter：在 [0, base * 2^attempt] 内随机等待，避免所有工作线程同时重试
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _parse_retry_after(self, response):
+        """
+        解析 Retry-After 响应头（秒数或 HTTP 日期）
+
+        Args:
+            response: 响应对象
+
+        Returns:
+            float: 等待秒数，未提供时返回 None
+        """
+        if response is None:
+            return None
+
+        value = response.headers.get('Retry-After')
+        if not value:
+            return None
+
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+class RequestThrottle:
+    """组合限流、熔断和重试，由所有工作线程共享"""
+
+    def __init__(self, rate_limit=None, max_retries=3, circuit_breaker=None, retry_policy=None):
+        """
+        初始化请求节流器
+
+        Args:
+            rate_limit: 每秒最大请求数，为空或 0 时不限速
+            max_retries: 最大重试次数
+            circuit_breaker: 熔断器，默认使用 CircuitBreaker()
+            retry_policy: 重试策略，默认使用 RetryPolicy(max_retries)
+        """
+        self.rate_limiter = RateLimiter(rate_limit) if rate_limit else None
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        self.retry_policy = retry_policy or RetryPolicy(max_retries)
+
+    def call(self, method, send):
+        """
+        发送请求，失败时按策略重试
+
+        Args:
+            method: HTTP 方法
+            send: 无参函数，发送一次请求并返回 requests.Response
+
+        Returns:
+            requests.Response: 最后一次的响应对象
+        """
+        attempt = 0
+        while True:
+            self.circuit_breaker.wait()
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+
+            try:
+                response = send()
+            except requests.RequestException as e:
+                delay = self._error_delay(attempt, method, e, isinstance(e, (requests.ConnectionError, requests.Timeout)))
+                if delay is None:
+                    raise
+            else:
+                delay = self._response_delay(attempt, method, response)
+                if delay is None:
+                    return response
+                response.close()
+
+            time.sleep(delay)
+            attempt += 1
+
+    async def call_async(self, method, send, transient_errors=()):
+        """
+        call 的异步版本，等待时不阻塞事件循环
+
+        Args:
+            method: HTTP 方法
+            send: 无参协程函数，发送一次请求并返回带 status_code、headers、url 和 close() 的响应对象
+            transient_errors: 视为网络错误或超时、可以重试的异常类型
+
+        Returns:
+            最后一次的响应对象
+        """
+        transient_errors = tuple(transient_errors) + (asyncio.TimeoutError,)
+        attempt = 0
+        while True:
+            delay = self.circuit_breaker.wait_time()
+            if delay > 0:
+                logger.info(f"熔断器已打开，暂停请求 {delay:.1f} 秒")
+            while delay > 0:
+                await asyncio.sleep(delay)
+                delay = self.circuit_breaker.wait_time()
+            if self.rate_limiter is not None:
+                delay = self.rate_limiter.reserve()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+            try:
+                response = await send()
+            except transient_errors as e:
+                delay = self._error_delay(attempt, method, e, True)
+                if delay is None:
+                    raise
+            else:
+                delay = self._response_delay(attempt, method, response)
+                if delay is None:
+                    return response
+                response.close()
+
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def _error_delay(self, attempt, method, error, transient):
+        """
+        记录请求异常并计算重试前的等待时间
+
+        Args:
+            attempt: 已重试次数
+            method: HTTP 方法
+            error: 请求异常
+            transient: 是否为网络错误或超时
+
+        Returns:
+            float: 等待秒数，不再重试时返回 None
+        """
+        self.circuit_breaker.record(False)
+        if attempt >= self.retry_policy.max_retries or not self.retry_policy.should_retry(method, transient_error=transient):
+            return None
+        delay = self.retry_policy.delay(attempt)
+        logger.warning(f"请求异常，{delay:.1f} 秒后重试 ({attempt + 1}/{self.retry_policy.max_retries}): {str(error)}")
+        return delay
+
+    def _response_delay(self, attempt, method, response):
+        """
+        记录响应结果并计算重试前的等待时间
+
+        Args:
+            attempt: 已重试次数
+            method: HTTP 方法
+            response: 响应对象
+
+        Returns:
+            float: 等待秒数，不再重试时返回 None
+        """
+        self._record(response)
+        if attempt >= self.retry_policy.max_retries or not self.retry_policy.should_retry(method, response):
+            return None
+        delay = self.retry_policy.delay(attempt, response)
+        logger.warning(f"请求返回 {response.status_code}，{delay:.1f} 秒后重试 "
+                       f"({attempt + 1}/{self.retry_policy.max_retries}): {response.url}")
+        return delay
+
+    def _record(self, response):
+        """
+        根据响应更新限流器和熔断器
+
+        Args:
+            response: 响应对象
+        """
+        throttled = response.status_code in THROTTLED_STATUS_CODES
+        self.circuit_breaker.record(response.status_code < 500 and not throttled)
+
+        if self.rate_limiter is not None:
+            if throttled:
+                self.rate_limiter.penalize()
+            else:
+                self.rate_limiter.reward()
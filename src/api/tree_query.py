@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Jenkins tree 查询构建工具
+用于生成 api/json 的 tree= 投影参数，只返回调用方需要的字段
+"""
+
+def build_tree(*fields):
+    """
+    构建 tree 投影表达式
+
+    字段可以是字符串，也可以是 {字段名: [子字段, ...]} 形式的字典，子字段可继续嵌套。
+
+    Example:
+        build_tree('_class', {'lastBuild': ['number']})
+        => '_class,lastBuild[number]'
+
+    Args:
+        *fields: 字段列表
+
+    Returns:
+        str: tree 表达式
+    """
+    parts = []
+    for field in fields:
+        if isinstance(field, dict):
+            for name, sub_fields in field.items():
+                parts.append(f"{name}[{build_tree(*sub_fields)}]")
+        else:
+            parts.append(str(field))
+    return ','.join(parts)
+
+def api_url(base_url, *fields):
+    """
+    生成带 tree 投影的 api/json URL
+
+    Args:
+        base_url: Jenkins 对象 URL，例如 http://jenkins/job/demo
+        *fields: 字段列表，格式同 build_tree
+
+    Returns:
+        str: 完整的 api/json URL
+    """
+    return f"{base_url.rstrip('/')}/api/json?tree={build_tree(*fields)}"
+
+# Job 元数据：类型、最后构建编号、参数定义和 SCM 信息
+JOB_METADATA_FIELDS = (
+    '_class',
+    'name',
+    {'lastBuild': ['number']},
+    {'property': [
+        '_class',
+        {'parameterDefinitions': [
+            'name',
+            'type',
+            'description',
+            {'defaultParameterValue': ['value']}
+        ]}
+    ]},
+    {'scm': [
+        '_class',
+        {'userRemoteConfigs': ['url']},
+        {'branches': ['name']}
+    ]}
+)
+
+# 构建概要信息
+BUILD_SUMMARY_FIELDS = ('number', 'result', 'building', 'timestamp', 'duration')
@@ -8,8 +8,9 @@ CodeArts构建任务转换器
 
 import os
 import re
-import yaml
+from utils import yaml_io
 from utils.logger import logger
+from utils.template_loader import load_yaml_file
 from models.pipeline_model import PipelineModel
 
 class BuildTaskConverter:
@@ -126,7 +127,7 @@ class BuildTaskConverter:
         # 保存到文件
         try:
             with open(self.output_path, 'w', encoding='utf-8') as f:
-                yaml.dump(template, f, default_flow_style=False, sort_keys=False, allow_unicode=True)
+                yaml_io.dump(template, f)
             logger.info(f"构建任务已保存到: {self.output_path}")
             return True
         except Exception as e:
@@ -191,11 +192,8 @@ class BuildTaskConverter:
             dict: 构建任务模板
         """
         try:
-            with open(self.template_path, 'r', encoding='utf-8') as f:
-                template_content = f.read()
-                # 将制表符替换为空格，修复YAML解析错误
-                template_content = template_content.replace('\t', '    ')
-            return yaml.safe_load(template_content)
+            # 将制表符替换为空格，修复YAML解析错误
+            return load_yaml_file(self.template_path, expand_tabs=True)
         except Exception as e:
             logger.error(f"加载构建任务模板失败: {str(e)}")
             raise
@@ -598,11 +596,8 @@ class BuildTaskConverter:
         """
         # 加载构建任务模板
         try:
-            with open(self.template_path, 'r', encoding='utf-8') as f:
-                template_content = f.read()
-                # 将制表符替换为空格，修复YAML解析错误
-                template_content = template_content.replace('\t', '    ')
-            template = yaml.safe_load(template_content)
+            # 将制表符替换为空格，修复YAML解析错误
+            template = load_yaml_file(self.template_path, expand_tabs=True)
         except Exception as e:
             logger.error(f"加载构建任务模板失败: {str(e)}")
             # 使用默认模板
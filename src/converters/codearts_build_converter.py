@@ -8,24 +8,48 @@ CodeArts构建任务转换器
 
 import os
 import re
-import yaml
+import copy
 import json
+from collections.abc import Mapping
 from utils.logger import logger
 from models.pipeline_model import PipelineModel
+from models.xml_document import XmlDocument
+from utils.artifact_sink import DirectorySink
+from utils.template_loader import load_yaml_file
+
+# 构建任务模板路径
+BUILD_TEMPLATE_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)),
+                                   "templates", "build", "codearts_build.yaml")
+
+def load_build_template(template_path=BUILD_TEMPLATE_PATH):
+    """
+    加载并解析构建任务模板
+    
+    Args:
+        template_path: 模板文件路径
+        
+    Returns:
+        dict: 模板内容
+    """
+    # 将制表符替换为空格，修复YAML解析错误；解析结果在进程内缓存
+    return load_yaml_file(template_path, expand_tabs=True)
 
 class CodeArtsBuildConverter:
     """CodeArts构建任务转换器类"""
     
-    def __init__(self, pipeline_model, output_path="codearts_build.yaml"):
+    def __init__(self, pipeline_model, output_path="codearts_build.yaml", build_template=None, sink=None):
         """
         初始化转换器
         
         Args:
             pipeline_model: PipelineModel对象
             output_path: 输出文件路径
+            build_template: 可选的已解析构建任务模板，批量转换时复用，避免每个文件重新加载
+            sink: 可选的输出层，默认原子写入 output_path，内容未变化时跳过
         """
         self.pipeline_model = pipeline_model
         self.output_path = output_path
+        self.sink = sink or DirectorySink()
         
         # 初始化构建任务YAML - 移除 env.resource 部分
         self.build_yaml = {
@@ -38,8 +62,8 @@ class CodeArtsBuildConverter:
         }
         
         # 加载模板
-        self.template_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 
-                                         "templates", "build", "codearts_build.yaml")
+        self.template_path = BUILD_TEMPLATE_PATH
+        self.build_template = build_template
         
         # 保存模板中的 PRE_BUILD 步骤
         self.template_pre_build_steps = []
@@ -55,48 +79,10 @@ class CodeArtsBuildConverter:
             bool: 转换是否成功
         """
         try:
-            logger.info("开始转换为CodeArts构建任务")
-            
-            # 加载模板
-            self._load_template()
-            
-            # 提取参数
-            params = self._extract_params()
-            if params:
-                self.build_yaml['params'] = params
-            elif 'params' in self.build_yaml:
-                del self.build_yaml['params']
-            
-            # 提取Git URL
-            git_url = self._extract_git_url_from_model()
-            
-            # 转换构建步骤
-            build_steps = self._convert_build_steps()
-            
-            # 更新构建任务YAML
-            self.build_yaml['steps'] = {
-                'PRE_BUILD': [],
-                'BUILD': build_steps
-            }
-            
-            # 添加Git检出步骤
-            self.build_yaml['steps']['PRE_BUILD'].append({
-                'checkout': {
-                    'name': '代码下载',
-                    'inputs': {
-                        'scm': 'codehub',
-                        'url': git_url if git_url else "https://codehub.devcloud.cn-north-4.huaweicloud.com/your-repo.git",
-                        'branch': 'master',
-                        'lfs': False,
-                        'submodule': False
-                    
-                    }
-                }
-            })
+            build_yaml = self.build_document()
             
             # 保存到文件
-            with open(self.output_path, 'w', encoding='utf-8') as f:
-                yaml.dump(self.build_yaml, f, default_flow_style=False, sort_keys=False, allow_unicode=True)
+            self.sink.write_yaml(self.output_path, build_yaml)
             
             logger.info(f"构建任务已保存到: {self.output_path}")
             return True
@@ -106,26 +92,74 @@ class CodeArtsBuildConverter:
             logger.error(traceback.format_exc())
             return False
     
+    def build_document(self):
+        """
+        生成CodeArts构建任务YAML字典，不写入文件
+        
+        Returns:
+            dict: 构建任务YAML字典
+        """
+        logger.info("开始转换为CodeArts构建任务")
+        
+        # 加载模板
+        self._load_template()
+        
+        # 提取参数
+        params = self._extract_params()
+        if params:
+            self.build_yaml['params'] = params
+        elif 'params' in self.build_yaml:
+            del self.build_yaml['params']
+        
+        # 提取Git URL
+        git_url = self._extract_git_url_from_model()
+        
+        # 转换构建步骤
+        build_steps = self._convert_build_steps()
+        
+        # 更新构建任务YAML
+        self.build_yaml['steps'] = {
+            'PRE_BUILD': [],
+            'BUILD': build_steps
+        }
+        
+        # 添加Git检出步骤
+        self.build_yaml['steps']['PRE_BUILD'].append({
+            'checkout': {
+                'name': '代码下载',
+                'inputs': {
+                    'scm': 'codehub',
+                    'url': git_url if git_url else "https://codehub.devcloud.cn-north-4.huaweicloud.com/your-repo.git",
+                    'branch': 'master',
+                    'lfs': False,
+                    'submodule': False
+                
+                }
+            }
+        })
+        
+        return self.build_yaml
+    
     def _load_template(self):
         """
         加载构建任务模板
         """
         try:
-            with open(self.template_path, 'r', encoding='utf-8') as f:
-                template_content = f.read()
-                # 将制表符替换为空格，修复YAML解析错误
-                template_content = template_content.replace('\t', '    ')
-                template = yaml.safe_load(template_content)
+            # 复用的模板在多次转换间共享，使用副本避免被修改
+            if self.build_template is not None:
+                template = copy.deepcopy(self.build_template)
+            else:
+                template = load_build_template(self.template_path)
+            
+            # 更新构建任务YAML
+            if template:
+                # 更新 params
+                if 'params' in template:
+                    self.build_yaml['params'] = template['params']
                 
-                # 更新构建任务YAML
-                if template:
-                    # 更新 params
-                    if 'params' in template:
-                        self.build_yaml['params'] = template['params']
-                    
-                    # 保存模板中的 PRE_BUILD 步骤，以便在没有 Git 步骤时使用
-                    if 'steps' in template and 'PRE_BUILD' in template['steps']:
-                        self.template_pre_build_steps = template['steps']['PRE_BUILD']
+                # 保存模板中的 PRE_BUILD 步骤，以便在没有 Git 步骤时使用
+                if 'steps' in template and 'PRE_BUILD' in template['steps']:
+                    self.template_pre_build_steps = template['steps']['PRE_BUILD']
             
             logger.info("成功加载构建任务模板")
         except Exception as e:
@@ -156,7 +190,7 @@ class CodeArtsBuildConverter:
         # 严格校验参数有效性
         if hasattr(self.pipeline_model, 'parameters') and isinstance(self.pipeline_model.parameters, list):
             for param in self.pipeline_model.parameters:
-                if isinstance(param, dict) and param.get('name'):
+                if isinstance(param, Mapping) and param.get('name'):
                     # 过滤空值参数
                     if param.get('value') or param.get('description'):
                         params.append({
@@ -185,10 +219,10 @@ class CodeArtsBuildConverter:
         
         for step in build_steps:
             # 检查步骤是否有 stage 属性，如果没有则设置默认值
-            step_stage = step.get('stage', 'Build') if isinstance(step, dict) else 'Build'
+            step_stage = step.get('stage', 'Build') if isinstance(step, Mapping) else 'Build'
             
             # 根据步骤类型处理
-            if isinstance(step, dict) and 'type' in step:
+            if isinstance(step, Mapping) and 'type' in step:
                 step_type = step['type']
                 step_name = step.get('name', '')
                 
@@ -229,7 +263,7 @@ class CodeArtsBuildConverter:
             logger.info(f"添加默认的Git检出步骤，URL: {git_url}")
         
         # 如果没有添加过上传构件步骤，添加一个默认的
-        if not upload_artifact_added and any(step.get('type') == 'maven' for step in build_steps if isinstance(step, dict)):
+        if not upload_artifact_added and any(step.get('type') == 'maven' for step in build_steps if isinstance(step, Mapping)):
             self.build_yaml['steps']['BUILD'].append({
                 'upload_artifact': {
                     'inputs': {
@@ -250,41 +284,28 @@ class CodeArtsBuildConverter:
         try:
             # 首先检查是否有直接保存的git_url
             if hasattr(self.pipeline_model, 'scm') and self.pipeline_model.scm:
-                if isinstance(self.pipeline_model.scm, dict) and 'url' in self.pipeline_model.scm:
+                if isinstance(self.pipeline_model.scm, Mapping) and 'url' in self.pipeline_model.scm:
                     git_url = self.pipeline_model.scm['url']
                     logger.info(f"从scm属性中提取到Git URL: {git_url}")
                     return git_url
                 
-            # 尝试从XML内容中提取Git URL
-            if hasattr(self.pipeline_model, 'xml_content') and self.pipeline_model.xml_content:
+            # 尝试从已解析的XML文档中提取Git URL
+            document = self._get_xml_document()
+            if document is not None:
                 logger.info("尝试从XML内容中提取Git URL")
                 
-                # 使用正则表达式提取URL
-                import re
-                url_match = re.search(r'<url>(.*?)</url>', self.pipeline_model.xml_content)
-                if url_match:
-                    git_url = url_match.group(1)
-                    logger.info(f"从XML中提取到 Git URL: {git_url}")
-                    return git_url
-                
-                # 如果上面的方法失败，尝试使用XML解析
+                # 第一个非空的 url 元素
                 try:
-                    from xml.etree import ElementTree as ET
-                    root = ET.fromstring(self.pipeline_model.xml_content)
-                    
-                    # 查找所有可能包含URL的元素
-                    for url_elem in root.findall('.//url'):
-                        potential_url = url_elem.text
-                        if potential_url and ('git' in potential_url or 'http' in potential_url):
-                            git_url = potential_url
-                            logger.info(f"从XML元素中提取到 Git URL: {git_url}")
-                            return git_url
+                    if document.urls:
+                        git_url = document.urls[0]
+                        logger.info(f"从XML中提取到 Git URL: {git_url}")
+                        return git_url
                 except Exception as e:
                     logger.warning(f"XML解析失败: {str(e)}")
         
             # 尝试从scm属性中提取
             if hasattr(self.pipeline_model, 'scm') and self.pipeline_model.scm:
-                if isinstance(self.pipeline_model.scm, dict) and 'url' in self.pipeline_model.scm:
+                if isinstance(self.pipeline_model.scm, Mapping) and 'url' in self.pipeline_model.scm:
                     git_url = self.pipeline_model.scm['url']
                     logger.info(f"从scm属性中提取到 Git URL: {git_url}")
                     return git_url
@@ -292,7 +313,7 @@ class CodeArtsBuildConverter:
             # 尝试从build_steps中提取
             if hasattr(self.pipeline_model, 'build_steps'):
                 for step in self.pipeline_model.build_steps:
-                    if isinstance(step, dict):
+                    if isinstance(step, Mapping):
                         if step.get('type') == 'git' and 'url' in step:
                             git_url = step['url']
                             logger.info(f"从build_steps中提取到 Git URL: {git_url}")
@@ -312,6 +333,18 @@ class CodeArtsBuildConverter:
         # 如果所有方法都失败，返回一个默认值或None
         return git_url
     
+    def _get_xml_document(self):
+        """
+        获取流水线模型携带的已解析 config.xml 文档
+        
+        Returns:
+            XmlDocument: 文档对象，没有 XML 内容时返回 None
+        """
+        if isinstance(self.pipeline_model, PipelineModel):
+            return self.pipeline_model.xml_document
+        xml_content = getattr(self.pipeline_model, 'xml_content', '')
+        return XmlDocument.from_string(xml_content) if xml_content else None
+    
     def _add_git_step(self, step):
         """
         添加 Git 检出步骤
@@ -453,15 +486,19 @@ class CodeArtsBuildConverter:
         """
         build_steps = []
         
-        # 从XML内容中提取Maven构建步骤
-        if hasattr(self.pipeline_model, 'xml_content') and self.pipeline_model.xml_content:
+        # 从已解析的XML文档中提取Maven构建步骤
+        document = self._get_xml_document()
+        if document is not None:
             logger.info("尝试从XML内容中提取Maven构建步骤")
             
-            # 使用正则表达式提取Maven targets
-            import re
-            maven_match = re.search(r'<targets>(.*?)</targets>', self.pipeline_model.xml_content)
-            if maven_match:
-                maven_command = maven_match.group(1).strip()
+            try:
+                maven_builders = [builder for builder in document.maven_builders if builder['targets']]
+            except Exception as e:
+                logger.warning(f"XML解析失败: {str(e)}")
+                maven_builders = []
+            
+            if maven_builders:
+                maven_command = maven_builders[0]['targets']
                 logger.info(f"从XML中提取到Maven命令: {maven_command}")
                 
                 # 添加Maven构建步骤
@@ -497,48 +534,11 @@ class CodeArtsBuildConverter:
                 })
                 
                 return build_steps
-            
-            # 如果上面的方法失败，尝试使用XML解析
-            try:
-                from xml.etree import ElementTree as ET
-                root = ET.fromstring(self.pipeline_model.xml_content)
-                
-                # 查找Maven构建步骤
-                maven_elements = root.findall('.//hudson.tasks.Maven')
-                if maven_elements:
-                    for maven_elem in maven_elements:
-                        targets_elem = maven_elem.find('./targets')
-                        if targets_elem is not None and targets_elem.text:
-                            maven_command = targets_elem.text.strip()
-                            logger.info(f"从XML元素中提取到Maven命令: {maven_command}")
-                            
-                            # 添加Maven构建步骤
-                            build_steps.append({
-                                'maven': {
-                                    'name': 'Maven Build',
-                                    'inputs': {
-                                        'command': maven_command
-                                    }
-                                }
-                            })
-                            
-                            # 添加构件上传步骤
-                            build_steps.append({
-                                'upload_artifact': {
-                                    'inputs': {
-                                        'path': '**/target/*.?ar'
-                                    }
-                                }
-                            })
-                            
-                            return build_steps
-            except Exception as e:
-                logger.warning(f"XML解析失败: {str(e)}")
     
         # 从build_steps中提取构建步骤
         if hasattr(self.pipeline_model, 'build_steps') and self.pipeline_model.build_steps:
             for step in self.pipeline_model.build_steps:
-                if isinstance(step, dict):
+                if isinstance(step, Mapping):
                     step_type = step.get('type', '')
                     step_command = step.get('command', '')
                     
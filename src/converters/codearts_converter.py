@@ -8,21 +8,36 @@ CodeArts转换器
 
 import os
 import re
-import yaml
 from utils.logger import logger
-from utils.template_loader import TemplateLoader
+from utils.template_loader import TemplateLoader, load_yaml_file
+from utils.artifact_sink import DirectorySink
 from models.pipeline_model import PipelineModel
+from converters.job_graph import build_needs
+
+def load_pipeline_mapping():
+    """
+    加载流水线阶段映射配置 config/pipeline_mapping.yaml
+    
+    Returns:
+        dict: 映射配置
+    """
+    config_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "config", "pipeline_mapping.yaml")
+    return load_yaml_file(config_path)
 
 class CodeArtsConverter:
     """CodeArts转换器类"""
     
-    def __init__(self, pipeline_model, output_path="codearts_pipeline.yaml"):
+    def __init__(self, pipeline_model, output_path="codearts_pipeline.yaml", template_loader=None, mapping_config=None,
+                 sink=None):
         """
         初始化转换器
         
         Args:
             pipeline_model: 流水线模型
             output_path: 输出文件路径
+            template_loader: 可选的 TemplateLoader，批量转换时复用，避免每个文件重新加载
+            mapping_config: 可选的映射配置，默认读取 config/pipeline_mapping.yaml
+            sink: 可选的输出层，默认原子写入 output_path，内容未变化时跳过
         """
         # 如果 pipeline_model 是 PipelineModel 对象，则使用 to_dict 方法获取流水线阶段
         if isinstance(pipeline_model, PipelineModel):
@@ -32,12 +47,14 @@ class CodeArtsConverter:
             self.pipeline_stages = pipeline_model
         
         self.output_path = output_path
-        self.template_loader = TemplateLoader()
+        self.sink = sink or DirectorySink()
+        
+        # convert() 生成的 YAML 字典，供关键路径分析等后续处理使用
+        self.codearts_yaml = None
+        self.template_loader = template_loader or TemplateLoader()
         
         # 加载映射配置
-        config_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "config", "pipeline_mapping.yaml")
-        with open(config_path, 'r', encoding='utf-8') as f:
-            self.mapping_config = yaml.safe_load(f)
+        self.mapping_config = mapping_config if mapping_config is not None else load_pipeline_mapping()
         
         # 获取需要忽略的阶段和需要转换为sh的阶段
         self.ignore_stages = self.mapping_config.get('ignore_stages', [])
@@ -52,6 +69,24 @@ class CodeArtsConverter:
         Returns:
             bool: 转换是否成功
         """
+        codearts_yaml = self.build_document()
+        
+        # 将YAML写入文件
+        try:
+            self.sink.write_yaml(self.output_path, codearts_yaml)
+            logger.info(f"成功生成CodeArts YAML: {self.output_path}")
+            return True
+        except Exception as e:
+            logger.error(f"生成CodeArts YAML失败: {str(e)}")
+            return False
+
+    def build_document(self):
+        """
+        生成CodeArts YAML字典，不写入文件
+        
+        Returns:
+            dict: CodeArts流水线YAML字典
+        """
         logger.info("开始转换为CodeArts YAML")
         
         # 创建基本的YAML结构
@@ -93,7 +128,7 @@ class CodeArtsConverter:
         
         # 动态生成任务和依赖关系
         stages = self.pipeline_stages.get('stages', [])
-        previous_job_id = None
+        stage_jobs = []
         
         # 遍历所有阶段，生成任务
         for stage in stages:
@@ -119,10 +154,6 @@ class CodeArtsConverter:
                 'steps': []
             }
             
-            # 如果有前置任务，添加依赖关系
-            if previous_job_id:
-                codearts_yaml['jobs'][job_id]['needs'] = [previous_job_id]
-            
             # 检查是否需要转换为sh步骤
             if stage_name in self.sh_stages:
                 # 添加shell步骤
@@ -152,8 +183,12 @@ class CodeArtsConverter:
                         'run': f"echo \"执行{stage_name}阶段...\""
                     })
             
-            # 更新前置任务
-            previous_job_id = job_id
+            stage_jobs.append((job_id, stage))
+        
+        # 按并行结构和 stash/unstash 生成最少的依赖关系，独立的分支可以并行执行
+        for job_id, job_needs in build_needs(stage_jobs).items():
+            if job_needs:
+                codearts_yaml['jobs'][job_id]['needs'] = job_needs
         
         # 如果没有任何任务，添加一个默认任务
         if not codearts_yaml['jobs']:
@@ -165,15 +200,8 @@ class CodeArtsConverter:
                 }]
             }
         
-        # 将YAML写入文件
-        try:
-            with open(self.output_path, 'w', encoding='utf-8') as f:
-                yaml.dump(codearts_yaml, f, default_flow_style=False, sort_keys=False, allow_unicode=True)
-            logger.info(f"成功生成CodeArts YAML: {self.output_path}")
-            return True
-        except Exception as e:
-            logger.error(f"生成CodeArts YAML失败: {str(e)}")
-            return False
+        self.codearts_yaml = codearts_yaml
+        return codearts_yaml
 
     def _map_stage_to_template(self, stage_name):
         """
@@ -234,10 +262,8 @@ class CodeArtsConverter:
         Returns:
             dict: CodeArts shell步骤信息
         """
-        template = self.template_loader.load_template('shell.yaml')
-        
-        # 替换模板中的参数
-        task = yaml.safe_load(template)
+        # 模板的解析结果在进程内缓存，这里拿到的是可以修改的副本
+        task = self.template_loader.load_parsed_template('shell.yaml')
         task['run'] = command
         
         return task
@@ -488,10 +514,8 @@ class CodeArtsConverter:
     
     def _convert_code_check(self, params):
         """转换代码检查步骤"""
-        template = self.template_loader.load_template('code_check.yaml')
-        
-        # 替换模板中的参数
-        task = yaml.safe_load(template)
+        # 模板的解析结果在进程内缓存，这里拿到的是可以修改的副本
+        task = self.template_loader.load_parsed_template('code_check.yaml')
         
         # 更新参数
         if 'language' in params:
@@ -503,10 +527,8 @@ class CodeArtsConverter:
     
     def _convert_build(self, params):
         """转换构建步骤"""
-        template = self.template_loader.load_template('build.yaml')
-        
-        # 替换模板中的参数
-        task = yaml.safe_load(template)
+        # 模板的解析结果在进程内缓存，这里拿到的是可以修改的副本
+        task = self.template_loader.load_parsed_template('build.yaml')
         
         # 更新参数
         if 'tool' in params:
@@ -518,10 +540,8 @@ class CodeArtsConverter:
     
     def _convert_deploy(self, params):
         """转换部署步骤"""
-        template = self.template_loader.load_template('deploy.yaml')
-        
-        # 替换模板中的参数
-        task = yaml.safe_load(template)
+        # 模板的解析结果在进程内缓存，这里拿到的是可以修改的副本
+        task = self.template_loader.load_parsed_template('deploy.yaml')
         
         # 更新参数
         if 'cluster' in params:
@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+关键路径分析
+结合 Jenkins 最近若干次构建的阶段耗时和 CodeArts 任务的 needs 依赖，
+计算每个任务的最早开始/结束时间、关键路径和松弛时间，并找出可以改为并行的依赖边
+"""
+
+PERCENTILES = ('p50', 'p95', 'max')
+
+def build_critical_path_report(codearts_yaml, stage_durations, stages=None, percentile='p50'):
+    """
+    生成关键路径报告
+
+    任务名称即 Jenkins 阶段名称，用于匹配阶段耗时；没有耗时数据的任务按 0 计算。
+    关键路径上不存在 stash/unstash 数据依赖的边列为可并行候选，预计节省两端任务耗时中较小的一个。
+
+    Args:
+        codearts_yaml: CodeArtsConverter 生成的 YAML 字典，任务按依赖在前的顺序排列
+        stage_durations: 阶段名称 -> {samples, p50_ms, p95_ms, max_ms}
+        stages: 可选的阶段列表，提供 stashes/unstashes 信息；为空时所有依赖边都视为控制依赖
+        percentile: 使用的耗时统计，p50、p95 或 max
+
+    Returns:
+        dict: 关键路径报告
+    """
+    if percentile not in PERCENTILES:
+        raise ValueError(f"不支持的耗时统计: {percentile}，可选: {', '.join(PERCENTILES)}")
+    duration_key = f"{percentile}_ms"
+
+    jobs = codearts_yaml.get('jobs', {})
+    stage_data = {stage.get('name'): stage for stage in stages or [] if isinstance(stage, dict)}
+
+    # 正向遍历：最早开始时间为所有依赖的最早结束时间中的最大值
+    timings = {}
+    missing = []
+    for job_id, job in jobs.items():
+        name = job.get('name', job_id)
+        durations = stage_durations.get(name)
+        if durations is None:
+            missing.append(name)
+        duration = (durations or {}).get(duration_key) or 0
+        start = max((timings[dep]['earliest_finish_ms'] for dep in job.get('needs', []) if dep in timings), default=0)
+        timings[job_id] = {
+            'name': name,
+            'duration_ms': duration,
+            'samples': (durations or {}).get('samples', 0),
+            'earliest_start_ms': start,
+            'earliest_finish_ms': start + duration
+        }
+
+    total = max((timing['earliest_finish_ms'] for timing in timings.values()), default=0)
+
+    # 反向遍历：最晚结束时间为所有后继任务的最晚开始时间中的最小值
+    latest_finish = {job_id: total for job_id in jobs}
+    for job_id in reversed(list(jobs)):
+        latest_start = latest_finish[job_id] - timings[job_id]['duration_ms']
+        for dep in jobs[job_id].get('needs', []):
+            if dep in latest_finish:
+                latest_finish[dep] = min(latest_finish[dep], latest_start)
+    for job_id, timing in timings.items():
+        timing['slack_ms'] = latest_finish[job_id] - timing['earliest_finish_ms']
+
+    critical_path = _trace_critical_path(jobs, timings)
+
+    return {
+        'percentile': percentile,
+        'total_ms': total,
+        'critical_path': [
+            {
+                'job': job_id,
+                'name': timings[job_id]['name'],
+                'duration_ms': timings[job_id]['duration_ms'],
+                'share': round(timings[job_id]['duration_ms'] / total, 3) if total else 0
+            }
+            for job_id in critical_path
+        ],
+        'parallel_candidates': _parallel_candidates(critical_path, timings, stage_data),
+        'missing_durations': missing,
+        'jobs': timings
+    }
+
+def _trace_critical_path(jobs, timings):
+    """
+    从最晚结束的任务沿最晚结束的依赖回溯关键路径
+
+    Args:
+        jobs: CodeArts 任务字典
+        timings: job_id -> 时间信息
+
+    Returns:
+        list: 关键路径上的 job_id，按执行顺序排列
+    """
+    if not timings:
+        return []
+
+    job_id = max(timings, key=lambda key: timings[key]['earliest_finish_ms'])
+    path = [job_id]
+    while True:
+        deps = [dep for dep in jobs[job_id].get('needs', []) if dep in timings]
+        if not deps:
+            break
+        job_id = max(deps, key=lambda key: timings[key]['earliest_finish_ms'])
+        path.append(job_id)
+
+    path.reverse()
+    return path
+
+def _parallel_candidates(critical_path, timings, stage_data):
+    """
+    找出关键路径上只有控制依赖、没有 stash/unstash 数据依赖的边
+
+    Args:
+        critical_path: 关键路径上的 job_id 列表
+        timings: job_id -> 时间信息
+        stage_data: 阶段名称 -> 阶段字典
+
+    Returns:
+        list: 可并行候选，按预计节省时间从大到小排列
+    """
+    candidates = []
+    for upstream, downstream in zip(critical_path, critical_path[1:]):
+        stashes = set(stage_data.get(timings[upstream]['name'], {}).get('stashes', []))
+        unstashes = set(stage_data.get(timings[downstream]['name'], {}).get('unstashes', []))
+        if stashes & unstashes:
+            continue
+
+        saving = min(timings[upstream]['duration_ms'], timings[downstream]['duration_ms'])
+        if saving <= 0:
+            continue
+        candidates.append({
+            'from': upstream,
+            'to': downstream,
+            'estimated_saving_ms': saving
+        })
+
+    candidates.sort(key=lambda candidate: candidate['estimated_saving_ms'], reverse=True)
+    return candidates
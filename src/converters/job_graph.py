@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+CodeArts 任务依赖图
+根据 Jenkins 阶段的顺序、并行分支和 stash/unstash 数据依赖生成任务的 needs，
+并做传递归约，只保留最少的依赖边
+"""
+
+def build_needs(stage_jobs):
+    """
+    生成每个任务的直接依赖
+
+    顺序阶段依赖前一个执行单元的全部出口；同一 parallel 块中的分支共同依赖并行块之前的出口，
+    分支内部按顺序依赖；并行块之后的阶段依赖所有分支的最后一个阶段。
+    unstash 的阶段额外依赖最近一次 stash 同名内容的阶段。
+
+    Args:
+        stage_jobs: 按源码顺序排列的 (job_id, stage) 列表，stage 可包含
+            parallel_group（并行块序号）、parallel_branch（分支序号）、stashes、unstashes
+
+    Returns:
+        dict: job_id -> 经过传递归约的依赖 job_id 列表（保持源码顺序）
+    """
+    needs = {}
+    frontier = []
+    group = None
+    group_entry = []
+    branch_last = {}
+    stashed_by = {}
+
+    for job_id, stage in stage_jobs:
+        stage_group = stage.get('parallel_group')
+
+        # 离开并行块：后续阶段依赖所有分支的出口
+        if group is not None and stage_group != group:
+            frontier = list(branch_last.values())
+            group = None
+
+        if stage_group is not None:
+            # 进入新的并行块
+            if stage_group != group:
+                group = stage_group
+                group_entry = frontier
+                branch_last = {}
+            branch = stage.get('parallel_branch')
+            deps = [branch_last[branch]] if branch in branch_last else list(group_entry)
+            branch_last[branch] = job_id
+        else:
+            deps = list(frontier)
+            frontier = [job_id]
+
+        # stash/unstash 数据依赖
+        for name in stage.get('unstashes', []):
+            producer = stashed_by.get(name)
+            if producer is not None and producer != job_id and producer not in deps:
+                deps.append(producer)
+        for name in stage.get('stashes', []):
+            stashed_by[name] = job_id
+
+        needs[job_id] = deps
+
+    return transitive_reduction(needs)
+
+def transitive_reduction(needs):
+    """
+    去掉可以通过其他依赖间接到达的依赖边
+
+    Args:
+        needs: job_id -> 依赖 job_id 列表，按拓扑顺序（依赖在前）插入
+
+    Returns:
+        dict: 归约后的依赖关系
+    """
+    ancestors = {}
+    reduced = {}
+    for job_id, deps in needs.items():
+        # 依赖的依赖（不含依赖本身）能到达的任务都是冗余边
+        indirect = set()
+        for dep in deps:
+            indirect |= ancestors.get(dep, set())
+        reduced[job_id] = [dep for dep in deps if dep not in indirect]
+
+        reachable = set(indirect)
+        for dep in deps:
+            reachable.add(dep)
+        ancestors[job_id] = reachable
+
+    return reduced
@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+按流水线结构缓存转换结果
+批量迁移时大部分 Job 由少数几个 Job 模板实例化而来，只有参数值、SCM URL 等取值不同。
+每种结构只转换一次，之后的 Job 把自己的取值代回缓存的输出，转换的工作量与结构数量而不是 Job 数量成正比
+"""
+
+import threading
+from utils.logger import logger
+from utils.template_loader import TemplateLoader
+from models.pipeline_model import PipelineModel
+from models.structure import substitute
+from converters.codearts_converter import CodeArtsConverter, load_pipeline_mapping
+from converters.codearts_build_converter import CodeArtsBuildConverter, load_build_template
+
+class StructureCache:
+    """结构哈希 -> 转换结果的缓存，可在多个工作线程间共享"""
+
+    def __init__(self, build_output=True):
+        """
+        初始化缓存，模板和映射配置只加载一次
+
+        Args:
+            build_output: 是否同时生成 CodeArts 构建任务
+        """
+        self.build_output = build_output
+        self.template_loader = TemplateLoader()
+        self.mapping_config = load_pipeline_mapping()
+        self.build_template = load_build_template() if build_output else None
+
+        # 结构哈希 -> (流水线 YAML 字典, 构建任务 YAML 字典)
+        self._documents = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def structures(self):
+        """已转换的不同结构数量"""
+        return len(self._documents)
+
+    def convert(self, pipeline_model):
+        """
+        转换流水线模型，结构相同的模型复用已有的转换结果
+
+        Args:
+            pipeline_model: PipelineModel 对象
+
+        Returns:
+            tuple: (流水线 YAML 字典, 构建任务 YAML 字典)，不生成构建任务时后者为 None
+        """
+        abstraction = pipeline_model.abstract()
+        if abstraction.digest is None:
+            logger.info(f"流水线 {pipeline_model.name} 无法按结构去重，直接转换")
+            return self._convert_model(pipeline_model)
+
+        with self._lock:
+            documents = self._documents.get(abstraction.digest)
+            if documents is not None:
+                self.hits += 1
+
+        if documents is None:
+            # 把占位符当作取值转换一次，结果中的占位符之后替换为各 Job 自己的取值
+            template = PipelineModel.from_dict(abstraction.data)
+            template.type = pipeline_model.type
+            template.xml_content = abstraction.template_xml()
+            documents = self._convert_model(template)
+            with self._lock:
+                documents = self._documents.setdefault(abstraction.digest, documents)
+                self.misses += 1
+            logger.info(f"新的流水线结构 {abstraction.digest[:12]}，当前共 {self.structures} 种")
+
+        pipeline_yaml, build_yaml = documents
+        return substitute(pipeline_yaml, abstraction.values), substitute(build_yaml, abstraction.values)
+
+    def _convert_model(self, pipeline_model):
+        """
+        调用转换器生成流水线和构建任务 YAML 字典
+
+        Args:
+            pipeline_model: PipelineModel 对象
+
+        Returns:
+            tuple: (流水线 YAML 字典, 构建任务 YAML 字典)
+        """
+        converter = CodeArtsConverter(pipeline_model, template_loader=self.template_loader,
+                                      mapping_config=self.mapping_config)
+        pipeline_yaml = converter.build_document()
+
+        build_yaml = None
+        if self.build_output:
+            build_yaml = CodeArtsBuildConverter(pipeline_model, build_template=self.build_template).build_document()
+        return pipeline_yaml, build_yaml
@@ -10,15 +10,69 @@ Jenkins迁移工具主程序
 import os
 import sys
 import argparse
-import json
+import asyncio
 from parsers.jenkins_file_parser import JenkinsfileParser
 from parsers.jenkins_api_parser import JenkinsApiParser
 from converters.codearts_converter import CodeArtsConverter
 from converters.build_converter import BuildTaskConverter
 from api.jenkins_client import JenkinsClient
+from api.http_cache import HttpCache
+from parsers.parse_cache import ParseCache
+from api.throttle import RequestThrottle
+from api.log_reader import BoundedLogReader
 from utils.logger import logger
+from utils import codec
+from utils.artifact_sink import DirectorySink
 from models.pipeline_model import PipelineModel  # 添加导入PipelineModel
 from converters.codearts_build_converter import CodeArtsBuildConverter
+from converters.critical_path import build_critical_path_report
+from migration.bulk_migrator import BulkMigrator
+from migration.jenkinsfile_batch import JenkinsfileBatchConverter
+
+async def run_async_bulk(args, http_cache, throttle, parse_cache=None, log_reader=None):
+    """
+    使用异步客户端执行批量迁移
+    
+    Args:
+        args: 命令行参数
+        http_cache: 可选的 HttpCache 磁盘缓存
+        throttle: 请求节流器
+        parse_cache: 可选的 ParseCache 解析结果缓存
+        log_reader: 可选的 BoundedLogReader 步骤日志读取器
+        
+    Returns:
+        dict: 迁移汇总报告
+    """
+    from api.async_jenkins_client import AsyncJenkinsClient
+    
+    async with AsyncJenkinsClient(args.jenkins_url, args.username, args.password, args.api_token,
+                                  pool_maxsize=args.pool_size, timeout=args.timeout,
+                                  max_inflight=args.max_inflight, http_cache=http_cache,
+                                  throttle=throttle, parse_cache=parse_cache, log_reader=log_reader,
+                                  stage_timing_builds=args.stage_timing) as jenkins_client:
+        migrator = BulkMigrator(jenkins_client, args.output_dir or 'codearts_output', workers=args.workers or 4,
+                                build_output=not args.no_build_output,
+                                critical_path_percentile=args.critical_path_percentile)
+        return await migrator.run_async(args.job_name)
+
+def export_model(pipeline_model, args):
+    """
+    导出解析后的流水线模型
+    
+    --debug-json 时导出格式化的 JSON 便于调试（默认 jenkins_pipeline_model.json，并行运行时可以分别指定路径）；
+    --export-model 按扩展名导出，.json 为 JSON，其余为二进制编码（可用 utils.codec.load 读回）。
+    
+    Args:
+        pipeline_model: 流水线模型
+        args: 命令行参数
+    """
+    if args.debug_json:
+        codec.export(pipeline_model, args.debug_json)
+        logger.info(f"解析后的流水线模型已导出到: {args.debug_json}")
+    
+    if args.export_model:
+        codec.export(pipeline_model, args.export_model)
+        logger.info(f"解析后的流水线模型已导出到: {args.export_model}")
 
 def main():
     """主函数"""
@@ -27,6 +81,7 @@ def main():
     # 创建互斥组，用户必须选择其中一种方式
     source_group = parser.add_mutually_exclusive_group(required=True)
     source_group.add_argument('--jenkinsfile', '-j', help='Jenkinsfile路径')
+    source_group.add_argument('--jenkinsfile-dir', help='批量转换目录（或glob模式，如 "repos/**/Jenkinsfile"）下的所有Jenkinsfile和*.groovy文件，使用多进程并行')
     source_group.add_argument('--jenkins-api', '-a', action='store_true', help='使用Jenkins API获取Job信息')
     
     # Jenkins API相关参数
@@ -35,14 +90,37 @@ def main():
     parser.add_argument('--username', help='Jenkins用户名')
     parser.add_argument('--password', help='Jenkins密码')
     parser.add_argument('--api-token', help='Jenkins API Token (可选，优先使用)')
+    parser.add_argument('--pool-size', type=int, default=10, help='每个Jenkins主机保持的最大HTTP连接数')
+    parser.add_argument('--timeout', type=float, default=30, help='Jenkins API请求超时时间（秒）')
+    parser.add_argument('--max-inflight', type=int, default=8, help='单个Job提取时并发请求的最大数量，1表示串行')
+    parser.add_argument('--http-cache', help='Jenkins响应磁盘缓存文件路径（SQLite），重复运行时通过条件请求复用未变化的内容')
+    parser.add_argument('--http-cache-size', type=float, default=256, help='磁盘缓存的最大大小（MB）')
+    parser.add_argument('--parse-cache', help='Jenkinsfile解析结果缓存文件路径（SQLite），内容未变化的Jenkinsfile跳过解析')
+    parser.add_argument('--parse-cache-size', type=float, default=64, help='解析结果缓存的最大大小（MB）')
+    parser.add_argument('--rate-limit', type=float, default=0, help='所有工作线程共享的每秒最大请求数，0表示不限速；收到429/503时自动降速')
+    parser.add_argument('--max-retries', type=int, default=3, help='请求失败（网络错误、429、5xx）时的最大重试次数')
+    parser.add_argument('--log-head-lines', type=int, default=50, help='每个步骤日志保留的开头行数')
+    parser.add_argument('--log-tail-lines', type=int, default=0, help='每个步骤日志保留的末尾行数，大于0时需要读完整个日志，0表示不保留')
+    parser.add_argument('--stage-timing', type=int, default=0, help='统计最近N次构建的阶段耗时并生成关键路径报告（需要Pipeline Stage View插件，最多约10次），0表示不统计')
+    parser.add_argument('--critical-path-report', default='critical_path.json', help='关键路径报告的输出路径（批量迁移时每个Job目录下生成critical_path.json）')
+    parser.add_argument('--critical-path-percentile', choices=['p50', 'p95', 'max'], default='p50', help='关键路径分析使用的阶段耗时统计')
+    
+    # 批量迁移相关参数
+    parser.add_argument('--bulk', action='store_true', help='批量迁移Jenkins实例（或--job-name指定的文件夹）下的所有Job')
+    parser.add_argument('--workers', type=int, help='批量迁移的工作线程数，默认4（异步模式下为同时迁移的Job数）；--jenkinsfile-dir模式下为工作进程数，默认为CPU核心数')
+    parser.add_argument('--async', dest='use_async', action='store_true', help='批量迁移使用基于asyncio的异步客户端（需要安装aiohttp），可同时进行大量请求')
+    parser.add_argument('--output-dir', help='批量迁移的输出根目录（默认codearts_output），每个Job生成独立子目录；--jenkinsfile-dir模式下按源文件相对路径镜像目录结构，不指定时输出到源文件旁边')
     
     # 输出相关参数
     parser.add_argument('--output', '-o', default='codearts_pipeline.yaml', help='输出的CodeArts YAML文件路径')
     parser.add_argument('--build-output', '-b', default='codearts_build.yaml', help='输出的CodeArts构建任务YAML文件路径')
+    parser.add_argument('--no-build-output', action='store_true', help='不生成CodeArts构建任务YAML（单个Job、批量迁移和--jenkinsfile-dir模式均适用）')
     parser.add_argument('--verbose', '-v', action='store_true', help='显示详细日志')
     parser.add_argument('--build-only', action='store_true', help='仅生成构建任务')
     # 添加导出流水线结构参数
-    parser.add_argument('--export-structure', '-e', help='导出Jenkins流水线结构到指定文件')
+    parser.add_argument('--export-structure', '-e', help='导出Jenkins流水线结构到指定文件，扩展名为.json时导出格式化的JSON，否则为二进制编码')
+    parser.add_argument('--export-model', help='导出解析后的流水线模型到指定文件，扩展名为.json时导出格式化的JSON，否则为二进制编码')
+    parser.add_argument('--debug-json', nargs='?', const='jenkins_pipeline_model.json', help='导出格式化的流水线模型JSON用于调试，默认路径为jenkins_pipeline_model.json')
     
     args = parser.parse_args()
     
@@ -50,29 +128,55 @@ def main():
         logger.setLevel('DEBUG')
     
     # 检查参数
-    if args.jenkins_api and not (args.jenkins_url and args.job_name):
+    if args.jenkins_api and not (args.jenkins_url and (args.job_name or args.bulk)):
         logger.error("使用Jenkins API时必须指定Jenkins服务器URL和Job名称")
         parser.print_help()
         sys.exit(1)
     
+    if args.bulk and not args.jenkins_api:
+        logger.error("批量迁移必须与--jenkins-api一起使用")
+        parser.print_help()
+        sys.exit(1)
+    
+    if args.build_only and args.no_build_output:
+        logger.error("--build-only 不能与 --no-build-output 一起使用")
+        parser.print_help()
+        sys.exit(1)
+    
     try:
+        # 批量转换本地目录下的 Jenkinsfile，每个工作进程只加载一次模板和映射配置
+        if args.jenkinsfile_dir:
+            batch_converter = JenkinsfileBatchConverter(args.jenkinsfile_dir, args.output_dir, workers=args.workers,
+                                                        build_output=not args.no_build_output,
+                                                        parse_cache_path=args.parse_cache,
+                                                        parse_cache_size=args.parse_cache_size)
+            summary = batch_converter.run()
+            sys.exit(0 if summary['failed'] == 0 else 1)
+        
         pipeline_model = None
         
+        # 可选的 Jenkins 响应磁盘缓存
+        http_cache = HttpCache(args.http_cache, args.http_cache_size) if args.jenkins_api and args.http_cache else None
+        
+        # 可选的 Jenkinsfile 解析结果缓存，命令行和 API 两种方式共用
+        parse_cache = ParseCache(args.parse_cache, args.parse_cache_size) if args.parse_cache else None
+        
+        # 所有请求共享的限流、重试和熔断
+        throttle = RequestThrottle(args.rate_limit, args.max_retries)
+        
+        # 步骤日志只保留头尾窗口和命令标记行
+        log_reader = BoundedLogReader(head_lines=args.log_head_lines, tail_lines=args.log_tail_lines)
+        
         # 根据参数选择解析方式
         if args.jenkinsfile:
             from converters.codearts_build_converter import CodeArtsBuildConverter
             # 解析Jenkinsfile
             logger.info(f"开始解析Jenkinsfile: {args.jenkinsfile}")
-            jenkinsfile_parser = JenkinsfileParser(args.jenkinsfile)
+            jenkinsfile_parser = JenkinsfileParser(args.jenkinsfile, parse_cache=parse_cache)
             
             pipeline_model = jenkinsfile_parser.parse()
             logger.info("Jenkinsfile解析完成")
             
-            # 导出解析后的流水线模型，便于调试
-            with open("jenkins_pipeline_model.json", 'w', encoding='utf-8') as f:
-                json.dump(pipeline_model.to_dict(), f, indent=2, ensure_ascii=False)
-            logger.info("解析后的流水线模型已导出到: jenkins_pipeline_model.json")
-            
             # 生成构建任务
             # logger.info(f"开始生成构建任务: {args.build_output}")
             # build_converter = BuildTaskConverter(build_steps=pipeline_model, output_path=args.build_output, pipeline_stages=pipeline_model)
@@ -95,7 +199,7 @@ def main():
                 logger.error("生成CodeArts YAML失败")
             
                 # 如果指定了构建任务输出路径，转换为CodeArts构建任务YAML
-                if args.build_output:
+                if not args.no_build_output:
                     build_converter = CodeArtsBuildConverter(pipeline_model, args.build_output)
                     build_success = build_converter.convert()
                     if build_success:
@@ -107,17 +211,43 @@ def main():
             # 在导入部分添加
             from converters.codearts_build_converter import CodeArtsBuildConverter
             
+            # 批量迁移整个实例或文件夹
+            if args.jenkins_api and args.bulk:
+                logger.info(f"批量迁移: {args.jenkins_url} {args.job_name or ''}")
+                if args.use_async:
+                    summary = asyncio.run(run_async_bulk(args, http_cache, throttle, parse_cache, log_reader))
+                    sys.exit(0 if summary['failed'] == 0 else 1)
+                
+                jenkins_client = JenkinsClient(args.jenkins_url, args.username, args.password, args.api_token,
+                                               pool_maxsize=args.pool_size, timeout=args.timeout,
+                                               max_inflight=args.max_inflight,
+                                               http_cache=http_cache, throttle=throttle,
+                                               parse_cache=parse_cache, log_reader=log_reader,
+                                               stage_timing_builds=args.stage_timing)
+                with jenkins_client:
+                    migrator = BulkMigrator(jenkins_client, args.output_dir or 'codearts_output', workers=args.workers or 4,
+                                            build_output=not args.no_build_output,
+                                            critical_path_percentile=args.critical_path_percentile)
+                    summary = migrator.run(args.job_name)
+                
+                sys.exit(0 if summary['failed'] == 0 else 1)
+            
             # 在处理 Jenkins API 的部分修改为
             if args.jenkins_api:
                 logger.info(f"从Jenkins API解析: {args.jenkins_url}/job/{args.job_name}")
-                jenkins_client = JenkinsClient(args.jenkins_url, args.username, args.password, args.api_token)
-                pipeline_structure = jenkins_client.get_pipeline_structure(args.job_name)
+                jenkins_client = JenkinsClient(args.jenkins_url, args.username, args.password, args.api_token,
+                                               pool_maxsize=args.pool_size, timeout=args.timeout,
+                                               max_inflight=args.max_inflight,
+                                               http_cache=http_cache, throttle=throttle,
+                                               parse_cache=parse_cache, log_reader=log_reader,
+                                               stage_timing_builds=args.stage_timing)
+                with jenkins_client:
+                    pipeline_structure = jenkins_client.get_pipeline_structure(args.job_name)
                 logger.info(f"解析完成: {args.jenkins_url}/job/{args.job_name}")
                 
                 # 导出流水线结构
                 if args.export_structure:
-                    with open(args.export_structure, 'w', encoding='utf-8') as f:
-                        json.dump(pipeline_structure, f, indent=2, ensure_ascii=False)
+                    codec.export(pipeline_structure, args.export_structure)
                     logger.info(f"流水线结构已导出到: {args.export_structure}")
                 
                 # 解析流水线结构
@@ -126,9 +256,7 @@ def main():
                 pipeline_model = jenkins_api_parser.parse()
                 
                 # 导出解析后的流水线模型
-                with open("jenkins_pipeline_model.json", 'w', encoding='utf-8') as f:
-                    json.dump(pipeline_model.to_dict(), f, indent=2, ensure_ascii=False)
-                logger.info("解析后的流水线模型已导出到: jenkins_pipeline_model.json")
+                export_model(pipeline_model, args)
                 
                 # 转换为CodeArts YAML
                 converter = CodeArtsConverter(pipeline_model, args.output)
@@ -138,7 +266,7 @@ def main():
                     logger.error("生成CodeArts YAML失败")
                 
                 # 如果指定了构建任务输出路径，转换为CodeArts构建任务YAML
-                if args.build_output:
+                if not args.no_build_output:
                     build_converter = CodeArtsBuildConverter(pipeline_model, args.build_output)
                     build_success = build_converter.convert()
                     if build_success:
@@ -146,23 +274,35 @@ def main():
                     else:
                         logger.error("生成CodeArts构建任务YAML失败")
                 
+                # 根据阶段耗时生成关键路径报告
+                if pipeline_structure.get('stage_durations') and converter.codearts_yaml:
+                    report = build_critical_path_report(converter.codearts_yaml, pipeline_structure['stage_durations'],
+                                                        converter.pipeline_stages.get('stages'),
+                                                        args.critical_path_percentile)
+                    DirectorySink().write_json(args.critical_path_report, report)
+                    path_names = ' -> '.join(item['name'] for item in report['critical_path'])
+                    logger.info(f"关键路径（{report['percentile']}，共 {report['total_ms']} ms）: {path_names}")
+                    for candidate in report['parallel_candidates']:
+                        logger.info(f"可并行候选: {candidate['from']} -> {candidate['to']}，"
+                                    f"预计节省 {candidate['estimated_saving_ms']} ms")
+                    logger.info(f"关键路径报告已导出到: {args.critical_path_report}")
+                
                 # 不要再调用 BuildTaskConverter
                 return
         
         # 导出解析后的流水线模型，便于调试
-        with open("jenkins_pipeline_model.json", 'w', encoding='utf-8') as f:
-            json.dump(pipeline_model.to_dict(), f, indent=2, ensure_ascii=False)
-        logger.info("解析后的流水线模型已导出到: jenkins_pipeline_model.json")
+        export_model(pipeline_model, args)
         
         # 生成构建任务
-        build_converter = BuildTaskConverter(pipeline_model, args.build_output)
-        build_result = build_converter.convert()
-        
-        if build_result:
-            logger.info(f"构建任务已生成: {args.build_output}")
-        else:
-            logger.error("生成构建任务失败")
-            sys.exit(1)
+        if not args.no_build_output:
+            build_converter = BuildTaskConverter(pipeline_model, args.build_output)
+            build_result = build_converter.convert()
+            
+            if build_result:
+                logger.info(f"构建任务已生成: {args.build_output}")
+            else:
+                logger.error("生成构建任务失败")
+                sys.exit(1)
         
         # 如果只需要生成构建任务，则退出
         if args.build_only:
@@ -175,7 +315,7 @@ def main():
         success = converter.convert()
         
         # 如果指定了构建任务输出路径，转换为CodeArts构建任务YAML
-        if args.build_output:
+        if not args.no_build_output:
             build_converter = CodeArtsBuildConverter(pipeline_model, args.build_output)
             build_success = build_converter.convert()
             if build_success:
@@ -0,0 +1,259 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+批量迁移器
+负责遍历 Jenkins 实例或文件夹下的所有 Job，并使用工作线程池（或异步客户端的事件循环）批量转换为 CodeArts 配置
+"""
+
+import os
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from utils.logger import logger
+from utils.artifact_sink import open_sink
+from parsers.jenkins_api_parser import JenkinsApiParser
+from converters.structure_cache import StructureCache
+from converters.critical_path import build_critical_path_report
+
+class BulkMigrator:
+    """批量迁移器类"""
+
+    def __init__(self, jenkins_client, output_dir="codearts_output", workers=4, build_output=True,
+                 critical_path_percentile='p50'):
+        """
+        初始化批量迁移器
+
+        Args:
+            jenkins_client: JenkinsClient 对象，所有工作线程共享同一个连接池；
+                使用 run_async 时为 AsyncJenkinsClient 对象
+            output_dir: 输出根目录，每个 Job 在其下拥有独立的子目录；
+                扩展名为 .zip、.tar、.tar.gz 等时所有输出打包为一个文件
+            workers: 工作线程数量，异步模式下为同时迁移的 Job 数量
+            build_output: 是否同时生成 CodeArts 构建任务 YAML
+            critical_path_percentile: 关键路径报告使用的阶段耗时统计（p50、p95 或 max）
+        """
+        self.jenkins_client = jenkins_client
+        self.output_dir = output_dir
+        self.workers = max(1, workers)
+        self.build_output = build_output
+        self.critical_path_percentile = critical_path_percentile
+
+        # 所有 Job 共用的输出层：原子写入，内容未变化的文件跳过
+        self.sink = open_sink(output_dir)
+
+        # 按流水线结构缓存转换结果，只有取值不同的 Job 不再重复转换
+        self.structure_cache = StructureCache(build_output)
+
+        logger.info(f"初始化批量迁移器，输出目录: {output_dir}，工作线程数: {self.workers}")
+
+    def run(self, folder=None):
+        """
+        执行批量迁移
+
+        Args:
+            folder: 起始文件夹路径，为空时迁移整个 Jenkins 实例
+
+        Returns:
+            dict: 迁移汇总报告
+        """
+        start_time = time.time()
+
+        jobs = self.jenkins_client.list_jobs(folder)
+        logger.info(f"开始批量迁移 {len(jobs)} 个 Job")
+
+        results = []
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {executor.submit(self.migrate_job, job['name']): job for job in jobs}
+            for future in as_completed(futures):
+                result = future.result()
+                results.append(result)
+                logger.info(f"[{len(results)}/{len(jobs)}] {result['job']}: {result['status']}")
+
+        return self._summarize(folder, results, start_time)
+
+    async def run_async(self, folder=None):
+        """
+        使用异步客户端执行批量迁移
+
+        所有 Job 的请求在同一个事件循环中并发进行，转换和写文件在线程中执行。
+
+        Args:
+            folder: 起始文件夹路径，为空时迁移整个 Jenkins 实例
+
+        Returns:
+            dict: 迁移汇总报告
+        """
+        start_time = time.time()
+
+        jobs = await self.jenkins_client.list_jobs(folder)
+        logger.info(f"开始批量迁移 {len(jobs)} 个 Job（异步模式）")
+
+        semaphore = asyncio.Semaphore(self.workers)
+        results = []
+
+        async def migrate(job):
+            async with semaphore:
+                result = await self.migrate_job_async(job['name'])
+            results.append(result)
+            logger.info(f"[{len(results)}/{len(jobs)}] {result['job']}: {result['status']}")
+
+        await asyncio.gather(*(migrate(job) for job in jobs))
+
+        return self._summarize(folder, results, start_time)
+
+    def _summarize(self, folder, results, start_time):
+        """
+        生成并写入迁移汇总报告
+
+        Args:
+            folder: 起始文件夹路径
+            results: 各 Job 的迁移结果
+            start_time: 开始时间
+
+        Returns:
+            dict: 迁移汇总报告
+        """
+        # 按 Job 名称排序，保证报告稳定
+        results.sort(key=lambda result: result['job'])
+
+        summary = {
+            'jenkins_url': self.jenkins_client.jenkins_url,
+            'folder': folder or '',
+            'total': len(results),
+            'succeeded': sum(1 for result in results if result['status'] == 'success'),
+            'failed': sum(1 for result in results if result['status'] != 'success'),
+            'elapsed_seconds': round(time.time() - start_time, 2),
+            'distinct_structures': self.structure_cache.structures,
+            'jobs': results
+        }
+
+        self._write_summary(summary)
+        self.sink.close()
+        return summary
+
+    def migrate_job(self, job_name):
+        """
+        迁移单个 Job：获取流水线结构 → 解析 → 转换
+
+        Args:
+            job_name: Job 完整路径
+
+        Returns:
+            dict: 单个 Job 的迁移结果
+        """
+        start_time = time.time()
+        result = self._new_result(job_name)
+
+        try:
+            pipeline_structure = self.jenkins_client.get_pipeline_structure(job_name)
+            self._convert(pipeline_structure, job_name)
+        except Exception as e:
+            self._record_failure(result, e)
+
+        result['elapsed_seconds'] = round(time.time() - start_time, 2)
+        return result
+
+    async def migrate_job_async(self, job_name):
+        """
+        使用异步客户端迁移单个 Job
+
+        Args:
+            job_name: Job 完整路径
+
+        Returns:
+            dict: 单个 Job 的迁移结果
+        """
+        start_time = time.time()
+        result = self._new_result(job_name)
+
+        try:
+            pipeline_structure = await self.jenkins_client.get_pipeline_structure(job_name)
+            await asyncio.to_thread(self._convert, pipeline_structure, job_name)
+        except Exception as e:
+            self._record_failure(result, e)
+
+        result['elapsed_seconds'] = round(time.time() - start_time, 2)
+        return result
+
+    def _new_result(self, job_name):
+        """
+        创建单个 Job 的迁移结果
+
+        Args:
+            job_name: Job 完整路径
+
+        Returns:
+            dict: 迁移结果
+        """
+        return {
+            'job': job_name,
+            'status': 'success',
+            'output_dir': self.sink.location(self._get_job_dir(job_name)),
+            'error': ''
+        }
+
+    def _record_failure(self, result, error):
+        """
+        记录迁移失败
+
+        Args:
+            result: 迁移结果
+            error: 异常
+        """
+        logger.error(f"迁移 Job 失败: {result['job']}, 错误: {str(error)}")
+        result['status'] = 'failed'
+        result['error'] = str(error)
+
+    def _convert(self, pipeline_structure, job_name):
+        """
+        解析流水线结构并生成 CodeArts 配置
+
+        Args:
+            pipeline_structure: 流水线结构
+            job_name: Job 完整路径
+        """
+        job_sink = self.sink.scope(self._get_job_dir(job_name))
+
+        pipeline_model = JenkinsApiParser(pipeline_structure).parse()
+        pipeline_yaml, build_yaml = self.structure_cache.convert(pipeline_model)
+
+        job_sink.write_yaml('codearts_pipeline.yaml', pipeline_yaml)
+
+        # 获取了阶段耗时时附带关键路径报告
+        if pipeline_structure.get('stage_durations'):
+            report = build_critical_path_report(pipeline_yaml, pipeline_structure['stage_durations'],
+                                                pipeline_model.to_dict().get('stages'),
+                                                self.critical_path_percentile)
+            job_sink.write_json('critical_path.json', report)
+
+        if self.build_output:
+            job_sink.write_yaml('codearts_build.yaml', build_yaml)
+
+    def _get_job_dir(self, job_name):
+        """
+        获取 Job 相对于输出根目录的子目录，文件夹层级映射为子目录
+
+        Args:
+            job_name: Job 完整路径
+
+        Returns:
+            str: 子目录
+        """
+        parts = [part for part in job_name.replace('/job/', '/').split('/') if part]
+        return os.path.join(*parts)
+
+    def _write_summary(self, summary):
+        """
+        写入迁移汇总报告
+
+        Args:
+            summary: 迁移汇总报告
+        """
+        summary['artifacts'] = dict(self.sink.stats)
+        self.sink.write_json('migration_summary.json', summary)
+        summary_path = self.sink.location('migration_summary.json')
+
+        logger.info(f"批量迁移完成: 成功 {summary['succeeded']} 个，失败 {summary['failed']} 个，"
+                    f"写入 {summary['artifacts']['written']} 个文件，{summary['artifacts']['unchanged']} 个未变化，"
+                    f"汇总报告: {summary_path}")
@@ -0,0 +1,250 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Jenkinsfile 批量转换器
+查找目录（或 glob 模式）下的所有 Jenkinsfile 和 *.groovy 文件，使用进程池在多个 CPU 核心上并行解析和转换
+"""
+
+import os
+import glob
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from utils.logger import logger
+from utils.artifact_sink import DirectorySink
+from utils.template_loader import TemplateLoader
+from parsers.jenkins_file_parser import JenkinsfileParser
+from parsers.parse_cache import ParseCache
+from converters.codearts_converter import CodeArtsConverter, load_pipeline_mapping
+from converters.codearts_build_converter import CodeArtsBuildConverter, load_build_template
+
+# 输出到源文件旁边时生成的文件后缀，重复运行时不能当作 Jenkinsfile
+OUTPUT_EXTENSIONS = ('.yaml', '.yml', '.json')
+
+# 每个工作进程加载一次的模板、映射配置和解析缓存
+_worker_state = {}
+
+def find_jenkinsfiles(source):
+    """
+    查找需要转换的 Jenkinsfile
+
+    Args:
+        source: 目录路径或 glob 模式（支持 **）
+
+    Returns:
+        list: 排序后的文件路径列表
+    """
+    if os.path.isdir(source):
+        paths = []
+        for dirpath, dirnames, filenames in os.walk(source):
+            # 跳过隐藏目录（.git 等）
+            dirnames[:] = sorted(name for name in dirnames if not name.startswith('.'))
+            for filename in filenames:
+                if is_jenkinsfile(filename):
+                    paths.append(os.path.join(dirpath, filename))
+        return sorted(paths)
+
+    return sorted(path for path in glob.glob(source, recursive=True) if os.path.isfile(path))
+
+def is_jenkinsfile(filename):
+    """
+    判断文件名是否为 Jenkinsfile
+
+    Args:
+        filename: 文件名
+
+    Returns:
+        bool: Jenkinsfile、Jenkinsfile.*、*.jenkinsfile 和 *.groovy 返回 True，生成的 YAML/JSON 文件除外
+    """
+    if filename.endswith(OUTPUT_EXTENSIONS):
+        return False
+    return filename == 'Jenkinsfile' or filename.startswith('Jenkinsfile.') \
+        or filename.endswith('.jenkinsfile') or filename.endswith('.groovy')
+
+def _init_worker(parse_cache_path=None, parse_cache_size=64):
+    """
+    工作进程初始化：加载模板、映射配置、解析缓存和输出层，进程内的所有文件共用
+
+    Args:
+        parse_cache_path: 可选的解析缓存文件路径
+        parse_cache_size: 解析缓存的最大大小（MB）
+    """
+    _worker_state['template_loader'] = TemplateLoader()
+    _worker_state['mapping_config'] = load_pipeline_mapping()
+    _worker_state['build_template'] = load_build_template()
+    _worker_state['parse_cache'] = ParseCache(parse_cache_path, parse_cache_size) if parse_cache_path else None
+    _worker_state['sink'] = DirectorySink()
+
+def _convert_file(path, pipeline_output, build_output):
+    """
+    在工作进程中解析并转换一个 Jenkinsfile
+
+    Args:
+        path: Jenkinsfile 路径
+        pipeline_output: CodeArts 流水线 YAML 输出路径
+        build_output: CodeArts 构建任务 YAML 输出路径，为空时不生成
+
+    Returns:
+        dict: 单个文件的转换结果
+    """
+    start_time = time.time()
+    result = {
+        'file': path,
+        'status': 'success',
+        'outputs': [],
+        'error': ''
+    }
+
+    try:
+        pipeline_model = JenkinsfileParser(path, parse_cache=_worker_state.get('parse_cache')).parse()
+
+        converter = CodeArtsConverter(pipeline_model, pipeline_output,
+                                      template_loader=_worker_state.get('template_loader'),
+                                      mapping_config=_worker_state.get('mapping_config'),
+                                      sink=_worker_state.get('sink'))
+        if not converter.convert():
+            raise RuntimeError("生成CodeArts YAML失败")
+        result['outputs'].append(pipeline_output)
+
+        if build_output:
+            build_converter = CodeArtsBuildConverter(pipeline_model, build_output,
+                                                     build_template=_worker_state.get('build_template'),
+                                                     sink=_worker_state.get('sink'))
+            if not build_converter.convert():
+                raise RuntimeError("生成CodeArts构建任务YAML失败")
+            result['outputs'].append(build_output)
+    except Exception as e:
+        logger.error(f"转换 Jenkinsfile 失败: {path}, 错误: {str(e)}")
+        result['status'] = 'failed'
+        result['error'] = str(e)
+
+    result['elapsed_seconds'] = round(time.time() - start_time, 2)
+    return result
+
+class JenkinsfileBatchConverter:
+    """Jenkinsfile 批量转换器类"""
+
+    def __init__(self, source, output_dir=None, workers=None, build_output=True,
+                 parse_cache_path=None, parse_cache_size=64):
+        """
+        初始化批量转换器
+
+        Args:
+            source: 目录路径或 glob 模式
+            output_dir: 输出根目录，按源文件的相对路径镜像目录结构；为空时输出到源文件旁边
+            workers: 工作进程数量，默认为 CPU 核心数
+            build_output: 是否同时生成 CodeArts 构建任务 YAML
+            parse_cache_path: 可选的解析缓存文件路径，所有工作进程共用
+            parse_cache_size: 解析缓存的最大大小（MB）
+        """
+        self.source = source
+        self.output_dir = output_dir
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.build_output = build_output
+        self.parse_cache_path = parse_cache_path
+        self.parse_cache_size = parse_cache_size
+
+        # 镜像输出时相对路径的起点：目录本身，或 glob 模式中第一个通配符之前的目录
+        if os.path.isdir(source):
+            self.source_root = source
+        else:
+            self.source_root = _glob_root(source)
+
+        logger.info(f"初始化 Jenkinsfile 批量转换器，来源: {source}，工作进程数: {self.workers}")
+
+    def run(self):
+        """
+        执行批量转换
+
+        Returns:
+            dict: 转换汇总报告
+        """
+        start_time = time.time()
+
+        paths = find_jenkinsfiles(self.source)
+        logger.info(f"找到 {len(paths)} 个 Jenkinsfile")
+
+        results = []
+        if paths:
+            with ProcessPoolExecutor(max_workers=min(self.workers, len(paths)), initializer=_init_worker,
+                                     initargs=(self.parse_cache_path, self.parse_cache_size)) as executor:
+                futures = [executor.submit(_convert_file, path, *self._get_output_paths(path)) for path in paths]
+                for future in as_completed(futures):
+                    result = future.result()
+                    results.append(result)
+                    logger.info(f"[{len(results)}/{len(paths)}] {result['file']}: {result['status']}")
+
+        # 按文件路径排序，保证报告稳定
+        results.sort(key=lambda result: result['file'])
+
+        summary = {
+            'source': self.source,
+            'total': len(results),
+            'succeeded': sum(1 for result in results if result['status'] == 'success'),
+            'failed': sum(1 for result in results if result['status'] != 'success'),
+            'elapsed_seconds': round(time.time() - start_time, 2),
+            'files': results
+        }
+
+        self._write_summary(summary)
+        return summary
+
+    def _get_output_paths(self, path):
+        """
+        获取单个 Jenkinsfile 的输出路径
+
+        镜像输出时每个源文件对应 output_dir 下与其相对路径同名的目录；
+        否则输出到源文件旁边，文件名以源文件名为前缀。
+
+        Args:
+            path: Jenkinsfile 路径
+
+        Returns:
+            tuple: (流水线 YAML 路径, 构建任务 YAML 路径或 None)
+        """
+        if self.output_dir:
+            relative_path = os.path.relpath(path, self.source_root)
+            job_dir = os.path.join(self.output_dir, relative_path)
+            pipeline_output = os.path.join(job_dir, 'codearts_pipeline.yaml')
+            build_output = os.path.join(job_dir, 'codearts_build.yaml')
+        else:
+            pipeline_output = f"{path}.codearts_pipeline.yaml"
+            build_output = f"{path}.codearts_build.yaml"
+
+        return pipeline_output, build_output if self.build_output else None
+
+    def _write_summary(self, summary):
+        """
+        写入转换汇总报告，输出到源文件旁边时只记录日志
+
+        Args:
+            summary: 转换汇总报告
+        """
+        if not self.output_dir:
+            logger.info(f"批量转换完成: 成功 {summary['succeeded']} 个，失败 {summary['failed']} 个")
+            return
+
+        summary_path = os.path.join(self.output_dir, 'conversion_summary.json')
+        DirectorySink().write_json(summary_path, summary)
+
+        logger.info(f"批量转换完成: 成功 {summary['succeeded']} 个，失败 {summary['failed']} 个，汇总报告: {summary_path}")
+
+def _glob_root(pattern):
+    """
+    获取 glob 模式中第一个通配符之前的目录
+
+    Args:
+        pattern: glob 模式
+
+    Returns:
+        str: 目录路径
+    """
+    parts = []
+    for part in pattern.replace('\\', '/').split('/'):
+        if glob.has_magic(part):
+            break
+        parts.append(part)
+    else:
+        # 没有通配符时为单个文件，使用其所在目录
+        parts = parts[:-1]
+    return '/'.join(parts) or '.'
@@ -7,10 +7,16 @@ Jenkins 流水线数据模型
 """
 
 from utils.logger import logger
+from models.xml_document import XmlDocument
+from models.structure import ModelAbstraction
+from models.records import Stage, Step, Parameter, Scm, _plain
 
 class PipelineModel:
     """Jenkins 流水线数据模型"""
     
+    # 批量迁移时内存中会同时存在大量模型，使用槽减少每个模型的开销
+    __slots__ = ('name', 'type', 'parameters', 'environment', 'agent', 'stages', 'build_steps', '_scm', 'xml_content')
+    
     def __init__(self):
         """初始化流水线数据模型"""
         self.name = ""
@@ -21,15 +27,56 @@ class PipelineModel:
         self.stages = []
         self.build_steps = []
         self.scm = {}  # 添加 SCM 属性
-        self.xml_content = ""  # 添加原始XML内容
+        self.xml_content = ""  # config.xml 内容（只保留转换用到的节点）
+    
+    @property
+    def scm(self):
+        """SCM 信息（url、branch）"""
+        return self._scm
+    
+    @scm.setter
+    def scm(self, value):
+        self._scm = Scm.from_dict(value or {})
+    
+    @property
+    def xml_document(self):
+        """
+        原始 config.xml 的已解析文档，同一内容在进程内只解析一次
+        
+        文档不挂在模型上，大量模型同时存在时不会各自持有一棵 XML 树。
+        
+        Returns:
+            XmlDocument: 文档对象，没有 XML 内容时返回 None
+        """
+        if not self.xml_content:
+            return None
+        return XmlDocument.from_string(self.xml_content)
+    
+    def abstract(self):
+        """
+        去除参数值、环境变量值、SCM 和命令中的 URL 等取值，得到模型的结构
+        
+        Returns:
+            ModelAbstraction: 结构、被替换的取值和结构哈希
+        """
+        return ModelAbstraction(self)
+    
+    def structural_hash(self):
+        """
+        结构哈希：阶段、步骤类型和命令（URL 已替换）相同，只有取值不同的模型哈希相同
+        
+        Returns:
+            str: 哈希，模型内容中出现占位符等无法安全去重时为 None
+        """
+        return self.abstract().digest
     
     def add_parameter(self, name, value="", description=""):
         """添加参数"""
-        self.parameters.append({
-            "name": name,
-            "value": value,
-            "description": description
-        })
+        self.parameters.append(Parameter(
+            name=name,
+            value=value,
+            description=description
+        ))
     
     def add_environment(self, name, value):
         """添加环境变量"""
@@ -37,6 +84,7 @@ class PipelineModel:
     
     def add_stage(self, stage):
         """添加阶段"""
+        stage = Stage.from_dict(stage)
         self.stages.append(stage)
         logger.info(f"添加阶段: {stage.get('name', '未命名')}")
     
@@ -50,12 +98,12 @@ class PipelineModel:
             command: 步骤命令
             stage: 所属阶段
         """
-        self.build_steps.append({
-            "name": name,
-            "type": type,
-            "command": command,
-            "stage": stage
-        })
+        self.build_steps.append(Step(
+            name=name,
+            type=type,
+            command=command,
+            stage=stage
+        ))
     
     def set_scm(self, url, branch="master"):
         """
@@ -72,13 +120,34 @@ class PipelineModel:
         logger.info(f"设置 SCM 信息: URL={url}, branch={branch}")
     
     def to_dict(self):
-        """转换为字典"""
+        """转换为字典，记录在调用时才转换为普通字典"""
         return {
             "name": self.name,
-            "parameters": self.parameters,
+            "parameters": [_plain(param) for param in self.parameters],
             "environment": self.environment,
             "agent": self.agent,
-            "stages": self.stages,
-            "build_steps": self.build_steps,
-            "scm": self.scm
-        }
\ No newline at end of file
+            "stages": [_plain(stage) for stage in self.stages],
+            "build_steps": [_plain(step) for step in self.build_steps],
+            "scm": self.scm.to_dict()
+        }
+    
+    @classmethod
+    def from_dict(cls, data):
+        """
+        从 to_dict 的结果还原流水线模型
+        
+        Args:
+            data: to_dict 返回的字典
+            
+        Returns:
+            PipelineModel: 流水线模型
+        """
+        model = cls()
+        model.name = data.get("name", "")
+        model.parameters = [Parameter.from_dict(param) for param in data.get("parameters", [])]
+        model.environment = data.get("environment", {})
+        model.agent = data.get("agent", {"type": "any"})
+        model.stages = [Stage.from_dict(stage) for stage in data.get("stages", [])]
+        model.build_steps = [Step.from_dict(step) for step in data.get("build_steps", [])]
+        model.scm = data.get("scm", {})
+        return model
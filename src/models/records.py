@@ -0,0 +1,164 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+流水线模型的紧凑记录类型
+Stage、Step、Parameter、Scm 使用 __slots__ 存储字段，重复出现的字符串（阶段名称、步骤类型、命令等）
+在进程内驻留共享，批量迁移时数千个模型不再各自持有一份嵌套字典。
+
+记录实现了 MutableMapping 接口，原有的 stage['name']、step.get('type')、'command' in step 等写法保持可用；
+没有赋值的字段视为不存在的键，与原来的字典行为一致。to_dict() 只在需要时生成普通字典
+"""
+
+import sys
+from collections.abc import Mapping, MutableMapping
+
+class Record(MutableMapping):
+    """记录基类：FIELDS 中的键存放在槽中，其余键存放在 _extra 字典中"""
+
+    __slots__ = ('_extra',)
+
+    # 按输出顺序排列的字段
+    FIELDS = ()
+
+    def __init__(self, values=None, **fields):
+        """
+        初始化记录
+
+        Args:
+            values: 可选的初始字典
+            **fields: 字段值
+        """
+        self._extra = None
+        if values:
+            self.update(values)
+        if fields:
+            self.update(fields)
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        从字典创建记录，已经是该类型的记录时直接返回
+
+        Args:
+            data: 字典或记录
+
+        Returns:
+            Record: 记录
+        """
+        if isinstance(data, cls):
+            return data
+        return cls(data)
+
+    def _convert(self, key, value):
+        """字段值的规范化，子类可覆盖；字符串在进程内驻留"""
+        if type(value) is str:
+            return sys.intern(value)
+        return value
+
+    def __getitem__(self, key):
+        if key in self.FIELDS:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        if self._extra is None:
+            raise KeyError(key)
+        return self._extra[key]
+
+    def __setitem__(self, key, value):
+        value = self._convert(key, value)
+        if key in self.FIELDS:
+            setattr(self, key, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __delitem__(self, key):
+        if key in self.FIELDS:
+            try:
+                delattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        elif self._extra is not None and key in self._extra:
+            del self._extra[key]
+        else:
+            raise KeyError(key)
+
+    def __iter__(self):
+        for key in self.FIELDS:
+            if hasattr(self, key):
+                yield key
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __contains__(self, key):
+        if key in self.FIELDS:
+            return hasattr(self, key)
+        return self._extra is not None and key in self._extra
+
+    def __eq__(self, other):
+        if isinstance(other, Mapping):
+            return dict(self.items()) == dict(other.items())
+        return NotImplemented
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+    def to_dict(self):
+        """
+        转换为普通字典，嵌套的记录同样转换
+
+        Returns:
+            dict: 字典
+        """
+        return {key: _plain(value) for key, value in self.items()}
+
+class Step(Record):
+    """步骤记录"""
+
+    __slots__ = ('name', 'type', 'url', 'branch', 'credentials', 'command', 'content', 'stage')
+    FIELDS = __slots__
+
+class Stage(Record):
+    """阶段记录，steps 中的字典转换为 Step"""
+
+    __slots__ = ('name', 'steps')
+    FIELDS = __slots__
+
+    def _convert(self, key, value):
+        if key == 'steps' and isinstance(value, list):
+            return [Step.from_dict(step) if isinstance(step, Mapping) else step for step in value]
+        return super()._convert(key, value)
+
+class Parameter(Record):
+    """参数记录"""
+
+    __slots__ = ('name', 'type', 'value', 'default', 'description')
+    FIELDS = __slots__
+
+class Scm(Record):
+    """SCM 记录"""
+
+    __slots__ = ('url', 'branch')
+    FIELDS = __slots__
+
+def _plain(value):
+    """
+    将记录（包括列表中的记录）转换为普通字典
+
+    Args:
+        value: 任意值
+
+    Returns:
+        转换后的值
+    """
+    if isinstance(value, Record):
+        return value.to_dict()
+    if isinstance(value, list):
+        return [_plain(item) for item in value]
+    return value
@@ -0,0 +1,207 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+流水线模型的结构摘要
+同一 Job 模板实例化出的 Job 通常只有参数值、SCM URL 等取值不同。这里把这些取值替换为占位符，
+得到与取值无关的结构和结构哈希；转换器只需按结构转换一次，再把每个 Job 自己的取值代回输出
+"""
+
+import re
+import copy
+import json
+import hashlib
+import xml.etree.ElementTree as ET
+from models.xml_document import XmlDocument
+
+# 占位符格式，序号为取值在 values 中的下标
+TOKEN_PREFIX = '__jtc_value_'
+TOKEN_PATTERN = re.compile(r'__jtc_value_(\d+)__')
+
+# 命令中的 URL
+URL_PATTERN = re.compile(r'(?:https?|ssh|git)://[^\s\'"<>]+|git@[^\s\'"<>]+')
+
+# 转换器按命令中是否出现这些片段选择输出结构（如包含 mvn 的 Shell 步骤转换为 Maven 步骤），
+# 替换 URL 后出现情况发生变化的命令保留原文
+COMMAND_MARKERS = ('mvn', 'maven', 'git clone')
+
+# 步骤中整体替换为占位符的字段
+STEP_VALUE_FIELDS = ('url', 'branch', 'credentials')
+
+# 步骤中只替换 URL 的文本字段
+STEP_TEXT_FIELDS = ('command', 'content')
+
+class ModelAbstraction:
+    """流水线模型去除取值后的结构，以及被替换掉的取值"""
+
+    def __init__(self, model):
+        """
+        从流水线模型生成结构
+
+        Args:
+            model: PipelineModel 对象
+        """
+        # 下标 -> 取值
+        self.values = []
+        # (类型, 取值) -> 占位符，相同取值共用同一个占位符
+        self._tokens = {}
+
+        self.xml_content = model.xml_content
+        self.data = self._abstract_dict(model.to_dict())
+
+        # 原始内容中已经出现占位符时无法安全代回，XML 无法解析时转换结果取决于原文，都不参与去重
+        conflict = TOKEN_PREFIX in json.dumps(model.to_dict(), ensure_ascii=False, default=repr) \
+            or TOKEN_PREFIX in (self.xml_content or '')
+        try:
+            self.xml = self._abstract_xml(model.xml_document)
+        except ET.ParseError:
+            self.xml = None
+            conflict = True
+        self.digest = None if conflict else _digest({'model': self.data, 'xml': self.xml})
+
+    def value(self, value):
+        """
+        将非空的标量取值替换为占位符，空值保持原样（转换器会根据取值是否为空选择输出）
+
+        Args:
+            value: 取值
+
+        Returns:
+            占位符或原值
+        """
+        if not value or not isinstance(value, (str, int, float)):
+            return value
+        key = (type(value), value)
+        token = self._tokens.get(key)
+        if token is None:
+            token = f"{TOKEN_PREFIX}{len(self.values)}__"
+            self._tokens[key] = token
+            self.values.append(value)
+        return token
+
+    def text(self, text):
+        """
+        将文本中的 URL 替换为占位符
+
+        Args:
+            text: 命令或脚本内容
+
+        Returns:
+            str: 替换后的文本，替换会改变 COMMAND_MARKERS 的出现情况时返回原文
+        """
+        if not isinstance(text, str) or not URL_PATTERN.search(text):
+            return text
+        candidate = URL_PATTERN.sub(f"{TOKEN_PREFIX}0__", text)
+        if any((marker in text) != (marker in candidate) for marker in COMMAND_MARKERS):
+            return text
+        return URL_PATTERN.sub(lambda match: self.value(match.group(0)), text)
+
+    def _abstract_dict(self, data):
+        """
+        替换 to_dict 结果中的取值
+
+        Args:
+            data: PipelineModel.to_dict() 的结果，参数、阶段和步骤均为新建的字典
+
+        Returns:
+            dict: 结构
+        """
+        data['name'] = self.value(data['name'])
+        for param in data['parameters']:
+            for key in ('value', 'default'):
+                if key in param:
+                    param[key] = self.value(param[key])
+        data['environment'] = {key: self.value(value) for key, value in data['environment'].items()}
+        for stage in data['stages']:
+            for step in stage.get('steps', []):
+                self._abstract_step(step)
+        for step in data['build_steps']:
+            self._abstract_step(step)
+        data['scm'] = {key: self.value(value) for key, value in data['scm'].items()}
+        return data
+
+    def _abstract_step(self, step):
+        """
+        替换步骤中的取值
+
+        Args:
+            step: 步骤字典
+        """
+        if not isinstance(step, dict):
+            return
+        for field in STEP_VALUE_FIELDS:
+            if field in step:
+                step[field] = self.value(step[field])
+        for field in STEP_TEXT_FIELDS:
+            if field in step:
+                step[field] = self.text(step[field])
+
+    def _abstract_xml(self, document):
+        """
+        提取构建任务转换器从 config.xml 读取的内容，url 替换为占位符
+
+        Args:
+            document: XmlDocument 对象或 None
+
+        Returns:
+            dict: 转换器读取的 XML 内容，没有 XML 时为 None
+        """
+        if document is None:
+            return None
+        return {
+            'maven_targets': [builder['targets'] for builder in document.maven_builders],
+            'urls': [self.value(url) for url in document.urls]
+        }
+
+    def template_xml(self):
+        """
+        生成 url 替换为占位符的 config.xml，用于按结构转换
+
+        Returns:
+            str: XML 内容，没有 XML 时为空字符串
+        """
+        if not self.xml_content:
+            return ''
+        # 文档在进程内共享，修改前先复制
+        root = copy.deepcopy(XmlDocument.from_string(self.xml_content).root)
+        for url in root.iter('url'):
+            if url.text and url.text.strip():
+                url.text = self._tokens[(str, url.text.strip())]
+        return ET.tostring(root, encoding='unicode')
+
+def substitute(document, values):
+    """
+    将占位符替换为取值，返回新的对象，原对象不变
+
+    整个字符串就是占位符时替换为原始类型的取值，否则按字符串替换。
+
+    Args:
+        document: 按结构转换得到的字典、列表或标量
+        values: ModelAbstraction.values
+
+    Returns:
+        替换后的对象
+    """
+    if isinstance(document, dict):
+        return {key: substitute(value, values) for key, value in document.items()}
+    if isinstance(document, list):
+        return [substitute(item, values) for item in document]
+    if isinstance(document, str) and TOKEN_PREFIX in document:
+        match = TOKEN_PATTERN.fullmatch(document)
+        if match:
+            return values[int(match.group(1))]
+        return TOKEN_PATTERN.sub(lambda match: str(values[int(match.group(1))]), document)
+    return document
+
+def _digest(structure):
+    """
+    计算结构哈希，保留键的顺序（环境变量等的顺序会影响输出）
+
+    Args:
+        structure: 结构
+
+    Returns:
+        str: SHA-1 十六进制摘要
+    """
+    payload = json.dumps(structure, ensure_ascii=False, default=repr)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
@@ -0,0 +1,251 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Jenkins config.xml 文档模型
+config.xml 在整个进程内只解析一次，客户端、解析器和转换器通过带缓存的访问器
+读取构建步骤、发布步骤和 SCM 信息，不再各自重新解析原始字符串。
+
+解析使用 iterparse 流式进行，只保留转换用到的顶层节点，其余节点（矩阵轴、插件配置等）
+在读取过程中立即丢弃，几十 MB 的 config.xml 也不会在内存中构建完整的树
+"""
+
+import io
+import hashlib
+import threading
+import functools
+from collections import OrderedDict
+import xml.etree.ElementTree as ET
+from parsers.freestyle_extractors import extract_freestyle_steps
+
+# 进程内缓存的已解析文档数量
+DOCUMENT_CACHE_SIZE = 32
+
+# 保留的顶层节点，definition 中包含内联 Jenkinsfile
+KEPT_SECTIONS = frozenset(('scm', 'builders', 'publishers', 'properties', 'definition'))
+
+# 转换器能够转换的构建步骤类型，其余类型（bat、gradle、ant 等）只在 steps 中提供，不进入流水线模型
+CONVERTIBLE_BUILDER_TYPES = ('sh', 'maven')
+
+# 内容摘要 -> 文档，按最近使用顺序排列；以摘要为键，缓存不会持有原始内容
+_documents = OrderedDict()
+_documents_lock = threading.Lock()
+
+class XmlDocument:
+    """已解析的 config.xml，各访问器在首次使用时计算并缓存结果"""
+
+    def __init__(self, content):
+        """
+        初始化文档，XML 在首次访问 root 时才解析
+
+        Args:
+            content: config.xml 内容（str 或 bytes）
+        """
+        self._content = content.encode('utf-8') if isinstance(content, str) else content
+        self._root = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_string(cls, content):
+        """
+        获取 config.xml 对应的文档，相同内容在进程内共用同一个已解析文档
+
+        原始内容和精简后的 text 都能命中同一个文档。
+
+        Args:
+            content: config.xml 内容（str 或 bytes）
+
+        Returns:
+            XmlDocument: 文档对象
+        """
+        if isinstance(content, str):
+            content = content.encode('utf-8')
+        key = _digest(content)
+
+        with _documents_lock:
+            document = _documents.get(key)
+            if document is not None:
+                _documents.move_to_end(key)
+                return document
+
+        document = cls(content)
+        _remember(key, document)
+        return document
+
+    @property
+    def root(self):
+        """
+        根元素，只包含 KEPT_SECTIONS 中的顶层节点
+
+        解析失败时抛出 xml.etree.ElementTree.ParseError。
+        """
+        if self._root is None:
+            with self._lock:
+                if self._root is None:
+                    self._root = _stream_parse(io.BytesIO(self._content))
+                    # 解析完成后只保留精简的树，释放原始内容
+                    self._content = None
+        return self._root
+
+    @functools.cached_property
+    def text(self):
+        """精简后的 XML 文本，只包含保留的顶层节点"""
+        text = ET.tostring(self.root, encoding='unicode')
+        # 精简文本也登记到缓存，解析器和转换器用它获取文档时不再重新解析
+        _remember(_digest(text.encode('utf-8')), self)
+        return text
+
+    @property
+    def tag(self):
+        """根元素标签，Freestyle 项目为 project"""
+        return self.root.tag
+
+    @functools.cached_property
+    def scm(self):
+        """scm 元素，不存在时为 None"""
+        return self.root.find('scm')
+
+    @functools.cached_property
+    def builders(self):
+        """builders 元素，不存在时为 None"""
+        return self.root.find('builders')
+
+    @functools.cached_property
+    def publishers(self):
+        """publishers 元素，不存在时为 None"""
+        return self.root.find('publishers')
+
+    @functools.cached_property
+    def git_url(self):
+        """Git 仓库 URL，不是 Git SCM 时为空字符串"""
+        if self.scm is None or self.scm.get('class') != 'hudson.plugins.git.GitSCM':
+            return ''
+        return _text(self.scm.find('.//url'))
+
+    @functools.cached_property
+    def git_branch(self):
+        """Git 分支规格（如 */develop），未配置时为空字符串"""
+        if self.scm is None:
+            return ''
+        return _text(self.scm.find('branches/hudson.plugins.git.BranchSpec/name'))
+
+    @functools.cached_property
+    def urls(self):
+        """保留节点中所有 url 元素的非空文本"""
+        return [url.text.strip() for url in self.root.iter('url') if url.text and url.text.strip()]
+
+    @functools.cached_property
+    def steps(self):
+        """builders 和 publishers 中所有已注册类型的步骤，单次遍历提取"""
+        return extract_freestyle_steps(self.root)
+
+    def steps_of(self, step_type, section='builders'):
+        """
+        按类型筛选步骤
+
+        Args:
+            step_type: 步骤类型（sh、maven、ssh 等）
+            section: 所在的顶层节点
+
+        Returns:
+            list: 步骤列表
+        """
+        return [step for step in self.steps if step['type'] == step_type and step['section'] == section]
+
+    @property
+    def build_steps(self):
+        """builders 中转换器能够转换的步骤，按文档顺序（即 Jenkins 的执行顺序）"""
+        return [
+            step for step in self.steps
+            if step['section'] == 'builders' and step['type'] in CONVERTIBLE_BUILDER_TYPES
+        ]
+
+    @property
+    def maven_builders(self):
+        """Maven 构建步骤列表（包括条件步骤中嵌套的），每项为 {targets, properties}"""
+        return [
+            {
+                'targets': step['command'],
+                'properties': step['properties']
+            }
+            for step in self.steps_of('maven')
+        ]
+
+    @property
+    def shell_commands(self):
+        """Shell 构建步骤的原始命令列表（包括条件步骤中嵌套的）"""
+        return [step['command'] for step in self.steps_of('sh')]
+
+    @property
+    def exec_commands(self):
+        """publishers 中 Publish over SSH 的远程命令列表"""
+        return [step['command'] for step in self.steps_of('ssh', 'publishers')]
+
+def _stream_parse(source):
+    """
+    流式解析 config.xml，丢弃 KEPT_SECTIONS 以外的顶层节点
+
+    被丢弃节点中的每个元素在结束标签处立即从父节点上摘除，
+    内存占用只与保留节点的大小和嵌套深度有关，与文件大小无关。
+
+    Args:
+        source: 二进制文件对象
+
+    Returns:
+        Element: 根元素
+    """
+    stack = []
+    for event, element in ET.iterparse(source, events=('start', 'end')):
+        if event == 'start':
+            stack.append(element)
+            continue
+
+        stack.pop()
+        if len(stack) >= 2 and stack[1].tag not in KEPT_SECTIONS:
+            # 丢弃节点内部的元素：读完即摘除
+            stack[-1].remove(element)
+        elif len(stack) == 1 and element.tag not in KEPT_SECTIONS:
+            # 丢弃的顶层节点本身
+            stack[0].remove(element)
+        elif not stack:
+            return element
+
+def _digest(data):
+    """
+    计算缓存键
+
+    Args:
+        data: 字节内容
+
+    Returns:
+        str: SHA-1 十六进制摘要
+    """
+    return hashlib.sha1(data).hexdigest()
+
+def _remember(key, document):
+    """
+    将文档加入缓存，超出 DOCUMENT_CACHE_SIZE 时淘汰最久未使用的文档
+
+    Args:
+        key: 内容摘要
+        document: 文档对象
+    """
+    with _documents_lock:
+        _documents[key] = document
+        _documents.move_to_end(key)
+        while len(_documents) > DOCUMENT_CACHE_SIZE:
+            _documents.popitem(last=False)
+
+def _text(element):
+    """
+    获取元素去除首尾空白后的文本
+
+    Args:
+        element: XML 元素或 None
+
+    Returns:
+        str: 文本，元素不存在或没有文本时为空字符串
+    """
+    if element is None or element.text is None:
+        return ''
+    return element.text.strip()
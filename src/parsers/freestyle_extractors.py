@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Freestyle 构建步骤提取器注册表
+按 config.xml 中的元素标签（hudson.tasks.Shell、hudson.tasks.Maven 等）登记提取函数，
+单次遍历 builders 和 publishers，按标签直接分派，新增插件类型不需要额外扫描整棵树
+"""
+
+def _text(element, path):
+    """获取子元素去除首尾空白后的文本，不存在时为空字符串"""
+    child = element.find(path)
+    if child is None or child.text is None:
+        return ''
+    return child.text.strip()
+
+def _extract_shell(element):
+    """提取 Shell 步骤，保留命令原文"""
+    command = element.find('command')
+    if command is None or not command.text:
+        return None
+    return {
+        'name': 'Shell',
+        'type': 'sh',
+        'command': command.text
+    }
+
+def _extract_batch(element):
+    """提取 Windows 批处理步骤"""
+    command = element.find('command')
+    if command is None or not command.text:
+        return None
+    return {
+        'name': 'Batch',
+        'type': 'bat',
+        'command': command.text
+    }
+
+def _extract_maven(element):
+    """提取 Maven 步骤，properties 为每行一个的 key=value"""
+    return {
+        'name': 'Maven',
+        'type': 'maven',
+        'command': _text(element, 'targets'),
+        'properties': _text(element, 'properties')
+    }
+
+def _extract_gradle(element):
+    """提取 Gradle 步骤"""
+    tasks = _text(element, 'tasks')
+    switches = _text(element, 'switches')
+    if not tasks and not switches:
+        return None
+    return {
+        'name': 'Gradle',
+        'type': 'gradle',
+        'command': ' '.join(part for part in (switches, tasks) if part)
+    }
+
+def _extract_ant(element):
+    """提取 Ant 步骤"""
+    return {
+        'name': 'Ant',
+        'type': 'ant',
+        'command': _text(element, 'targets')
+    }
+
+def _extract_ssh_transfer(element):
+    """提取 Publish over SSH 的远程命令"""
+    command = element.find('execCommand')
+    if command is None or not command.text:
+        return None
+    return {
+        'name': 'Deploy',
+        'type': 'ssh',
+        'command': command.text
+    }
+
+# 元素标签 -> 提取函数，提取函数接收 XML 元素，返回步骤字典或 None
+FREESTYLE_EXTRACTORS = {
+    'hudson.tasks.Shell': _extract_shell,
+    'hudson.tasks.BatchFile': _extract_batch,
+    'hudson.tasks.Maven': _extract_maven,
+    'hudson.plugins.gradle.Gradle': _extract_gradle,
+    'hudson.tasks.Ant': _extract_ant,
+    'jenkins.plugins.publish__over__ssh.BapSshTransfer': _extract_ssh_transfer
+}
+
+# 遍历的顶层节点
+STEP_SECTIONS = ('builders', 'publishers')
+
+def register_freestyle_extractor(tag, extractor):
+    """
+    注册构建步骤提取函数，同一标签会覆盖已有的提取函数
+
+    Args:
+        tag: config.xml 中的元素标签
+        extractor: 提取函数，参数为 XML 元素，返回步骤字典，不需要提取时返回 None
+    """
+    FREESTYLE_EXTRACTORS[tag] = extractor
+
+def extract_freestyle_steps(root):
+    """
+    单次遍历 builders 和 publishers，按文档顺序提取所有已注册的步骤
+
+    条件步骤等容器中嵌套的步骤同样会被提取。
+
+    Args:
+        root: config.xml 根元素
+
+    Returns:
+        list: 步骤列表，每个步骤的 section 为所在的顶层节点（builders 或 publishers）
+    """
+    steps = []
+    for section in root:
+        if section.tag not in STEP_SECTIONS:
+            continue
+        for element in section.iter():
+            extractor = FREESTYLE_EXTRACTORS.get(element.tag)
+            if extractor is None:
+                continue
+            step = extractor(element)
+            if step is not None:
+                step['section'] = section.tag
+                steps.append(step)
+    return steps
@@ -7,9 +7,10 @@ Jenkins API 解析器
 """
 import os
 import re
-import yaml
 import re
+import xml.etree.ElementTree as ET
 from utils.logger import logger
+from utils.template_loader import load_yaml_file
 from parsers.base_parser import BaseParser
 
 class JenkinsApiParser(BaseParser):
@@ -306,9 +307,8 @@ class JenkinsApiParser(BaseParser):
             raise FileNotFoundError(f"构建配置文件不存在: {config_path}")
         
         try:
-            with open(config_path, 'r', encoding='utf-8') as f:
-                build_config = yaml.safe_load(f)
-                logger.info(f"从 {config_path} 加载构建配置")
+            build_config = load_yaml_file(config_path)
+            logger.info(f"从 {config_path} 加载构建配置")
         except Exception as e:
             logger.error(f"加载构建配置失败: {str(e)}")
             raise
@@ -393,121 +393,59 @@ class JenkinsApiParser(BaseParser):
         
         self.pipeline_model.xml_content = xml_content
         
-        # 使用ElementTree解析XML并转换为JSON
+        # 使用进程内共享的已解析文档，获取流水线结构时已经解析过的 config.xml 不再重复解析
         try:
-            from xml.etree import ElementTree as ET
-            import json
+            document = self.pipeline_model.xml_document
             
-            def xml_to_json(element):
-                result = {}
+            # 提取Git信息
+            if document.tag == 'project' and document.git_url:
+                git_url = document.git_url
+                logger.info(f"从XML中提取到Git URL: {git_url}")
                 
-                # 处理属性
-                if element.attrib:
-                    result['@attributes'] = element.attrib
+                # 提取分支信息
+                git_branch = document.git_branch or 'master'
+                git_branch = git_branch.replace('*/', '').replace('origin/', '')
                 
-                # 处理子元素
-                children = list(element)
-                if children:
-                    for child in children:
-                        child_data = xml_to_json(child)
-                        if child.tag in result:
-                            if not isinstance(result[child.tag], list):
-                                result[child.tag] = [result[child.tag]]
-                            result[child.tag].append(child_data)
-                        else:
-                            result[child.tag] = child_data
-                else:
-                    text = element.text
-                    if text is not None:
-                        text = text.strip()
-                        if text:
-                            result = text
+                # 保存到pipeline_model的scm属性中
+                self.pipeline_model.scm = {
+                    'url': git_url,
+                    'branch': git_branch
+                }
                 
-                return result
-            
-            # 解析XML并转换为JSON
-            root = ET.fromstring(xml_content)
-            json_data = {root.tag: xml_to_json(root)}
-            
-            # 从JSON中提取Git信息
-            if 'project' in json_data:
-                scm = json_data['project'].get('scm', {})
-                if isinstance(scm, dict) and scm.get('@attributes', {}).get('class') == 'hudson.plugins.git.GitSCM':
-                    user_remote_configs = scm.get('userRemoteConfigs', {})
-                    if isinstance(user_remote_configs, dict):
-                        git_config = user_remote_configs.get('hudson.plugins.git.UserRemoteConfig', {})
-                        git_url = git_config.get('url', '')
-                        if git_url:
-                            logger.info(f"从JSON中提取到Git URL: {git_url}")
-                            
-                            # 提取分支信息
-                            branches = scm.get('branches', {})
-                            branch_spec = branches.get('hudson.plugins.git.BranchSpec', {})
-                            git_branch = branch_spec.get('name', 'master')
-                            if git_branch:
-                                git_branch = git_branch.replace('*/', '').replace('origin/', '')
-                            
-                            # 保存到pipeline_model的scm属性中
-                            self.pipeline_model.scm = {
-                                'url': git_url,
-                                'branch': git_branch
-                            }
-                            
-                            # 添加Git检出步骤
-                            steps.append({
-                                'name': 'Git Checkout',
-                                'type': 'git',
-                                'url': git_url,
-                                'branch': git_branch,
-                                'command': f"git clone -b {git_branch} {git_url}",
-                                'stage': 'Checkout'
-                            })
+                # 添加Git检出步骤
+                steps.append({
+                    'name': 'Git Checkout',
+                    'type': 'git',
+                    'url': git_url,
+                    'branch': git_branch,
+                    'command': f"git clone -b {git_branch} {git_url}",
+                    'stage': 'Checkout'
+                })
             
-            # 从JSON中提取Maven构建步骤
-            if 'project' in json_data:
-                builders = json_data['project'].get('builders', {})
-                if isinstance(builders, dict):
-                    maven_builders = builders.get('hudson.tasks.Maven', [])
-                    if not isinstance(maven_builders, list):
-                        maven_builders = [maven_builders]
+            # 提取构建步骤，按文档顺序，与 Freestyle 流水线结构一致
+            if document.tag == 'project':
+                for builder_step in document.build_steps:
+                    command = builder_step['command'].strip()
+                    if not command:
+                        continue
                     
-                    for maven_builder in maven_builders:
-                        if isinstance(maven_builder, dict):
-                            maven_command = maven_builder.get('targets', '')
-                            maven_properties = maven_builder.get('properties', '')
-                            
-                            if maven_command:
-                                # 处理Maven属性
-                                if maven_properties:
-                                    maven_props = [f"-D{prop.strip()}" for prop in maven_properties.split('\n') if prop.strip()]
-                                    if maven_props:
-                                        maven_command = f"{maven_command} {' '.join(maven_props)}"
-                                
-                                steps.append({
-                                    'name': 'Maven Build',
-                                    'type': 'maven',
-                                    'command': maven_command,
-                                    'stage': 'Build'
-                                })
-            
-            # 从JSON中提取Shell构建步骤
-            if 'project' in json_data:
-                builders = json_data['project'].get('builders', {})
-                if isinstance(builders, dict):
-                    shell_builders = builders.get('hudson.tasks.Shell', [])
-                    if not isinstance(shell_builders, list):
-                        shell_builders = [shell_builders]
+                    if builder_step['type'] == 'maven':
+                        # 处理Maven属性
+                        maven_properties = builder_step['properties']
+                        if maven_properties:
+                            maven_props = [f"-D{prop.strip()}" for prop in maven_properties.split('\n') if prop.strip()]
+                            if maven_props:
+                                command = f"{command} {' '.join(maven_props)}"
+                        name, step_type = 'Maven Build', 'maven'
+                    else:
+                        name, step_type = 'Shell', 'shell'
                     
-                    for shell_builder in shell_builders:
-                        if isinstance(shell_builder, dict):
-                            shell_command = shell_builder.get('command', '')
-                            if shell_command:
-                                steps.append({
-                                    'name': 'Shell',
-                                    'type': 'shell',
-                                    'command': shell_command,
-                                    'stage': 'Build'
-                                })
+                    steps.append({
+                        'name': name,
+                        'type': step_type,
+                        'command': command,
+                        'stage': 'Build'
+                    })
             
             # 如果没有找到任何构建步骤，添加默认的Maven构建步骤
             if not any(step['type'] == 'maven' for step in steps):
@@ -8,22 +8,31 @@ Jenkinsfile解析器
 
 import re
 import os
+import itertools
 from utils.logger import logger
 from parsers.base_parser import BaseParser
+from parsers import jenkinsfile_ast
+from parsers import jenkinsfile_steps
+
+# 解析器版本，解析结果的结构或内容变化时递增，使旧的解析缓存失效
+PARSER_VERSION = '4'
 
 class JenkinsfileParser(BaseParser):
     """Jenkinsfile解析器类"""
     
-    def __init__(self, jenkinsfile_path):
+    def __init__(self, jenkinsfile_path, parse_cache=None):
         """
         初始化解析器
         
         Args:
             jenkinsfile_path: Jenkinsfile的路径
+            parse_cache: 可选的 ParseCache 解析结果缓存，内容未变化时跳过解析
         """
         super().__init__()
         self.jenkinsfile_path = jenkinsfile_path
+        self.parse_cache = parse_cache
         self.content = None
+        self.ast = None
         self._load_jenkinsfile()
     
     def _load_jenkinsfile(self):
@@ -43,20 +52,29 @@ class JenkinsfileParser(BaseParser):
         """
         logger.info(f"开始解析Jenkinsfile: {self.jenkinsfile_path}")
         
+        # 内容和解析器版本都未变化时直接使用缓存的解析结果
+        if self.parse_cache is not None:
+            cached_model = self.parse_cache.get(self.content)
+            if cached_model is not None:
+                logger.info("Jenkinsfile内容未变化，使用解析缓存")
+                self.pipeline_model = cached_model
+                return self.pipeline_model
+        
+        # 构建语法树，字符串和注释中的大括号、关键字不会干扰后续解析
+        self.ast = jenkinsfile_ast.parse(self.content)
+        
         # 解析pipeline块
-        pipeline_pattern = r'pipeline\s*\{([\s\S]*)\}'
-        pipeline_match = re.search(pipeline_pattern, self.content)
+        pipeline_node = self._find_pipeline_node()
         
-        if not pipeline_match:
+        if pipeline_node is None:
             logger.error("未找到pipeline块")
             return self.pipeline_model
         
-        pipeline_content = pipeline_match.group(1)
         logger.info("成功匹配到pipeline块")
         
         # 解析agent
         logger.info("开始解析agent")
-        self.pipeline_model.agent = self._parse_agent(pipeline_content)
+        self.pipeline_model.agent = self._parse_agent(pipeline_node)
         logger.info(f"解析agent完成: {self.pipeline_model.agent}")
         
         # 解析环境变量
@@ -68,7 +86,7 @@ class JenkinsfileParser(BaseParser):
         
         # 解析参数
         logger.info("开始解析参数")
-        parameters = self._parse_parameters(pipeline_content)
+        parameters = self._parse_parameters(pipeline_node)
         for param in parameters:
             self.pipeline_model.add_parameter(
                 param.get("name", ""),
@@ -97,27 +115,46 @@ class JenkinsfileParser(BaseParser):
             )
         logger.info(f"提取构建步骤完成，共 {len(build_steps)} 个")
         
+        if self.parse_cache is not None:
+            self.parse_cache.put(self.content, self.pipeline_model)
+        
         logger.info("Jenkinsfile解析完成")
         return self.pipeline_model
 
+    def _find_pipeline_node(self):
+        """
+        查找pipeline块对应的语法树节点
+        
+        共享库中的流水线写在 def call(body) { pipeline { ... } } 中，因此按源码顺序查找第一个pipeline节点。
+        
+        Returns:
+            Node: pipeline节点，未找到时返回 None
+        """
+        if self.ast is None:
+            self.ast = jenkinsfile_ast.parse(self.content)
+        
+        for node in self.ast.walk():
+            if node.name == 'pipeline' and node.has_block:
+                return node
+        return None
+
     # 保留原有的解析方法，但修改返回格式以符合统一模型
-    def _parse_parameters(self, pipeline_content):
+    def _parse_parameters(self, pipeline_node):
         """
         解析Jenkinsfile中的参数
         
         Args:
-            pipeline_content: pipeline内容
+            pipeline_node: pipeline语法树节点
         
         Returns:
             list: 参数列表
         """
         parameters = []
-        # 匹配parameters块
-        params_pattern = r'parameters\s*\{([\s\S]*?)\}'
-        params_match = re.search(params_pattern, pipeline_content)
-        if not params_match:
+        # 查找parameters块
+        params_node = pipeline_node.find('parameters')
+        if params_node is None or not params_node.has_block:
             return parameters
-        params_content = params_match.group(1)
+        params_content = params_node.body_text
         
         # 解析各种类型的参数
         # 字符串参数
@@ -169,221 +206,178 @@ class JenkinsfileParser(BaseParser):
             })
         
         return parameters
-    
-        # 修改正则表达式，使用贪婪匹配来获取整个stages块
-        # 注意：这里使用了贪婪匹配 [\s\S]* 而不是非贪婪匹配 [\s\S]*?
-        stages_pattern = r'stages\s*\{([\s\S]*)\}'
-        stages_match = re.search(stages_pattern, self.content, re.DOTALL)
+    # 修改 _parse_stages 方法，使用字典而不是自定义类
+    def _parse_stages(self):
+        """
+        解析stages块
         
-        if not stages_match:
-            # 输出文件内容以便调试
-            logger.debug(f"Jenkinsfile内容: {self.content}")
-            raise ValueError("未找到stages定义")
+        Returns:
+            list: 阶段列表
+        """
+        logger.info("进入_parse_stages方法")
+        stages = []
         
-        stages_content = stages_match.group(1)
-        logger.debug(f"找到stages内容: {stages_content}")
+        # 按大括号配对定位pipeline下的stages块
+        pipeline_node = self._find_pipeline_node()
+        stages_node = pipeline_node.find('stages') if pipeline_node is not None else None
         
-        # 使用新的方法来匹配stage块
-        stages = []
-        # 使用更精确的正则表达式来匹配每个stage块
-        stage_pattern = r'stage\s*\(\s*[\'"]([^\'"]+)[\'"]\s*\)\s*\{([\s\S]*?)(?=\s*stage\s*\(|\s*\}\s*$)'
+        if stages_node is None or not stages_node.has_block:
+            logger.error("未找到stages块")
+            logger.debug(f"Jenkinsfile内容片段: {self.content[:500]}...")
+            return stages
         
-        for stage_match in re.finditer(stage_pattern, stages_content):
-            name = stage_match.group(1)
-            stage_content = stage_match.group(2)
-            logger.debug(f"找到阶段 '{name}' 的内容")
+        logger.info(f"找到stages块，长度: {len(stages_node.body_text)}")
+        
+        # 并行块按源码中出现的顺序编号
+        self._parallel_groups = itertools.count()
+        
+        for stage_node, structure in self._iter_stage_nodes(stages_node):
+            stage_name = stage_node.first_string() or ''
+            logger.info(f"解析阶段: {stage_name}")
             
-            # 解析steps部分
-            steps = []
-            steps_match = re.search(r'steps\s*\{([\s\S]*?)\}', stage_content)
-            if steps_match:
-                steps_content = steps_match.group(1)
-                steps = self._parse_steps(steps_content)
+            # 创建阶段字典而不是对象
+            stage = {
+                'name': stage_name,
+                'steps': []
+            }
             
-            # 解析when条件
-            when_condition = None
-            when_match = re.search(r'when\s*\{([\s\S]*?)\}', stage_content)
-            if when_match:
-                when_condition = when_match.group(1).strip()
+            # 解析阶段中的步骤
+            logger.info(f"开始解析阶段 {stage_name} 的步骤")
+            steps = self._parse_steps(stage_node)
+            stage['steps'] = steps
+            logger.info(f"阶段 {stage_name} 包含 {len(steps)} 个步骤")
             
-            # 解析环境变量
-            environment = {}
-            env_match = re.search(r'environment\s*\{([\s\S]*?)\}', stage_content)
-            if env_match:
-                env_content = env_match.group(1)
-                for env_var in re.finditer(r'(\w+)\s*=\s*[\'"]?([^\'"]+)[\'"]?', env_content):
-                    environment[env_var.group(1)] = env_var.group(2)
+            # 并行、矩阵结构以及 stash/unstash 数据依赖，供转换器生成任务依赖关系
+            stage.update(structure)
+            stage.update(self._parse_stashes(stage_node))
             
-            stages.append({
-                'name': name,
-                'steps': steps,
-                'when': when_condition,
-                'environment': environment
-            })
+            stages.append(stage)
         
-        # 如果没有找到任何阶段，尝试使用备用方法
-        if not stages:
-            logger.warning("使用主要正则表达式未找到任何阶段，尝试使用备用方法")
-            # 备用方法：先找出所有stage名称，然后手动分割内容
-            stage_names = re.findall(r'stage\s*\(\s*[\'"]([^\'"]+)[\'"]\s*\)', stages_content)
-            
-            # 手动分割stages内容
-            stage_sections = []
-            start_indices = [m.start() for m in re.finditer(r'stage\s*\(', stages_content)]
-            
-            for i in range(len(start_indices)):
-                start = start_indices[i]
-                end = start_indices[i+1] if i+1 < len(start_indices) else len(stages_content)
-                stage_sections.append(stages_content[start:end])
-            
-            for i, section in enumerate(stage_sections):
-                if i < len(stage_names):
-                    name = stage_names[i]
-                    logger.debug(f"备用方法找到阶段: {name}")
-                    
-                    # 解析steps部分
-                    steps = []
-                    steps_match = re.search(r'steps\s*\{([\s\S]*?)\}', section)
-                    if steps_match:
-                        steps_content = steps_match.group(1)
-                        steps = self._parse_steps(steps_content)
-                    
-                    # 解析when条件
-                    when_condition = None
-                    when_match = re.search(r'when\s*\{([\s\S]*?)\}', section)
-                    if when_match:
-                        when_condition = when_match.group(1).strip()
-                    
-                    # 解析环境变量
-                    environment = {}
-                    env_match = re.search(r'environment\s*\{([\s\S]*?)\}', section)
-                    if env_match:
-                        env_content = env_match.group(1)
-                        for env_var in re.finditer(r'(\w+)\s*=\s*[\'"]?([^\'"]+)[\'"]?', env_content):
-                            environment[env_var.group(1)] = env_var.group(2)
-                    
-                    stages.append({
-                        'name': name,
-                        'steps': steps,
-                        'when': when_condition,
-                        'environment': environment
-                    })
-        
-        logger.info(f"解析完成，共找到 {len(stages)} 个阶段")
+        logger.info(f"_parse_stages方法完成，共解析 {len(stages)} 个阶段")
         return stages
-    
-    # 修改 _parse_stages 方法，使用字典而不是自定义类
-    def _parse_stages(self):
+
+    def _iter_stage_nodes(self, stages_node, structure=None):
         """
-        解析stages块
+        按源码顺序遍历stages块中的stage节点
         
-        Returns:
-            list: 阶段列表
+        Args:
+            stages_node: stages或parallel语法树节点
+            structure: 外层传入的结构信息
+            
+        Yields:
+            tuple: (含有步骤的stage节点, 结构信息字典)
         """
-        logger.info("进入_parse_stages方法")
-        stages = []
+        for stage_node in stages_node.find_all('stage'):
+            if stage_node.has_block:
+                yield from self._iter_stage(stage_node, structure or {})
+
+    def _iter_stage(self, stage_node, structure):
+        """
+        展开单个stage节点
         
-        # 查找stages块 - 修改正则表达式，使用更精确的匹配方式
-        # 使用平衡组匹配来处理嵌套的大括号
-        # 先尝试使用贪婪匹配获取整个stages块
-        stages_pattern = r'stages\s*\{([\s\S]*)\}'
-        stages_match = re.search(stages_pattern, self.content)
-        
-        if not stages_match:
-            logger.warning("未找到stages块，尝试使用备用正则表达式")
-            # 备用正则表达式，尝试匹配从stages开始到pipeline结束的内容
-            stages_pattern = r'stages\s*\{([\s\S]*?)(?=\}\s*\})'
-            stages_match = re.search(stages_pattern, self.content)
-            
-            if not stages_match:
-                logger.error("使用备用正则表达式仍未找到stages块")
-                # 输出文件内容的一部分用于调试
-                logger.debug(f"Jenkinsfile内容片段: {self.content[:500]}...")
-                return stages
-        
-        stages_content = stages_match.group(1)
-        logger.info(f"找到stages块，长度: {len(stages_content)}")
-        logger.debug(f"stages块内容前100个字符: {stages_content[:100]}...")
-        
-        # 使用非递归方式查找所有stage块
-        # 修改stage匹配模式，使用更精确的正则表达式
-        stage_pattern = r'stage\s*\(\s*[\'"]([^\'"]+)[\'"]\s*\)\s*\{([\s\S]*?)(?=\s*stage\s*\(|\s*\}\s*$)'
-        stage_matches = list(re.finditer(stage_pattern, stages_content))
-        
-        if not stage_matches:
-            logger.warning("未找到任何stage块，尝试使用备用stage匹配模式")
-            # 备用stage匹配模式
-            stage_pattern = r'stage\s*\(\s*[\'"]([^\'"]+)[\'"]\s*\)'
-            stage_names = re.findall(stage_pattern, stages_content)
-            logger.info(f"使用备用模式找到 {len(stage_names)} 个stage名称")
+        嵌套在stage中的stages、parallel和matrix块被展开为其内部的stage，
+        并记录其所属的并行组和分支（parallel_group、parallel_branch）以及矩阵轴（matrix）。
+        并行组是并行块在源码中的序号，分支是分支在并行块中的序号，同名的并行块或未命名的分支不会被合并。
+        
+        Args:
+            stage_node: stage语法树节点
+            structure: 外层传入的结构信息
             
-            if stage_names:
-                # 手动分割stages内容
-                stage_sections = []
-                start_indices = [m.start() for m in re.finditer(r'stage\s*\(', stages_content)]
-                
-                for i in range(len(start_indices)):
-                    start = start_indices[i]
-                    end = start_indices[i+1] if i+1 < len(start_indices) else len(stages_content)
-                    stage_sections.append(stages_content[start:end])
-                
-                for i, section in enumerate(stage_sections):
-                    if i < len(stage_names):
-                        stage_name = stage_names[i]
-                        logger.info(f"处理阶段: {stage_name}")
-                        
-                        # 创建阶段字典而不是对象
-                        stage = {
-                            'name': stage_name,
-                            'steps': []
-                        }
-                        
-                        # 尝试提取steps部分
-                        steps_match = re.search(r'steps\s*\{([\s\S]*?)\}', section)
-                        if steps_match:
-                            steps_content = steps_match.group(1)
-                            steps = self._parse_steps(steps_content)
-                            stage['steps'] = steps
-                            logger.info(f"阶段 {stage_name} 包含 {len(steps)} 个步骤")
-                        else:
-                            # 如果没有明确的steps块，尝试直接解析整个section
-                            steps = self._parse_steps(section)
-                            stage['steps'] = steps
-                            logger.info(f"阶段 {stage_name} 直接解析得到 {len(steps)} 个步骤")
-                        
-                        stages.append(stage)
+        Yields:
+            tuple: (含有步骤的stage节点, 结构信息字典)
+        """
+        if stage_node.find('steps') is not None:
+            yield stage_node, structure
+            return
+        
+        parallel_node = stage_node.find('parallel')
+        matrix_node = stage_node.find('matrix')
+        nested_stages = stage_node.find('stages')
+        
+        if parallel_node is not None and parallel_node.has_block:
+            if 'parallel_group' in structure:
+                # 并行分支内部再嵌套的并行块按顺序执行处理
+                yield from self._iter_stage_nodes(parallel_node, structure)
+                return
+            # 每个直接子stage是一个并行分支
+            group = next(self._parallel_groups)
+            branch_nodes = [branch_node for branch_node in parallel_node.find_all('stage') if branch_node.has_block]
+            for index, branch_node in enumerate(branch_nodes):
+                branch = dict(structure, parallel_group=group, parallel_branch=index)
+                yield from self._iter_stage(branch_node, branch)
+        elif matrix_node is not None and matrix_node.has_block:
+            matrix_stages = matrix_node.find('stages')
+            if matrix_stages is not None and matrix_stages.has_block:
+                cell = dict(structure, matrix=self._parse_matrix_axes(matrix_node))
+                yield from self._iter_stage_nodes(matrix_stages, cell)
+        elif nested_stages is not None and nested_stages.has_block:
+            yield from self._iter_stage_nodes(nested_stages, structure)
         else:
-            logger.info(f"找到 {len(stage_matches)} 个stage块")
+            yield stage_node, structure
+
+    def _parse_matrix_axes(self, matrix_node):
+        """
+        解析matrix块中的轴定义
+        
+        Args:
+            matrix_node: matrix语法树节点
             
-            for match in stage_matches:
-                stage_name = match.group(1)
-                stage_content = match.group(2)
-                logger.info(f"解析阶段: {stage_name}")
-                
-                # 创建阶段字典而不是对象
-                stage = {
-                    'name': stage_name,
-                    'steps': []
-                }
-                
-                # 解析阶段中的步骤
-                logger.info(f"开始解析阶段 {stage_name} 的步骤")
-                steps = self._parse_steps(stage_content)
-                stage['steps'] = steps
-                logger.info(f"阶段 {stage_name} 包含 {len(steps)} 个步骤")
-                
-                stages.append(stage)
+        Returns:
+            dict: 轴名称 -> 取值列表
+        """
+        axes = {}
+        axes_node = matrix_node.find('axes')
+        if axes_node is None:
+            return axes
+        
+        for axis_node in axes_node.find_all('axis'):
+            name_node = axis_node.find('name')
+            values_node = axis_node.find('values')
+            if name_node is None or not name_node.first_string():
+                continue
+            values = [token.value for token in values_node.args if token.type == jenkinsfile_ast.STRING] \
+                if values_node is not None else []
+            axes[name_node.first_string()] = values
+        return axes
+
+    def _parse_stashes(self, stage_node):
+        """
+        解析阶段中的 stash/unstash 名称
         
-        logger.info(f"_parse_stages方法完成，共解析 {len(stages)} 个阶段")
-        return stages
+        Args:
+            stage_node: stage语法树节点
+            
+        Returns:
+            dict: 包含 stashes、unstashes 的字典，没有时为空字典
+        """
+        stashes = []
+        unstashes = []
+        for node in stage_node.walk():
+            if node.name not in ('stash', 'unstash'):
+                continue
+            # 支持 stash 'name'、stash name: 'name', includes: '...'
+            name = node.named_args().get('name') or node.first_string()
+            if not name:
+                continue
+            if node.name == 'stash':
+                stashes.append(name)
+            else:
+                unstashes.append(name)
+        
+        result = {}
+        if stashes:
+            result['stashes'] = stashes
+        if unstashes:
+            result['unstashes'] = unstashes
+        return result
 
     # 修改 _parse_steps 方法，使用字典而不是自定义类
-    def _parse_steps(self, stage_content):
+    def _parse_steps(self, stage_node):
         """
         解析阶段中的步骤
         
         Args:
-            stage_content: 阶段内容
+            stage_node: stage语法树节点
             
         Returns:
             list: 步骤列表
@@ -392,88 +386,16 @@ class JenkinsfileParser(BaseParser):
         steps = []
         
         # 查找steps块
-        steps_pattern = r'steps\s*\{([\s\S]*?)\}'
-        steps_match = re.search(steps_pattern, stage_content)
+        steps_node = stage_node.find('steps')
         
-        if not steps_match:
+        if steps_node is None or not steps_node.has_block:
             logger.warning("未找到steps块")
             return steps
         
-        steps_content = steps_match.group(1)
-        logger.info(f"找到steps块，长度: {len(steps_content)}")
-        
-        # 查找sh步骤 - 修改正则表达式以匹配多行字符串
-        # 匹配 sh '...'、sh "..."、sh '''...'''、sh """...""" 四种格式
-        sh_pattern = r'sh\s*(?:\'\'\'([\s\S]*?)\'\'\'|"""([\s\S]*?)"""|\'([^\']*)\'|"([^"]*)")'
-        sh_matches = list(re.finditer(sh_pattern, steps_content))
-        logger.info(f"找到 {len(sh_matches)} 个sh步骤")
-        
-        for match in sh_matches:
-            # 获取匹配到的命令内容（可能在四个捕获组中的任意一个）
-            command = next((group for group in match.groups() if group is not None), "")
-            step = {
-                'name': "Shell Command",
-                'type': "sh",
-                'command': command.strip()
-            }
-            steps.append(step)
-        
-        # 查找echo步骤 - 同样修改以匹配多行字符串
-        echo_pattern = r'echo\s*(?:\'\'\'([\s\S]*?)\'\'\'|"""([\s\S]*?)"""|\'([^\']*)\'|"([^"]*)")'
-        echo_matches = list(re.finditer(echo_pattern, steps_content))
-        logger.info(f"找到 {len(echo_matches)} 个echo步骤")
-        
-        for match in echo_matches:
-            message = next((group for group in match.groups() if group is not None), "")
-            step = {
-                'name': "Echo Message",
-                'type': "echo",
-                'command': message.strip()
-            }
-            steps.append(step)
-        
-        # 查找checkout步骤
-        checkout_pattern = r'checkout\s+scm'
-        checkout_matches = list(re.finditer(checkout_pattern, steps_content))
-        logger.info(f"找到 {len(checkout_matches)} 个checkout步骤")
-        
-        for _ in checkout_matches:
-            step = {
-                'name': "Checkout",
-                'type': "git",
-                'command': "checkout scm"
-            }
-            steps.append(step)
-        
-        # 查找sshagent步骤
-        sshagent_pattern = r'sshagent\s*\(\s*\[\'([^\']+)\'\]\s*\)\s*\{([\s\S]*?)\}'
-        sshagent_matches = list(re.finditer(sshagent_pattern, steps_content))
-        logger.info(f"找到 {len(sshagent_matches)} 个sshagent步骤")
-        
-        for match in sshagent_matches:
-            credentials = match.group(1)
-            ssh_content = match.group(2)
-            step = {
-                'name': "SSH Agent",
-                'type': "ssh",
-                'credentials': credentials,
-                'command': ssh_content.strip()
-            }
-            steps.append(step)
-        
-        # 查找script步骤
-        script_pattern = r'script\s*\{([\s\S]*?)\}'
-        script_matches = list(re.finditer(script_pattern, steps_content))
-        logger.info(f"找到 {len(script_matches)} 个script步骤")
-        
-        for match in script_matches:
-            script_content = match.group(1)
-            step = {
-                'name': "Script",
-                'type': "script",
-                'content': script_content
-            }
-            steps.append(step)
+        logger.info(f"找到steps块，长度: {len(steps_node.body_text)}")
+        
+        # 单次遍历steps块的语法树，按源码顺序提取已注册的步骤
+        steps = jenkinsfile_steps.extract_steps(steps_node)
         
         logger.info(f"_parse_steps方法完成，共解析 {len(steps)} 个步骤")
         return steps
@@ -533,25 +455,28 @@ class JenkinsfileParser(BaseParser):
         """
         environment = {}
         
-        # 匹配environment块
-        env_pattern = r'environment\s*\{([\s\S]*?)\}'
-        env_match = re.search(env_pattern, self.content)
+        # 查找pipeline级别的environment块
+        pipeline_node = self._find_pipeline_node()
+        env_node = pipeline_node.find('environment') if pipeline_node is not None else None
         
-        if not env_match:
+        if env_node is None or not env_node.has_block:
             return environment
         
-        env_content = env_match.group(1)
-        
-        # 匹配环境变量定义
-        env_var_pattern = r'([A-Za-z0-9_]+)\s*=\s*(?:credentials\([\'"]([^\'"]+)[\'"]\)|[\'"]([^\'"]+)[\'"])'
-        for env_match in re.finditer(env_var_pattern, env_content):
-            name = env_match.group(1)
-            credential = env_match.group(2)
-            value = env_match.group(3) or ""
+        # 解析 NAME = 'value' 和 NAME = credentials('id') 形式的定义
+        for node in env_node.children:
+            assignment = node.assignment()
+            if assignment is None:
+                continue
+            name, value_tokens = assignment
             
-            if credential:
-                environment[name] = f"${{credentials.{credential}}}"
-            else:
+            if value_tokens and value_tokens[0].type == jenkinsfile_ast.IDENT and value_tokens[0].value == 'credentials':
+                credential = next((token.value for token in value_tokens if token.type == jenkinsfile_ast.STRING), None)
+                if credential:
+                    environment[name] = f"${{credentials.{credential}}}"
+                continue
+            
+            value = next((token.value for token in value_tokens if token.type == jenkinsfile_ast.STRING), None)
+            if value:
                 environment[name] = value
         
         return environment
@@ -682,12 +607,12 @@ class JenkinsfileParser(BaseParser):
         # 默认返回shell
         return "shell"
     
-    def _parse_agent(self, pipeline_content):
+    def _parse_agent(self, pipeline_node):
         """
         解析agent部分
         
         Args:
-            pipeline_content: pipeline内容
+            pipeline_node: pipeline语法树节点
         
         Returns:
             dict: agent信息
@@ -696,49 +621,46 @@ class JenkinsfileParser(BaseParser):
             'type': 'any'  # 默认agent类型
         }
         
-        # 匹配agent块
-        agent_pattern = r'agent\s*\{([\s\S]*?)\}'
-        agent_match = re.search(agent_pattern, pipeline_content)
-        
-        if not agent_match:
-            # 检查简单agent声明
-            simple_agent = re.search(r'agent\s+(\w+)', pipeline_content)
-            if simple_agent:
-                agent['type'] = simple_agent.group(1)
+        agent_node = pipeline_node.find('agent')
+        if agent_node is None:
             return agent
         
-        agent_content = agent_match.group(1)
+        if not agent_node.has_block:
+            # 简单agent声明，例如 agent any、agent none
+            agent_type = agent_node.first_ident()
+            if agent_type:
+                agent['type'] = agent_type
+            return agent
         
         # 检查agent类型
-        if 'kubernetes' in agent_content:
+        kubernetes_node = agent_node.find_descendant('kubernetes')
+        docker_node = agent_node.find_descendant('docker')
+        label_node = agent_node.find_descendant('label')
+        
+        if kubernetes_node is not None:
             agent['type'] = 'kubernetes'
             
             # 尝试提取kubernetes配置
-            yaml_pattern = r'yaml\s*[\'"]([^\'"]+)[\'"]'
-            yaml_match = re.search(yaml_pattern, agent_content)
-            if yaml_match:
-                agent['yaml'] = yaml_match.group(1)
+            yaml_node = kubernetes_node.find_descendant('yaml')
+            if yaml_node is not None and yaml_node.first_string():
+                agent['yaml'] = yaml_node.first_string()
             
             # 尝试提取label
-            label_pattern = r'label\s*[\'"]([^\'"]+)[\'"]'
-            label_match = re.search(label_pattern, agent_content)
-            if label_match:
-                agent['label'] = label_match.group(1)
-        elif 'docker' in agent_content:
+            if label_node is not None and label_node.first_string():
+                agent['label'] = label_node.first_string()
+        elif docker_node is not None:
             agent['type'] = 'docker'
             
-            # 尝试提取镜像
-            image_pattern = r'image\s*[\'"]([^\'"]+)[\'"]'
-            image_match = re.search(image_pattern, agent_content)
-            if image_match:
-                agent['image'] = image_match.group(1)
-        elif 'label' in agent_content:
+            # 尝试提取镜像，支持 docker 'image' 和 docker { image 'image' }
+            image_node = docker_node.find_descendant('image')
+            image = image_node.first_string() if image_node is not None else docker_node.first_string()
+            if image:
+                agent['image'] = image
+        elif label_node is not None:
             agent['type'] = 'node'
             
             # 提取label
-            label_pattern = r'label\s*[\'"]([^\'"]+)[\'"]'
-            label_match = re.search(label_pattern, agent_content)
-            if label_match:
-                agent['label'] = label_match.group(1)
+            if label_node.first_string():
+                agent['label'] = label_node.first_string()
         
         return agent
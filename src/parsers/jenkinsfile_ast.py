@@ -0,0 +1,434 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Jenkinsfile 词法分析和语法树
+单遍扫描识别字符串（单引号、双引号 GString、三引号）和注释，
+再按大括号配对构建带源码偏移的声明式语法树，整体为线性时间
+"""
+
+# 词法单元类型
+IDENT = 'IDENT'
+STRING = 'STRING'
+NUMBER = 'NUMBER'
+LBRACE = '{'
+RBRACE = '}'
+LPAREN = '('
+RPAREN = ')'
+LBRACKET = '['
+RBRACKET = ']'
+COMMA = ','
+COLON = ':'
+ASSIGN = '='
+SEMICOLON = ';'
+NEWLINE = 'NEWLINE'
+OP = 'OP'
+
+_PUNCTUATION = {
+    '{': LBRACE, '}': RBRACE, '(': LPAREN, ')': RPAREN,
+    '[': LBRACKET, ']': RBRACKET, ',': COMMA, ';': SEMICOLON
+}
+
+class Token:
+    """词法单元"""
+
+    __slots__ = ('type', 'value', 'start', 'end')
+
+    def __init__(self, type, value, start, end):
+        """
+        初始化词法单元
+
+        Args:
+            type: 词法单元类型
+            value: 值，字符串为去掉引号后的内容
+            start: 在源码中的起始偏移
+            end: 在源码中的结束偏移
+        """
+        self.type = type
+        self.value = value
+        self.start = start
+        self.end = end
+
+    def __repr__(self):
+        return f"Token({self.type}, {self.value!r}, {self.start})"
+
+def tokenize(source):
+    """
+    单遍扫描源码生成词法单元
+
+    注释被丢弃；字符串作为一个整体，内部的大括号和关键字不会影响后续解析。
+
+    Args:
+        source: Jenkinsfile 内容
+
+    Returns:
+        list: Token 列表
+    """
+    tokens = []
+    length = len(source)
+    pos = 0
+
+    while pos < length:
+        char = source[pos]
+
+        # 换行是 Groovy 的语句分隔符
+        if char == '\n':
+            tokens.append(Token(NEWLINE, '\n', pos, pos + 1))
+            pos += 1
+        elif char in ' \t\r\f':
+            pos += 1
+        # 行续接
+        elif char == '\\' and source.startswith('\n', pos + 1):
+            pos += 2
+        # 注释
+        elif source.startswith('//', pos):
+            end = source.find('\n', pos)
+            pos = length if end < 0 else end
+        elif source.startswith('/*', pos):
+            end = source.find('*/', pos + 2)
+            pos = length if end < 0 else end + 2
+        # 字符串
+        elif char in '\'"':
+            token = _read_string(source, pos)
+            tokens.append(token)
+            pos = token.end
+        elif char.isalpha() or char == '_' or char == '$':
+            end = pos + 1
+            while end < length and (source[end].isalnum() or source[end] in '_$'):
+                end += 1
+            tokens.append(Token(IDENT, source[pos:end], pos, end))
+            pos = end
+        elif char.isdigit():
+            end = pos + 1
+            while end < length and (source[end].isalnum() or source[end] in '._'):
+                end += 1
+            tokens.append(Token(NUMBER, source[pos:end], pos, end))
+            pos = end
+        elif char in _PUNCTUATION:
+            tokens.append(Token(_PUNCTUATION[char], char, pos, pos + 1))
+            pos += 1
+        elif char == ':':
+            tokens.append(Token(COLON, char, pos, pos + 1))
+            pos += 1
+        elif char == '=' and not source.startswith('==', pos) and not source.startswith('=~', pos):
+            tokens.append(Token(ASSIGN, char, pos, pos + 1))
+            pos += 1
+        else:
+            # 其他运算符按最长两个字符合并
+            end = pos + 2 if source[pos:pos + 2] in ('==', '!=', '<=', '>=', '&&', '||', '=~', '->', '?.', '*.', '++', '--', '<<') else pos + 1
+            tokens.append(Token(OP, source[pos:end], pos, end))
+            pos = end
+
+    return tokens
+
+def _read_string(source, start):
+    """
+    读取字符串字面量
+
+    支持 '...'、"..."、'''...'''、\"\"\"...\"\"\"；双引号字符串中的 ${...} 插值按大括号配对跳过。
+
+    Args:
+        source: 源码
+        start: 起始引号的偏移
+
+    Returns:
+        Token: 字符串词法单元；单行字符串未闭合时（例如 /it's/ 这样的正则字面量）返回单个引号的 OP 词法单元
+    """
+    quote = source[start]
+    delimiter = quote * 3 if source.startswith(quote * 3, start) else quote
+    interpolated = quote == '"'
+    pos = start + len(delimiter)
+    length = len(source)
+    depth = 0
+
+    while pos < length:
+        char = source[pos]
+        if char == '\\':
+            pos += 2
+            continue
+        if interpolated and depth == 0 and source.startswith('${', pos):
+            depth = 1
+            pos += 2
+            continue
+        if depth:
+            if char == '{':
+                depth += 1
+            elif char == '}':
+                depth -= 1
+            pos += 1
+            continue
+        if source.startswith(delimiter, pos):
+            end = pos + len(delimiter)
+            return Token(STRING, source[start + len(delimiter):pos], start, end)
+        if len(delimiter) == 1 and char == '\n':
+            return Token(OP, quote, start, start + 1)
+        pos += 1
+
+    # 多行字符串未闭合时延伸到文件末尾
+    if len(delimiter) == 3:
+        return Token(STRING, source[start + 3:], start, length)
+    return Token(OP, quote, start, start + 1)
+
+class Node:
+    """语法树节点：一条语句，可带一个大括号代码块"""
+
+    __slots__ = ('name', 'args', 'children', 'start', 'end', 'body_start', 'body_end', 'source')
+
+    def __init__(self, name, args, start, end, source, children=None, body_start=None, body_end=None):
+        """
+        初始化节点
+
+        Args:
+            name: 语句开头的标识符，例如 stage、sh、environment；不是标识符时为 None
+            args: 标识符与代码块之间的词法单元
+            start: 语句在源码中的起始偏移
+            end: 语句在源码中的结束偏移
+            source: 完整源码
+            children: 代码块中的子节点，没有代码块时为 None
+            body_start: 代码块内容（不含大括号）的起始偏移
+            body_end: 代码块内容（不含大括号）的结束偏移
+        """
+        self.name = name
+        self.args = args
+        self.children = children
+        self.start = start
+        self.end = end
+        self.body_start = body_start
+        self.body_end = body_end
+        self.source = source
+
+    def __repr__(self):
+        return f"Node({self.name!r}, start={self.start}, children={len(self.children) if self.children is not None else None})"
+
+    @property
+    def has_block(self):
+        """是否带有代码块"""
+        return self.children is not None
+
+    @property
+    def text(self):
+        """语句的源码"""
+        return self.source[self.start:self.end]
+
+    @property
+    def body_text(self):
+        """代码块内容的源码（不含大括号），没有代码块时为空字符串"""
+        if self.children is None:
+            return ''
+        return self.source[self.body_start:self.body_end]
+
+    @property
+    def args_text(self):
+        """标识符与代码块之间参数部分的源码"""
+        if not self.args:
+            return ''
+        return self.source[self.args[0].start:self.args[-1].end]
+
+    def find(self, name):
+        """
+        查找第一个指定名称的子节点
+
+        Args:
+            name: 节点名称
+
+        Returns:
+            Node: 子节点，未找到时返回 None
+        """
+        for child in self.children or ():
+            if child.name == name:
+                return child
+        return None
+
+    def find_all(self, name):
+        """
+        查找所有指定名称的子节点
+
+        Args:
+            name: 节点名称
+
+        Returns:
+            list: 子节点列表
+        """
+        return [child for child in self.children or () if child.name == name]
+
+    def walk(self):
+        """
+        按源码顺序遍历所有后代节点
+
+        Yields:
+            Node: 后代节点
+        """
+        stack = list(reversed(self.children or ()))
+        while stack:
+            node = stack.pop()
+            yield node
+            if node.children:
+                stack.extend(reversed(node.children))
+
+    def find_descendant(self, name):
+        """
+        按源码顺序查找第一个指定名称的后代节点
+
+        Args:
+            name: 节点名称
+
+        Returns:
+            Node: 后代节点，未找到时返回 None
+        """
+        for node in self.walk():
+            if node.name == name:
+                return node
+        return None
+
+    def first_string(self):
+        """
+        参数中的第一个字符串
+
+        Returns:
+            str: 字符串内容，没有字符串参数时返回 None
+        """
+        for token in self.args:
+            if token.type == STRING:
+                return token.value
+        return None
+
+    def first_ident(self):
+        """
+        参数中的第一个标识符
+
+        Returns:
+            str: 标识符，没有时返回 None
+        """
+        for token in self.args:
+            if token.type == IDENT:
+                return token.value
+        return None
+
+    def named_args(self):
+        """
+        参数中 key: value 形式的命名参数，值为字符串、数字或标识符
+
+        Returns:
+            dict: 命名参数
+        """
+        named = {}
+        args = self.args
+        for index in range(len(args) - 2):
+            if args[index].type == IDENT and args[index + 1].type == COLON \
+                    and args[index + 2].type in (STRING, NUMBER, IDENT):
+                named.setdefault(args[index].value, args[index + 2].value)
+        return named
+
+    def assignment(self):
+        """
+        解析 NAME = value 形式的赋值语句
+
+        Returns:
+            tuple: (变量名, 值的词法单元列表)，不是赋值语句时返回 None
+        """
+        if self.name is None or not self.args or self.args[0].type != ASSIGN:
+            return None
+        return self.name, self.args[1:]
+
+def parse(source):
+    """
+    解析 Jenkinsfile 并构建语法树
+
+    Args:
+        source: Jenkinsfile 内容
+
+    Returns:
+        Node: 根节点，顶层语句为其子节点
+    """
+    tokens = tokenize(source)
+    root = Node(None, [], 0, len(source), source, children=[], body_start=0, body_end=len(source))
+
+    # 显式栈代替递归，避免深层嵌套时超出递归深度
+    stack = [root]
+    statement = []
+    paren_depth = 0
+    index = 0
+    count = len(tokens)
+
+    while index < count:
+        token = tokens[index]
+        current = stack[-1]
+
+        if token.type in (LPAREN, LBRACKET):
+            paren_depth += 1
+            statement.append(token)
+        elif token.type in (RPAREN, RBRACKET):
+            paren_depth = max(0, paren_depth - 1)
+            statement.append(token)
+        elif paren_depth:
+            # 括号内的换行、分号和大括号（闭包参数）都属于当前语句的参数
+            if token.type != NEWLINE:
+                statement.append(token)
+        elif token.type == LBRACE:
+            # 代码块可以从下一行开始：stage('x')\n{
+            node = _make_node(statement, token.start, source) if statement else _pop_open_statement(current, token.start, source)
+            node.children = []
+            node.body_start = token.end
+            current.children.append(node)
+            stack.append(node)
+            statement = []
+        elif token.type == RBRACE:
+            if statement:
+                current.children.append(_make_node(statement, statement[-1].end, source))
+                statement = []
+            if len(stack) > 1:
+                node = stack.pop()
+                node.body_end = token.start
+                node.end = token.end
+        elif token.type in (NEWLINE, SEMICOLON):
+            if statement:
+                current.children.append(_make_node(statement, statement[-1].end, source))
+                statement = []
+        else:
+            statement.append(token)
+
+        index += 1
+
+    if statement:
+        stack[-1].children.append(_make_node(statement, statement[-1].end, source))
+
+    # 未闭合的代码块延伸到文件末尾
+    while len(stack) > 1:
+        node = stack.pop()
+        node.body_end = len(source)
+        node.end = len(source)
+
+    return root
+
+def _make_node(statement, end, source):
+    """
+    由一条语句的词法单元创建节点
+
+    Args:
+        statement: 词法单元列表
+        end: 语句结束偏移
+        source: 完整源码
+
+    Returns:
+        Node: 节点
+    """
+    first = statement[0]
+    if first.type == IDENT:
+        return Node(first.value, statement[1:], first.start, end, source)
+    return Node(None, statement, first.start, end, source)
+
+def _pop_open_statement(parent, start, source):
+    """
+    取出上一条没有代码块的语句，用于代码块写在下一行的情况
+
+    Args:
+        parent: 父节点
+        start: 左大括号的偏移
+        source: 完整源码
+
+    Returns:
+        Node: 代码块所属的节点；没有可用语句时创建匿名节点
+    """
+    if parent.children and not parent.children[-1].has_block:
+        return parent.children.pop()
+    return Node(None, [], start, start, source)
@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Jenkinsfile 步骤提取器注册表
+按步骤名称（sh、echo 等）登记提取函数，单次遍历 steps 语法树并按源码顺序生成步骤
+"""
+
+def _extract_sh(node):
+    """提取 sh '...'、sh \"\"\"...\"\"\" 和 sh(script: '...') 步骤"""
+    command = node.first_string()
+    if command is None:
+        command = node.named_args().get('script')
+    if command is None:
+        return None
+    return {
+        'name': "Shell Command",
+        'type': "sh",
+        'command': command.strip()
+    }
+
+def _extract_echo(node):
+    """提取 echo 步骤"""
+    message = node.first_string()
+    if message is None:
+        return None
+    return {
+        'name': "Echo Message",
+        'type': "echo",
+        'command': message.strip()
+    }
+
+def _extract_checkout(node):
+    """提取 checkout scm 步骤"""
+    if node.first_ident() != 'scm':
+        return None
+    return {
+        'name': "Checkout",
+        'type': "git",
+        'command': "checkout scm"
+    }
+
+def _extract_sshagent(node):
+    """提取 sshagent(['credentials']) { ... } 步骤，命令为块内各 sh 步骤的命令，按源码顺序逐行拼接"""
+    credentials = node.first_string()
+    if credentials is None or not node.has_block:
+        return None
+    commands = []
+    for child in node.walk():
+        if child.name == 'sh':
+            step = _extract_sh(child)
+            if step is not None:
+                commands.append(step['command'])
+    return {
+        'name': "SSH Agent",
+        'type': "ssh",
+        'credentials': credentials,
+        'command': '\n'.join(commands)
+    }
+
+def _extract_script(node):
+    """提取 script { ... } 步骤"""
+    if not node.has_block:
+        return None
+    return {
+        'name': "Script",
+        'type': "script",
+        'content': node.body_text
+    }
+
+# 步骤名称 -> 提取函数，提取函数接收语法树节点，返回步骤字典或 None
+STEP_EXTRACTORS = {
+    'sh': _extract_sh,
+    'echo': _extract_echo,
+    'checkout': _extract_checkout,
+    'sshagent': _extract_sshagent,
+    'script': _extract_script
+}
+
+# 容器步骤：提取结果已包含块内的内容（script 的源码、sshagent 中的 sh 命令），块内的步骤不再单独提取
+CONTAINER_STEPS = {'sshagent', 'script'}
+
+def register_step_extractor(name, extractor, container=False):
+    """
+    注册步骤提取函数，同名步骤会覆盖已有的提取函数
+
+    Args:
+        name: 步骤名称，即 Jenkinsfile 中语句开头的标识符
+        extractor: 提取函数，参数为 jenkinsfile_ast.Node，返回步骤字典，不是该步骤时返回 None
+        container: 提取结果是否已包含块内的内容，为 True 时不再提取块内的步骤
+    """
+    STEP_EXTRACTORS[name] = extractor
+    if container:
+        CONTAINER_STEPS.add(name)
+    else:
+        CONTAINER_STEPS.discard(name)
+
+def extract_steps(steps_node):
+    """
+    单次遍历 steps 块，按源码顺序提取所有已注册的步骤
+
+    容器步骤（script、sshagent 等）提取后不再进入其块内，同一条命令只生成一个步骤。
+
+    Args:
+        steps_node: steps 语法树节点
+
+    Returns:
+        list: 步骤列表
+    """
+    steps = []
+    stack = list(reversed(steps_node.children or ()))
+    while stack:
+        node = stack.pop()
+        extractor = STEP_EXTRACTORS.get(node.name)
+        step = extractor(node) if extractor is not None else None
+        if step is not None:
+            steps.append(step)
+            if node.name in CONTAINER_STEPS:
+                continue
+        if node.children:
+            stack.extend(reversed(node.children))
+    return steps
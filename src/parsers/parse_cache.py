@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Jenkinsfile 解析结果磁盘缓存
+以 Jenkinsfile 内容和解析器版本的 SHA-256 为键保存二进制编码的 PipelineModel，
+内容未变化的文件在重复运行时直接复用解析结果
+"""
+
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from utils import codec
+from utils.logger import logger
+from parsers.jenkins_file_parser import PARSER_VERSION
+
+class ParseCache:
+    """基于 SQLite 的解析结果缓存，按最近访问时间进行 LRU 淘汰"""
+
+    def __init__(self, cache_path, max_size_mb=64):
+        """
+        初始化缓存
+
+        Args:
+            cache_path: SQLite 缓存文件路径
+            max_size_mb: 缓存内容的最大总大小（MB）
+        """
+        self.cache_path = cache_path
+        self.max_size = int(max_size_mb * 1024 * 1024)
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0}
+
+        cache_dir = os.path.dirname(os.path.abspath(cache_path))
+        os.makedirs(cache_dir, exist_ok=True)
+
+        self._conn = sqlite3.connect(cache_path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS models ("
+            "key TEXT PRIMARY KEY, "
+            "model BLOB NOT NULL, "
+            "size INTEGER, "
+            "last_access REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_models_last_access ON models (last_access)")
+        self._conn.commit()
+
+        logger.info(f"解析缓存文件: {cache_path}，最大 {max_size_mb} MB")
+
+    @staticmethod
+    def make_key(content):
+        """
+        计算缓存键
+
+        Args:
+            content: Jenkinsfile 内容
+
+        Returns:
+            str: 内容与解析器版本的 SHA-256 十六进制摘要
+        """
+        digest = hashlib.sha256()
+        digest.update(PARSER_VERSION.encode('utf-8'))
+        digest.update(b'\0')
+        digest.update(content.encode('utf-8'))
+        return digest.hexdigest()
+
+    def get(self, content):
+        """
+        读取解析结果并刷新访问时间
+
+        Args:
+            content: Jenkinsfile 内容
+
+        Returns:
+            PipelineModel: 缓存的流水线模型，未命中时返回 None
+        """
+        key = self.make_key(content)
+        with self._lock:
+            row = self._conn.execute("SELECT model FROM models WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.stats['misses'] += 1
+                return None
+
+            self._conn.execute("UPDATE models SET last_access = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+            self.stats['hits'] += 1
+
+        return codec.loads(row[0])
+
+    def put(self, content, pipeline_model):
+        """
+        保存解析结果
+
+        Args:
+            content: Jenkinsfile 内容
+            pipeline_model: 解析后的 PipelineModel
+        """
+        key = self.make_key(content)
+        model = codec.dumps(pipeline_model)
+        size = len(model)
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO models (key, model, size, last_access) VALUES (?, ?, ?, ?)",
+                (key, model, size, time.time())
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """淘汰最久未访问的条目，直到总大小不超过上限（调用方需持有锁）"""
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM models").fetchone()[0]
+        if total <= self.max_size:
+            return
+
+        evicted = 0
+        for key, size in self._conn.execute(
+                "SELECT key, size FROM models ORDER BY last_access").fetchall():
+            if total <= self.max_size:
+                break
+            self._conn.execute("DELETE FROM models WHERE key = ?", (key,))
+            total -= size
+            evicted += 1
+
+        logger.debug(f"解析缓存淘汰了 {evicted} 个条目")
+
+    def close(self):
+        """关闭缓存文件"""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,367 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+输出层
+转换器、批量迁移器和调试导出通过同一个输出层写文件：
+- DirectorySink 写入目录，先写临时文件再 os.replace，读取方不会看到写了一半的文件；
+  内容与已有文件相同时跳过写入，重复运行不再改写未变化的文件
+- BundleSink 把所有文件收集到一个 tar/zip 包中，关闭时一次写出
+open_sink() 按输出路径的扩展名选择实现，scope() 为每个 Job 提供独立的子目录
+"""
+
+import io
+import os
+import bz2
+import gzip
+import json
+import lzma
+import zipfile
+import tarfile
+import tempfile
+import threading
+from utils import yaml_io
+from utils.logger import logger
+
+# tar 包扩展名 -> 压缩函数，gzip 头中的时间固定为 0；zip 单独处理
+TAR_COMPRESSORS = {
+    '.tar': None,
+    '.tar.gz': lambda data: gzip.compress(data, mtime=0),
+    '.tgz': lambda data: gzip.compress(data, mtime=0),
+    '.tar.bz2': bz2.compress,
+    '.tar.xz': lzma.compress
+}
+
+BUNDLE_EXTENSIONS = tuple(TAR_COMPRESSORS) + ('.zip',)
+
+def is_bundle_path(path):
+    """
+    判断输出路径是否为 tar/zip 包
+
+    Args:
+        path: 输出路径
+
+    Returns:
+        bool: 扩展名为 BUNDLE_EXTENSIONS 之一时为 True
+    """
+    return bool(path) and path.lower().endswith(BUNDLE_EXTENSIONS)
+
+def open_sink(target=None, durable=False):
+    """
+    按输出路径创建输出层
+
+    Args:
+        target: 输出目录或 tar/zip 包路径，为空时相对路径基于当前目录
+        durable: 写入目录时是否在替换前 fsync，保证断电后内容完整
+
+    Returns:
+        ArtifactSink: 输出层
+    """
+    if is_bundle_path(target):
+        return BundleSink(target)
+    return DirectorySink(target, durable=durable)
+
+class ArtifactSink:
+    """输出层基类，子类实现 write"""
+
+    def __init__(self):
+        """初始化统计信息"""
+        self.stats = {'written': 0, 'unchanged': 0, 'bytes': 0}
+        self._stats_lock = threading.Lock()
+
+    def write(self, path, data):
+        """
+        写入文件内容
+
+        Args:
+            path: 文件路径（相对于输出根目录）
+            data: 字节内容
+
+        Returns:
+            bool: 实际写入时为 True，内容未变化跳过时为 False
+        """
+        raise NotImplementedError
+
+    def write_text(self, path, text):
+        """
+        写入 UTF-8 文本
+
+        Args:
+            path: 文件路径
+            text: 文本内容
+
+        Returns:
+            bool: 是否实际写入
+        """
+        return self.write(path, text.encode('utf-8'))
+
+    def write_yaml(self, path, document):
+        """
+        写入 YAML，格式与转换器一直使用的 yaml.dump 参数一致（yaml_io.DUMP_OPTIONS）
+
+        Args:
+            path: 文件路径
+            document: YAML 字典
+
+        Returns:
+            bool: 是否实际写入
+        """
+        return self.write_text(path, yaml_io.dump(document))
+
+    def write_json(self, path, obj):
+        """
+        写入格式化的 JSON
+
+        Args:
+            path: 文件路径
+            obj: 可以 JSON 序列化的对象
+
+        Returns:
+            bool: 是否实际写入
+        """
+        return self.write_text(path, json.dumps(obj, indent=2, ensure_ascii=False))
+
+    def scope(self, prefix):
+        """
+        获取写入子目录的输出层，用于每个 Job 独立的输出目录
+
+        Args:
+            prefix: 子目录（相对路径）
+
+        Returns:
+            ScopedSink: 子目录输出层
+        """
+        return ScopedSink(self, prefix)
+
+    def location(self, path):
+        """
+        文件在输出中的位置，用于日志和汇总报告
+
+        Args:
+            path: 文件路径
+
+        Returns:
+            str: 位置
+        """
+        return path
+
+    def close(self):
+        """完成输出，BundleSink 在此写出输出包"""
+
+    def _count(self, written, size=0):
+        """
+        更新统计信息
+
+        Args:
+            written: 是否实际写入
+            size: 写入的字节数
+        """
+        with self._stats_lock:
+            if written:
+                self.stats['written'] += 1
+                self.stats['bytes'] += size
+            else:
+                self.stats['unchanged'] += 1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+class ScopedSink:
+    """把所有路径加上子目录前缀后转交给上层输出层"""
+
+    def __init__(self, sink, prefix):
+        """
+        初始化子目录输出层
+
+        Args:
+            sink: 上层输出层
+            prefix: 子目录
+        """
+        self.sink = sink
+        self.prefix = prefix
+
+    def _path(self, path):
+        return os.path.join(self.prefix, path)
+
+    def write(self, path, data):
+        return self.sink.write(self._path(path), data)
+
+    def write_text(self, path, text):
+        return self.sink.write_text(self._path(path), text)
+
+    def write_yaml(self, path, document):
+        return self.sink.write_yaml(self._path(path), document)
+
+    def write_json(self, path, obj):
+        return self.sink.write_json(self._path(path), obj)
+
+    def scope(self, prefix):
+        return ScopedSink(self.sink, self._path(prefix))
+
+    def location(self, path=''):
+        return self.sink.location(self._path(path) if path else self.prefix)
+
+class DirectorySink(ArtifactSink):
+    """写入目录，原子替换并跳过内容未变化的文件"""
+
+    def __init__(self, root=None, durable=False):
+        """
+        初始化目录输出层
+
+        Args:
+            root: 输出根目录，为空时相对路径基于当前目录，绝对路径保持不变
+            durable: 替换前是否 fsync
+        """
+        super().__init__()
+        self.root = root
+        self.durable = durable
+
+    def location(self, path):
+        return os.path.join(self.root, path) if self.root else path
+
+    def write(self, path, data):
+        target = self.location(path)
+        if _same_content(target, data):
+            logger.debug(f"内容未变化，跳过写入: {target}")
+            self._count(False)
+            return False
+
+        directory = os.path.dirname(os.path.abspath(target))
+        os.makedirs(directory, exist_ok=True)
+
+        # 临时文件与目标在同一目录，os.replace 是原子的；并行运行写同一个文件时后写入的完整覆盖
+        fd, temp_path = tempfile.mkstemp(prefix='.' + os.path.basename(target) + '.', suffix='.tmp', dir=directory)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+                if self.durable:
+                    f.flush()
+                    os.fsync(f.fileno())
+            os.chmod(temp_path, _FILE_MODE)
+            os.replace(temp_path, target)
+        except BaseException:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+            raise
+
+        self._count(True, len(data))
+        return True
+
+class BundleSink(ArtifactSink):
+    """把所有文件收集到一个 tar/zip 包中，关闭时先写临时文件再原子替换"""
+
+    def __init__(self, bundle_path):
+        """
+        初始化输出包
+
+        Args:
+            bundle_path: 输出包路径，扩展名决定格式（.zip、.tar、.tar.gz、.tgz 等）
+        """
+        super().__init__()
+        self.bundle_path = bundle_path
+        # 包内路径 -> 内容，同一路径以最后一次写入为准
+        self._files = {}
+        self._lock = threading.Lock()
+
+    def location(self, path):
+        return f"{self.bundle_path}:{_member_name(path)}"
+
+    def write(self, path, data):
+        name = _member_name(path)
+        with self._lock:
+            if self._files.get(name) == data:
+                written = False
+            else:
+                self._files[name] = data
+                written = True
+        self._count(written, len(data))
+        return written
+
+    def close(self):
+        with self._lock:
+            files = sorted(self._files.items())
+
+        # 输出包内容未变化时保留原文件
+        data = self._build(files)
+        DirectorySink().write(self.bundle_path, data)
+        logger.info(f"输出包已生成: {self.bundle_path}，共 {len(files)} 个文件")
+
+    def _build(self, files):
+        """
+        生成输出包内容，文件时间固定为 0 点，相同内容生成的包逐字节相同
+
+        Args:
+            files: (包内路径, 内容) 列表
+
+        Returns:
+            bytes: 输出包内容
+        """
+        buffer = io.BytesIO()
+        lower = self.bundle_path.lower()
+        if lower.endswith('.zip'):
+            with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as bundle:
+                for name, data in files:
+                    info = zipfile.ZipInfo(name, date_time=(1980, 1, 1, 0, 0, 0))
+                    info.compress_type = zipfile.ZIP_DEFLATED
+                    info.external_attr = 0o644 << 16
+                    bundle.writestr(info, data)
+            return buffer.getvalue()
+
+        with tarfile.open(fileobj=buffer, mode='w', format=tarfile.PAX_FORMAT) as bundle:
+            for name, data in files:
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                info.mode = 0o644
+                bundle.addfile(info, io.BytesIO(data))
+        compressor = next(compressor for extension, compressor in TAR_COMPRESSORS.items() if lower.endswith(extension))
+        return compressor(buffer.getvalue()) if compressor else buffer.getvalue()
+
+def _member_name(path):
+    """
+    包内路径统一为 / 分隔的相对路径
+
+    Args:
+        path: 文件路径
+
+    Returns:
+        str: 包内路径
+    """
+    return os.path.normpath(path).replace(os.sep, '/').lstrip('/')
+
+def _same_content(path, data):
+    """
+    判断已有文件的内容是否与 data 相同，先比较大小，大小相同时才读取
+
+    Args:
+        path: 文件路径
+        data: 字节内容
+
+    Returns:
+        bool: 文件存在且内容相同时为 True
+    """
+    try:
+        if os.path.getsize(path) != len(data):
+            return False
+        with open(path, 'rb') as f:
+            return f.read() == data
+    except OSError:
+        return False
+
+def _file_mode():
+    """
+    新建文件的权限，与 open() 创建的文件一致（mkstemp 创建的临时文件为 0600）
+
+    Returns:
+        int: 权限位
+    """
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+# 导入时读取一次 umask，os.umask 会临时修改进程状态，不在工作线程中调用
+_FILE_MODE = _file_mode()
@@ -0,0 +1,178 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+PipelineModel 和流水线结构的二进制编解码
+格式为 4 字节魔数、1 字节格式版本、1 字节标志位，之后是 pickle（协议 5）编码的普通数据，
+可选 zlib 压缩。PipelineModel 先转换为只包含 dict/list/str 等内置类型的数据再编码，
+解码时不加载任何类，读取不可信的文件也不会执行代码。
+
+缓存、检查点和进程间传递模型使用这里的 dumps/loads，格式化的 JSON 只用于调试导出
+"""
+
+import io
+import zlib
+import pickle
+from models.pipeline_model import PipelineModel
+from utils.artifact_sink import DirectorySink
+
+# 文件头
+MAGIC = b'JTCB'
+FORMAT_VERSION = 1
+
+# 标志位
+FLAG_ZLIB = 0x01
+
+HEADER_SIZE = len(MAGIC) + 2
+
+PICKLE_PROTOCOL = min(5, pickle.HIGHEST_PROTOCOL)
+
+# 编码内容的类型
+KIND_PIPELINE_MODEL = 'pipeline_model'
+KIND_DATA = 'data'
+
+class _DataUnpickler(pickle.Unpickler):
+    """只允许内置容器和标量的反序列化器"""
+
+    def find_class(self, module, name):
+        raise pickle.UnpicklingError(f"不允许的类型: {module}.{name}")
+
+def dumps(obj, compress=False):
+    """
+    编码 PipelineModel 或普通数据（流水线结构等）
+
+    Args:
+        obj: PipelineModel 对象，或只包含内置类型的数据
+        compress: 是否使用 zlib 压缩
+
+    Returns:
+        bytes: 编码后的内容
+    """
+    if isinstance(obj, PipelineModel):
+        envelope = (KIND_PIPELINE_MODEL, _model_state(obj))
+    else:
+        envelope = (KIND_DATA, obj)
+
+    payload = pickle.dumps(envelope, protocol=PICKLE_PROTOCOL)
+    flags = 0
+    if compress:
+        payload = zlib.compress(payload)
+        flags |= FLAG_ZLIB
+
+    return MAGIC + bytes((FORMAT_VERSION, flags)) + payload
+
+def loads(data):
+    """
+    解码 dumps 的结果
+
+    Args:
+        data: 编码后的内容
+
+    Returns:
+        PipelineModel 或普通数据
+
+    Raises:
+        ValueError: 不是本格式的内容、格式版本不支持或内容损坏
+    """
+    if not is_encoded(data):
+        raise ValueError("不是二进制编码的内容")
+
+    version, flags = data[len(MAGIC)], data[len(MAGIC) + 1]
+    if version > FORMAT_VERSION:
+        raise ValueError(f"不支持的格式版本: {version}，当前支持到 {FORMAT_VERSION}")
+
+    payload = memoryview(data)[HEADER_SIZE:]
+    try:
+        if flags & FLAG_ZLIB:
+            payload = zlib.decompress(payload)
+        kind, value = _DataUnpickler(io.BytesIO(payload)).load()
+    except (zlib.error, pickle.UnpicklingError, EOFError, ValueError, TypeError) as e:
+        raise ValueError(f"内容损坏: {str(e)}") from e
+
+    if kind == KIND_PIPELINE_MODEL:
+        return _model_from_state(value)
+    return value
+
+def is_encoded(data):
+    """
+    判断内容是否为本格式
+
+    Args:
+        data: 字节内容
+
+    Returns:
+        bool: 以魔数开头且包含完整文件头时为 True
+    """
+    return isinstance(data, (bytes, bytearray, memoryview)) and len(data) >= HEADER_SIZE \
+        and bytes(data[:len(MAGIC)]) == MAGIC
+
+def dump(obj, path, compress=True):
+    """
+    编码并原子写入文件
+
+    Args:
+        obj: PipelineModel 对象或普通数据
+        path: 文件路径
+        compress: 是否使用 zlib 压缩
+    """
+    DirectorySink().write(path, dumps(obj, compress))
+
+def load(path):
+    """
+    读取并解码文件
+
+    Args:
+        path: 文件路径
+
+    Returns:
+        PipelineModel 或普通数据
+    """
+    with open(path, 'rb') as f:
+        return loads(f.read())
+
+def export(obj, path, sink=None):
+    """
+    按扩展名导出：.json 为格式化的 JSON（调试用），其余为压缩的二进制编码
+
+    Args:
+        obj: PipelineModel 对象或普通数据
+        path: 文件路径
+        sink: 可选的输出层，默认原子写入 path，内容未变化时跳过
+    """
+    if not path.lower().endswith('.json'):
+        (sink or DirectorySink()).write(path, dumps(obj, compress=True))
+        return
+
+    if isinstance(obj, PipelineModel):
+        obj = obj.to_dict()
+    (sink or DirectorySink()).write_json(path, obj)
+
+def _model_state(model):
+    """
+    PipelineModel 的完整状态，比 to_dict 多出类型和 config.xml 内容
+
+    Args:
+        model: PipelineModel 对象
+
+    Returns:
+        dict: 状态
+    """
+    state = model.to_dict()
+    state['type'] = model.type
+    state['xml_content'] = model.xml_content
+    return state
+
+def _model_from_state(state):
+    """
+    从状态还原 PipelineModel
+
+    Args:
+        state: _model_state 的结果
+
+    Returns:
+        PipelineModel: 流水线模型
+    """
+    model = PipelineModel.from_dict(state)
+    model.type = state.get('type', '')
+    model.xml_content = state.get('xml_content', '')
+    return model
@@ -7,8 +7,8 @@
 """
 
 import os
-import yaml
 from utils.logger import logger
+from utils.template_loader import load_yaml_file
 
 def load_mapping_config(config_name="build_mapping.yaml"):
     """
@@ -24,8 +24,7 @@ def load_mapping_config(config_name="build_mapping.yaml"):
                               "config", config_name)
     
     try:
-        with open(config_path, 'r', encoding='utf-8') as f:
-            mapping_config = yaml.safe_load(f)
+        mapping_config = load_yaml_file(config_path)
         return mapping_config or {}
     except Exception as e:
         logger.error(f"加载映射配置失败: {str(e)}")
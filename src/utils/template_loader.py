@@ -4,13 +4,129 @@
 """
 模板加载器
 负责加载华为CodeArts插件模板和映射关系
+
+模板文件的内容和解析结果在进程内缓存，按文件的修改时间和大小失效；
+调用方拿到的是解析结果的副本，可以随意修改，不需要每个步骤重新读取和解析 YAML
 """
 
 import os
 import json
-import yaml
+import threading
+from utils import yaml_io
 from utils.logger import logger
 
+# 文件路径 -> 缓存项，所有 TemplateLoader 和模块级加载函数共用
+_template_cache = {}
+_template_cache_lock = threading.Lock()
+
+class _CachedTemplate:
+    """单个模板文件的缓存项"""
+
+    __slots__ = ('signature', 'content', 'parsed', 'error')
+
+    def __init__(self, signature, content):
+        self.signature = signature
+        self.content = content
+        # (是否展开制表符) -> 解析结果
+        self.parsed = {}
+        # (是否展开制表符) -> 解析异常
+        self.error = {}
+
+def _get_cached(path):
+    """
+    获取模板文件的缓存项，文件的修改时间或大小变化时重新读取
+
+    Args:
+        path: 文件路径
+
+    Returns:
+        _CachedTemplate: 缓存项
+    """
+    stat = os.stat(path)
+    signature = (stat.st_mtime_ns, stat.st_size)
+
+    with _template_cache_lock:
+        entry = _template_cache.get(path)
+    if entry is not None and entry.signature == signature:
+        return entry
+
+    with open(path, 'r', encoding='utf-8') as f:
+        entry = _CachedTemplate(signature, f.read())
+    with _template_cache_lock:
+        _template_cache[path] = entry
+    logger.debug(f"读取模板文件: {path}")
+    return entry
+
+def _parse_cached(entry, expand_tabs=False):
+    """
+    获取缓存项的 YAML 解析结果，每个缓存项只解析一次
+
+    Args:
+        entry: 缓存项
+        expand_tabs: 解析前是否将制表符替换为空格
+
+    Returns:
+        解析结果（共享对象，调用方不能修改）
+
+    Raises:
+        yaml_io.YAMLError: 解析失败
+    """
+    if expand_tabs not in entry.parsed and expand_tabs not in entry.error:
+        content = entry.content.replace('\t', '    ') if expand_tabs else entry.content
+        try:
+            entry.parsed[expand_tabs] = yaml_io.load(content)
+        except yaml_io.YAMLError as e:
+            entry.error[expand_tabs] = e
+    if expand_tabs in entry.error:
+        raise entry.error[expand_tabs]
+    return entry.parsed[expand_tabs]
+
+def copy_document(value):
+    """
+    复制 YAML 解析结果，只复制 dict 和 list，标量共享
+
+    比 copy.deepcopy 快得多；返回的对象互不共享容器，yaml.dump 时不会生成锚点和别名。
+
+    Args:
+        value: 解析结果
+
+    Returns:
+        副本
+    """
+    if isinstance(value, dict):
+        return {key: copy_document(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [copy_document(item) for item in value]
+    return value
+
+def read_template_file(path):
+    """
+    读取模板文件内容，使用进程内缓存
+
+    Args:
+        path: 文件路径
+
+    Returns:
+        str: 文件内容
+    """
+    return _get_cached(path).content
+
+def load_yaml_file(path, expand_tabs=False):
+    """
+    加载并解析 YAML 文件，使用进程内缓存，返回可以修改的副本
+
+    Args:
+        path: 文件路径
+        expand_tabs: 解析前是否将制表符替换为空格
+
+    Returns:
+        解析结果的副本
+
+    Raises:
+        yaml_io.YAMLError: 解析失败
+    """
+    return copy_document(_parse_cached(_get_cached(path), expand_tabs))
+
 class TemplateLoader:
     """模板加载器类"""
     
@@ -54,7 +170,7 @@ class TemplateLoader:
             try:
                 with open(self.mapping_yaml, 'r', encoding='utf-8') as f:
                     logger.info(f"从YAML文件加载映射关系: {self.mapping_yaml}")
-                    return yaml.safe_load(f)
+                    return yaml_io.load(f)
             except Exception as e:
                 logger.error(f"加载YAML映射文件失败: {str(e)}")
         
@@ -71,6 +187,46 @@ class TemplateLoader:
         Returns:
             str 或 dict: 模板内容
         """
+        template_path = self._template_path(template_name)
+        
+        # 读取模板文件（进程内缓存）
+        entry = _get_cached(template_path)
+        
+        # 如果是从流水线模板目录加载的，尝试解析YAML
+        if template_path.startswith(self.pipeline_template_dir):
+            try:
+                return copy_document(_parse_cached(entry))
+            except Exception as e:
+                logger.warning(f"解析YAML模板失败，返回原始内容: {str(e)}")
+        
+        # 返回原始内容
+        return entry.content
+    
+    def load_parsed_template(self, template_name):
+        """
+        加载模板并返回解析后的 YAML，解析结果在进程内缓存
+        
+        Args:
+            template_name: 模板文件名（如 build.yaml）
+            
+        Returns:
+            dict: 解析结果的副本，调用方可以修改
+        """
+        return copy_document(_parse_cached(_get_cached(self._template_path(template_name))))
+    
+    def _template_path(self, template_name):
+        """
+        获取模板文件路径
+        
+        Args:
+            template_name: 模板文件名
+            
+        Returns:
+            str: 模板文件路径
+            
+        Raises:
+            FileNotFoundError: 模板文件不存在
+        """
         # 检查是否是流水线模板（以.yaml结尾）
         if template_name.endswith('.yaml'):
             template_path = os.path.join(self.template_dir, template_name)
@@ -88,19 +244,7 @@ class TemplateLoader:
             logger.error(f"模板文件不存在: {template_path}")
             raise FileNotFoundError(f"模板文件不存在: {template_path}")
         
-        # 读取模板文件
-        with open(template_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # 如果是从流水线模板目录加载的，尝试解析YAML
-        if template_path.startswith(self.pipeline_template_dir):
-            try:
-                return yaml.safe_load(content)
-            except Exception as e:
-                logger.warning(f"解析YAML模板失败，返回原始内容: {str(e)}")
-        
-        # 返回原始内容
-        return content
+        return template_path
     
     def get_mapping_for_step(self, step_content):
         """
@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+YAML 读写
+模板、映射配置的解析和转换结果的输出统一经过这里。安装了 libyaml 时使用 C 实现的解析器和输出器，
+没有时回退到纯 Python 实现，调用方不需要关心。
+
+libyaml 的输出器与纯 Python 输出器在少数情况下格式不同（双引号字符串的折行、BMP 以外字符的转义、
+超长键的判断等），为保证输出文件逐字节不变，只有所有键和字符串都不会触发这些差异的文档才交给 C 输出器，
+其余仍由 yaml.Dumper 输出
+"""
+
+import re
+import yaml
+from yaml import YAMLError
+
+try:
+    from yaml import CSafeLoader as SafeLoader, CSafeDumper as FastDumper
+    LIBYAML = True
+except ImportError:
+    from yaml import SafeLoader
+    FastDumper = None
+    LIBYAML = False
+
+# 转换器一直使用的输出参数
+DUMP_OPTIONS = {
+    'default_flow_style': False,
+    'sort_keys': False,
+    'allow_unicode': True
+}
+
+# 两种输出器格式一致的字符串：只包含换行、可打印的 ASCII 和 BMP 字符，换行前后没有空格
+# （否则会使用双引号并按不同的规则折行）
+_UNSAFE_TEXT = re.compile('[^\n\x20-\x7e\xa0-\ud7ff\ue000-\ufefe\uff00-\ufffd]| \n|\n ')
+
+# libyaml 按 UTF-8 字节数判断键能否写成简单键，纯 Python 按字符数，键不超过这个长度时两者一致
+_MAX_SIMPLE_KEY_BYTES = 120
+
+_SCALAR_TYPES = (int, float, bool, type(None))
+
+def load(stream):
+    """
+    解析 YAML（safe_load）
+
+    Args:
+        stream: YAML 字符串或文件对象
+
+    Returns:
+        解析结果
+
+    Raises:
+        YAMLError: 解析失败
+    """
+    return yaml.load(stream, Loader=SafeLoader)
+
+def dump(document, stream=None):
+    """
+    按 DUMP_OPTIONS 输出 YAML，结果与 yaml.dump 逐字节相同
+
+    Args:
+        document: YAML 字典
+        stream: 可选的文件对象，为空时返回字符串
+
+    Returns:
+        str: stream 为空时返回 YAML 文本，否则为 None
+    """
+    return yaml.dump(document, stream, Dumper=_dumper_for(document), **DUMP_OPTIONS)
+
+def _dumper_for(document):
+    """
+    选择输出器
+
+    Args:
+        document: YAML 字典
+
+    Returns:
+        type: C 输出器能输出相同格式时为 FastDumper，否则为 yaml.Dumper
+    """
+    if FastDumper is None:
+        return yaml.Dumper
+    try:
+        return FastDumper if _emits_identically(document) else yaml.Dumper
+    except RecursionError:
+        return yaml.Dumper
+
+def _emits_identically(value):
+    """
+    判断两种输出器对该值的输出是否一致；只接受 dict、list 和基本标量，其他类型由 yaml.Dumper 按原样表示
+
+    Args:
+        value: 文档或其中的值
+
+    Returns:
+        bool: 一致时为 True
+    """
+    kind = type(value)
+    if kind is str:
+        return _UNSAFE_TEXT.search(value) is None
+    if kind is dict:
+        for key, item in value.items():
+            if type(key) is not str or not key or '\n' in key or _UNSAFE_TEXT.search(key) \
+                    or len(key.encode('utf-8')) > _MAX_SIMPLE_KEY_BYTES:
+                return False
+            if not _emits_identically(item):
+                return False
+        return True
+    if kind is list:
+        return all(_emits_identically(item) for item in value)
+    return kind in _SCALAR_TYPES
@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Jenkinsfile 步骤提取测试
+"""
+
+from parsers.jenkins_file_parser import JenkinsfileParser
+
+JENKINSFILE = '''\
+pipeline {
+    agent any
+    stages {
+        stage('Deploy') {
+            steps {
+                sh 'mvn package'
+                sshagent(['deploy-key']) {
+                    sh """
+                        scp target/app.jar deploy@10.0.0.1:/opt/app
+                    """
+                    echo 'copied'
+                    script {
+                        sh(script: 'ssh deploy@10.0.0.1 systemctl restart app')
+                    }
+                }
+                echo 'done'
+            }
+        }
+    }
+}
+'''
+
+def _steps(tmp_path):
+    """解析 Jenkinsfile，返回唯一阶段的步骤"""
+    jenkinsfile = tmp_path / 'Jenkinsfile'
+    jenkinsfile.write_text(JENKINSFILE, encoding='utf-8')
+    stages = JenkinsfileParser(str(jenkinsfile))._parse_stages()
+    return stages[0]['steps']
+
+def test_sshagent_command_is_built_from_inner_sh_steps(tmp_path):
+    ssh_steps = [step for step in _steps(tmp_path) if step['type'] == 'ssh']
+    assert ssh_steps == [{
+        'name': 'SSH Agent',
+        'type': 'ssh',
+        'credentials': 'deploy-key',
+        'command': 'scp target/app.jar deploy@10.0.0.1:/opt/app\nssh deploy@10.0.0.1 systemctl restart app'
+    }]
+
+def test_steps_inside_sshagent_are_not_extracted_twice(tmp_path):
+    steps = _steps(tmp_path)
+    assert [step['type'] for step in steps] == ['sh', 'ssh', 'echo']
+    assert [step['command'] for step in steps if step['type'] == 'sh'] == ['mvn package']
@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+任务依赖图测试
+"""
+
+import textwrap
+from converters.job_graph import build_needs, transitive_reduction
+from parsers.jenkins_file_parser import JenkinsfileParser
+
+def _stage_needs(tmp_path, body):
+    """解析 stages 块并按阶段名称返回依赖的阶段名称"""
+    jenkinsfile = tmp_path / 'Jenkinsfile'
+    jenkinsfile.write_text("pipeline {\n    agent any\n    stages {\n" + textwrap.indent(textwrap.dedent(body), ' ' * 8)
+                           + "    }\n}\n", encoding='utf-8')
+    stages = JenkinsfileParser(str(jenkinsfile))._parse_stages()
+    names = [stage['name'] for stage in stages]
+    assert len(set(names)) == len(names), "测试用例中的阶段名称需要唯一"
+    return {name: deps for name, deps in build_needs([(stage['name'], stage) for stage in stages]).items()}
+
+def test_linear_pipeline_keeps_previous_chain(tmp_path):
+    needs = _stage_needs(tmp_path, """
+        stage('Checkout') { steps { checkout scm } }
+        stage('Build') { steps { sh 'mvn package' } }
+        stage('Deploy') { steps { sh 'deploy.sh' } }
+    """)
+    assert needs == {'Checkout': [], 'Build': ['Checkout'], 'Deploy': ['Build']}
+
+def test_parallel_fan_out_and_fan_in(tmp_path):
+    needs = _stage_needs(tmp_path, """
+        stage('Build') { steps { sh 'mvn package' } }
+        stage('Tests') {
+            parallel {
+                stage('Unit') { steps { sh 'mvn test' } }
+                stage('Lint') { steps { sh 'mvn checkstyle:check' } }
+            }
+        }
+        stage('Deploy') { steps { sh 'deploy.sh' } }
+    """)
+    assert needs == {
+        'Build': [],
+        'Unit': ['Build'],
+        'Lint': ['Build'],
+        'Deploy': ['Unit', 'Lint']
+    }
+
+def test_sequential_stages_inside_branch(tmp_path):
+    needs = _stage_needs(tmp_path, """
+        stage('Build') { steps { sh 'mvn package' } }
+        stage('Tests') {
+            parallel {
+                stage('Unit') { steps { sh 'mvn test' } }
+                stage('Integration') {
+                    stages {
+                        stage('IT Setup') { steps { sh 'docker compose up -d' } }
+                        stage('IT Run') { steps { sh './it.sh' } }
+                    }
+                }
+            }
+        }
+        stage('Deploy') { steps { sh 'deploy.sh' } }
+    """)
+    assert needs == {
+        'Build': [],
+        'Unit': ['Build'],
+        'IT Setup': ['Build'],
+        'IT Run': ['IT Setup'],
+        'Deploy': ['Unit', 'IT Run']
+    }
+
+def test_unstash_depends_on_stashing_stage(tmp_path):
+    needs = _stage_needs(tmp_path, """
+        stage('Build') { steps { sh 'mvn package' } }
+        stage('Tests') {
+            parallel {
+                stage('Package') { steps { sh 'mvn package'; stash name: 'jar', includes: 'target/*.jar' } }
+                stage('Scan') { steps { unstash 'jar'; sh 'scan.sh' } }
+            }
+        }
+    """)
+    # Scan 经过 Package 已经依赖 Build，归约后只保留 stash 边
+    assert needs['Scan'] == ['Package']
+    assert needs['Package'] == ['Build']
+
+def test_adjacent_parallel_blocks_with_same_name_stay_separate(tmp_path):
+    needs = _stage_needs(tmp_path, """
+        stage('Tests') {
+            parallel {
+                stage('A1') { steps { sh 'a1' } }
+                stage('A2') { steps { sh 'a2' } }
+            }
+        }
+        stage('Tests') {
+            parallel {
+                stage('B1') { steps { sh 'b1' } }
+                stage('B2') { steps { sh 'b2' } }
+            }
+        }
+    """)
+    assert needs == {'A1': [], 'A2': [], 'B1': ['A1', 'A2'], 'B2': ['A1', 'A2']}
+
+def test_unnamed_branches_are_not_merged():
+    stages = [
+        ('build', {}),
+        ('first', {'parallel_group': 0, 'parallel_branch': 0}),
+        ('second', {'parallel_group': 0, 'parallel_branch': 1}),
+        ('deploy', {})
+    ]
+    assert build_needs(stages) == {
+        'build': [],
+        'first': ['build'],
+        'second': ['build'],
+        'deploy': ['first', 'second']
+    }
+
+def test_unnamed_branches_from_parser(tmp_path):
+    jenkinsfile = tmp_path / 'Jenkinsfile'
+    jenkinsfile.write_text(textwrap.dedent("""
+        pipeline {
+            agent any
+            stages {
+                stage('Build') { steps { sh 'build' } }
+                stage('Tests') {
+                    parallel {
+                        stage { steps { sh 'one' } }
+                        stage { steps { sh 'two' } }
+                    }
+                }
+            }
+        }
+    """), encoding='utf-8')
+    stages = JenkinsfileParser(str(jenkinsfile))._parse_stages()
+    assert [stage.get('parallel_branch') for stage in stages] == [None, 0, 1]
+    needs = build_needs(list(enumerate(stages)))
+    assert needs == {0: [], 1: [0], 2: [0]}
+
+def test_transitive_reduction_removes_implied_edges():
+    needs = {
+        'a': [],
+        'b': ['a'],
+        'c': ['a'],
+        'd': ['a', 'b', 'c']
+    }
+    assert transitive_reduction(needs) == {'a': [], 'b': ['a'], 'c': ['a'], 'd': ['b', 'c']}
@@ -0,0 +1,31 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+解析结果缓存测试
+"""
+
+import sqlite3
+from models.pipeline_model import PipelineModel
+from parsers.parse_cache import ParseCache
+
+def _model(name):
+    """只有名称和一个阶段的流水线模型"""
+    model = PipelineModel()
+    model.name = name
+    model.add_stage({'name': 'Build', 'steps': [{'name': 'Shell', 'type': 'sh', 'command': 'make'}]})
+    return model
+
+def test_round_trip_uses_blob_column(tmp_path):
+    path = str(tmp_path / 'parse.db')
+    cache = ParseCache(path)
+    cache.put('pipeline { }', _model('demo'))
+    assert cache.get('pipeline { }').to_dict() == _model('demo').to_dict()
+    assert cache.get('pipeline { agent any }') is None
+    cache.close()
+
+    conn = sqlite3.connect(path)
+    columns = {row[1]: row[2] for row in conn.execute("PRAGMA table_info(models)")}
+    assert columns['model'] == 'BLOB'
+    assert conn.execute("SELECT typeof(model) FROM models").fetchall() == [('blob',)]
+    conn.close()
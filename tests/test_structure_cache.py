@@ -0,0 +1,147 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+按结构缓存转换结果的测试
+缓存命中时的输出由占位符代回得到，必须与直接调用转换器的结果完全一致
+"""
+
+import pytest
+from api.pipeline_structure import parse_freestyle_config
+from parsers.jenkins_api_parser import JenkinsApiParser
+from parsers.jenkins_file_parser import JenkinsfileParser
+from converters.structure_cache import StructureCache
+from converters.codearts_converter import CodeArtsConverter
+from converters.codearts_build_converter import CodeArtsBuildConverter
+
+JENKINSFILE = """\
+pipeline {
+    agent any
+    parameters {
+        string(name: 'VERSION', defaultValue: '%(version)s', description: 'release version')
+    }
+    environment {
+        REPO = '%(url)s'
+    }
+    stages {
+        stage('Checkout') { steps { sh 'git clone %(url)s app' } }
+        stage('构建') { steps { sh 'mvn -f app/pom.xml clean package' } }
+        stage('Deploy') { steps { sh 'scp app/target/app.jar deploy@10.0.0.1:/opt/app' } }
+    }
+}
+"""
+
+FREESTYLE_XML = """\
+<?xml version='1.1' encoding='UTF-8'?>
+<project>
+  <scm class="hudson.plugins.git.GitSCM">
+    <userRemoteConfigs>
+      <hudson.plugins.git.UserRemoteConfig>
+        <url>%(url)s</url>
+      </hudson.plugins.git.UserRemoteConfig>
+    </userRemoteConfigs>
+  </scm>
+  <builders>
+    <hudson.tasks.Shell>
+      <command>%(command)s</command>
+    </hudson.tasks.Shell>
+    <hudson.tasks.Maven>
+      <targets>clean install</targets>
+      <properties>skipTests=true</properties>
+    </hudson.tasks.Maven>
+  </builders>
+</project>
+"""
+
+def _jenkinsfile_model(tmp_path, name, **values):
+    """按模板生成 Jenkinsfile 并解析为流水线模型"""
+    jenkinsfile = tmp_path / name
+    jenkinsfile.write_text(JENKINSFILE % values, encoding='utf-8')
+    return JenkinsfileParser(str(jenkinsfile)).parse()
+
+def _freestyle_model(name, url, command='echo hello'):
+    """按模板生成 Freestyle config.xml 并解析为流水线模型"""
+    content = (FREESTYLE_XML % {'url': url, 'command': command}).encode('utf-8')
+    return JenkinsApiParser(parse_freestyle_config(name, content)).parse()
+
+def _direct(model):
+    """直接调用转换器得到的 (流水线 YAML 字典, 构建任务 YAML 字典)"""
+    return CodeArtsConverter(model).build_document(), CodeArtsBuildConverter(model).build_document()
+
+@pytest.fixture
+def cache():
+    return StructureCache()
+
+def test_jobs_differing_in_parameter_and_url_share_one_structure(tmp_path, cache):
+    first = _jenkinsfile_model(tmp_path, 'first', version='1.0.0', url='https://git.example.com/a/shop.git')
+    second = _jenkinsfile_model(tmp_path, 'second', version='2.3.1', url='git@git.example.com:b/cart.git')
+    assert first.structural_hash() == second.structural_hash() is not None
+
+    results = [cache.convert(model) for model in (first, second)]
+
+    assert (cache.misses, cache.hits, cache.structures) == (1, 1, 1)
+    assert results[0] == _direct(first)
+    assert results[1] == _direct(second)
+    assert results[0] != results[1]
+
+def test_freestyle_jobs_differing_in_scm_url_share_one_structure(cache):
+    first = _freestyle_model('shop', 'https://git.example.com/demo/shop.git')
+    second = _freestyle_model('cart', 'https://git.example.com/demo/cart.git')
+
+    results = [cache.convert(model) for model in (first, second)]
+
+    assert (cache.misses, cache.hits) == (1, 1)
+    assert results[0] == _direct(first)
+    assert results[1] == _direct(second)
+    assert 'https://git.example.com/demo/cart.git' in repr(results[1])
+    assert 'shop.git' not in repr(results[1])
+
+def test_git_url_read_from_config_xml_is_substituted(cache):
+    # 没有 SCM 信息时构建任务转换器从 config.xml 的 url 元素读取代码仓地址，按结构转换时使用 template_xml
+    models = [_freestyle_model(name, f'https://git.example.com/demo/{name}.git') for name in ('shop', 'cart')]
+    for model in models:
+        model.scm = {}
+
+    results = [cache.convert(model) for model in models]
+
+    assert (cache.misses, cache.hits) == (1, 1)
+    assert results[0] == _direct(models[0])
+    assert results[1] == _direct(models[1])
+    assert 'https://git.example.com/demo/cart.git' in repr(results[1][1])
+
+def test_command_markers_are_not_hidden_by_placeholders(cache):
+    # 以 URL 结尾、URL 中包含 maven 的 Shell 命令：转换器按 maven 片段选择 Maven 步骤，替换后必须保持一致
+    first = _freestyle_model('shop', 'https://git.example.com/demo/shop.git',
+                             command='curl -O https://repo.example.com/maven/settings.xml')
+    second = _freestyle_model('cart', 'https://git.example.com/demo/shop.git',
+                              command='curl -O https://repo.example.com/files/settings.xml')
+
+    for model in (first, second):
+        assert cache.convert(model) == _direct(model)
+    assert cache.hits == 0
+
+def test_scalar_values_keep_their_type(tmp_path, cache):
+    models = []
+    for index, value in enumerate((8080, 9090)):
+        model = _jenkinsfile_model(tmp_path, f'job{index}', version='1.0.0', url='https://git.example.com/a.git')
+        model.environment['PORT'] = value
+        model.environment['DEBUG'] = True
+        models.append(model)
+
+    for model in models:
+        assert cache.convert(model) == _direct(model)
+    assert (cache.misses, cache.hits) == (1, 1)
+
+@pytest.mark.parametrize('field', ['command', 'xml'])
+def test_existing_placeholder_disables_deduplication(field, cache):
+    token = '__jtc_value_0__'
+    if field == 'command':
+        model = _freestyle_model('shop', 'https://git.example.com/demo/shop.git', command=f'echo {token}')
+    else:
+        # 占位符只出现在 config.xml 中
+        model = _freestyle_model('shop', 'https://git.example.com/demo/shop.git')
+        model.xml_content = model.xml_content.replace('shop.git', f'{token}.git')
+
+    assert model.abstract().digest is None
+    assert cache.convert(model) == _direct(model)
+    assert (cache.misses, cache.hits, cache.structures) == (0, 0, 0)
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+请求节流工具测试
+"""
+
+import time
+import threading
+from api.throttle import CircuitBreaker
+
+COOLDOWN = 0.2
+
+def _open_breaker():
+    """创建一个已经打开并且冷却结束的熔断器"""
+    breaker = CircuitBreaker(window_size=2, min_requests=2, cooldown=COOLDOWN, probe_interval=0.01)
+    breaker.record(False)
+    breaker.record(False)
+    assert breaker.wait_time() > 0
+    time.sleep(COOLDOWN)
+    return breaker
+
+def test_half_open_admits_single_probe():
+    breaker = _open_breaker()
+    assert breaker.wait_time() == 0
+    assert breaker.wait_time() > 0
+    assert breaker.wait_time() > 0
+
+    breaker.record(True)
+    assert breaker.wait_time() == 0
+    assert breaker.wait_time() == 0
+
+def test_failed_probe_reopens_breaker():
+    breaker = _open_breaker()
+    assert breaker.wait_time() == 0
+
+    breaker.record(False)
+    assert breaker.wait_time() > COOLDOWN / 2
+
+def test_results_without_probe_are_ignored_while_open():
+    breaker = CircuitBreaker(window_size=2, min_requests=2, cooldown=COOLDOWN, probe_interval=0.01)
+    breaker.record(False)
+    breaker.record(False)
+    # 熔断前发出的请求在冷却期间返回
+    breaker.record(True)
+    assert breaker.wait_time() > 0
+
+def test_lost_probe_is_replaced_after_cooldown():
+    breaker = _open_breaker()
+    assert breaker.wait_time() == 0
+    assert breaker.wait_time() > 0
+    time.sleep(COOLDOWN)
+    assert breaker.wait_time() == 0
+
+def test_other_workers_wait_for_probe_result():
+    breaker = _open_breaker()
+    assert breaker.wait_time() == 0
+
+    released = []
+    workers = [threading.Thread(target=lambda: (breaker.wait(), released.append(True))) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    time.sleep(COOLDOWN / 2)
+    assert released == []
+
+    breaker.record(True)
+    for worker in workers:
+        worker.join(timeout=1)
+    assert len(released) == 4
@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+YAML 输出测试
+yaml_io.dump 必须与纯 Python 的 yaml.Dumper 逐字节相同。C 输出器只在 _emits_identically 判断安全时使用，
+升级 PyYAML 或 libyaml 后两者的差异发生变化时，这里的测试会失败
+"""
+
+import random
+import pytest
+import yaml
+from utils import yaml_io
+
+def _reference(document):
+    """纯 Python 输出器的结果"""
+    return yaml.dump(document, Dumper=yaml.Dumper, **yaml_io.DUMP_OPTIONS)
+
+# 转换器输出中常见的结构，应当走 C 输出器
+FAST_DOCUMENTS = [
+    {'version': '2.0', 'stages': [{'name': '构建', 'jobs': [{'sh': {'command': 'mvn clean package -DskipTests'}}]}]},
+    {'steps': {'BUILD': [{'maven': {'name': 'Maven构建', 'inputs': {'cache': True, 'command': 'mvn package'}}}]}},
+    {'script': 'set -e\nmvn -B package\nscp target/*.jar deploy@10.0.0.1:/opt/app\n', 'timeout': 30, 'ratio': 0.5},
+    {'empty': '', 'none': None, 'list': [], 'dict': {}, 'quoted': "it's: #1", 'yes': 'yes', 'number': '010'},
+    {'键' * 40: 'UTF-8 编码后 120 字节的键', 'wide': '全角\u3000空格和\u2026标点\u201c引号\u201d', 'long': '构建 ' * 60},
+]
+
+# _emits_identically 排除的情况，必须回退到 yaml.Dumper
+SLOW_DOCUMENTS = [
+    {'emoji': '发布 \U0001F680'},
+    {'trailing_space': 'line \nnext'},
+    {'leading_space': 'line\n next'},
+    {'only': ' \n'},
+    {'键' * 41: 'UTF-8 编码后超过 120 字节的键'},
+    {'键' * 43: 'libyaml 按 129 字节判断为长键，纯 Python 按 43 个字符判断为简单键'},
+    {'': 'empty key'},
+    {'multi\nline': 'newline in key'},
+    {1: 'int key'},
+    {'tab': 'a\tb'},
+    {'nel': 'a\x85b', 'bom': '\ufeffx', 'separator': 'a\u2028b'},
+    {'nested': [{'ok': 'ascii'}, {'bad': '\U0001F600'}]},
+    {'tuple': ('a', 'b')},
+]
+
+@pytest.mark.parametrize('document', FAST_DOCUMENTS + SLOW_DOCUMENTS)
+def test_dump_matches_pure_python_dumper(document):
+    assert yaml_io.dump(document) == _reference(document)
+
+@pytest.mark.skipif(not yaml_io.LIBYAML, reason='未安装 libyaml')
+@pytest.mark.parametrize('document', FAST_DOCUMENTS)
+def test_common_documents_use_libyaml(document):
+    assert yaml_io._dumper_for(document) is yaml_io.FastDumper
+    assert yaml.dump(document, Dumper=yaml_io.FastDumper, **yaml_io.DUMP_OPTIONS) == _reference(document)
+
+@pytest.mark.parametrize('document', SLOW_DOCUMENTS)
+def test_excluded_documents_fall_back(document):
+    assert yaml_io._dumper_for(document) is yaml.Dumper
+
+# 随机文档的字符集：常见字符，以及加入 _emits_identically 排除的字符
+SAFE_ALPHABET = list("ab1 :#-?&*!|>'\"%@{}[],`~=\\/") + ['中', '文', '\xa0', '\u3000', '\u2026', '\u201c', '\xe9']
+FULL_ALPHABET = SAFE_ALPHABET + ['\n'] * 6 + ['\t', '\x85', '\ufeff', '\u2028', '\U0001F600']
+
+def _random_text(rng, alphabet):
+    """随机长度的字符串，长度覆盖折行宽度 80 附近"""
+    return ''.join(rng.choice(alphabet) for _ in range(rng.choice((0, 1, 2, 5, 20, 79, 80, 81, 200))))
+
+@pytest.mark.parametrize('seed', range(4))
+def test_random_documents_match_pure_python_dumper(seed):
+    rng = random.Random(seed)
+    fast = 0
+    for index in range(500):
+        alphabet = SAFE_ALPHABET if index % 2 else FULL_ALPHABET
+        text = lambda: _random_text(rng, alphabet)
+        key = lambda: _random_text(rng, alphabet)[:60] or 'k'
+        document = {key(): [text(), {key(): text()}], 'k': text(), 'n': {'a': text(), 'b': [text(), None, 1]}}
+        assert yaml_io.dump(document) == _reference(document), repr(document)
+        fast += yaml_io._dumper_for(document) is yaml_io.FastDumper
+    if yaml_io.LIBYAML:
+        # 随机文档中要有足够多的走 C 输出器，否则比较没有意义
+        assert fast > 200